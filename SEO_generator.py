@@ -3,11 +3,21 @@ SEO Generator
 Generates SEO-friendly titles and keywords for any storefront
 """
 
+import multiprocessing
+import numpy as np
+import os
 import pandas as pd
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
 from pathlib import Path
 
+from artifact_io import read_table, write_table
+from seo_cache import SeoCache, seo_key
+from seo_rules import DEFAULT_RULES, load_rules
+
 def clean_text(text):
     """Remove extra quotes and clean up text"""
     if pd.isna(text) or text == '':
@@ -18,103 +28,60 @@ def clean_text(text):
     text = text.replace('""', '"')
     return text
 
+# Size/spec patterns, searched in this order
+SIZE_PATTERNS = [
+    r'\d+\.?\d*\s*["\']?\s*x\s*\d+\.?\d*\s*["\']?',
+    r'\d+\s*sided?',
+    r'Updated \d{1,2}/\d{4}',
+    r'Updated \d{1,2}-\d{1,2}-\d{4}'
+]
+SIZE_REGEXES = [re.compile(pattern, re.IGNORECASE) for pattern in SIZE_PATTERNS]
+
+# Every column generate_seo_title and generate_keywords read (besides the store ID, which picks the rules)
+SEO_INPUT_COLUMNS = ['Name', 'BriefDescription', 'LongDescription', 'StoreFront/Categories', 'uStore_StoreName']
+
+# Words skipped when a title starts from the product name
+TITLE_SKIP_WORDS = ['the', 'a', 'an']
+
+# Store name words that make poor keywords
+STORE_COMMON_WORDS = {'online', 'print', 'portal', 'store', 'ordering', 'the', 'a', 'an'}
+
+# Parallel generation: most rows per worker task, and the fewest rows worth starting worker processes for
+DEFAULT_PARALLEL_CHUNK_SIZE = 10000
+MIN_PARALLEL_ROWS = 40000
+
 def extract_specs(text):
     """Extract size/spec information from text"""
     if not text:
         return []
     specs = []
-    size_patterns = [
-        r'\d+\.?\d*\s*["\']?\s*x\s*\d+\.?\d*\s*["\']?',
-        r'\d+\s*sided?',
-        r'Updated \d{1,2}/\d{4}',
-        r'Updated \d{1,2}-\d{1,2}-\d{4}'
-    ]
-    for pattern in size_patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        specs.extend(matches)
+    for regex in SIZE_REGEXES:
+        specs.extend(regex.findall(text))
     return specs
 
-def extract_locations_from_text(text):
+def extract_locations_from_text(text, gazetteer=DEFAULT_RULES.gazetteer):
     """
-    Auto-detect location keywords from text (city names, states)
-    Returns list of detected locations
+    Detect known place names (states, clinic cities) in text
+    Returns list of locations in order of appearance
     """
-    if not text:
-        return []
-    
-    # Common US location patterns
-    # State abbreviations
-    state_pattern = r'\b[A-Z]{2}\b'
-    # City names (capitalized words, potentially multi-word)
-    city_pattern = r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b'
-    
-    locations = []
-    
-    # Find state abbreviations
-    states = re.findall(state_pattern, text)
-    locations.extend(states)
-    
-    # Find potential city names (but filter out common false positives)
-    false_positives = {'The', 'A', 'An', 'In', 'On', 'At', 'To', 'For', 'With', 'And', 'Or'}
-    cities = re.findall(city_pattern, text)
-    locations.extend([c for c in cities if c not in false_positives])
-    
-    return list(set(locations))
+    return gazetteer.find(text)
 
-def get_product_type(name, categories):
+def get_product_type(name, categories, rules=DEFAULT_RULES):
     """
     Extract product type from name and categories
     Generic - works for any product
     """
-    type_keywords = {
-        'envelope': 'Envelope',
-        'business card': 'Business Card',
-        'appointment card': 'Appointment Card',
-        'qr code': 'QR Code Card',
-        'review card': 'Review Card',
-        'card': 'Card',
-        'flier': 'Flier',
-        'flyer': 'Flyer',
-        'brochure': 'Brochure',
-        'letterhead': 'Letterhead',
-        'registration': 'Registration Form',
-        'form': 'Form',
-        'letter': 'Letter',
-        'sales aid': 'Sales Aid',
-        'postcard': 'Postcard',
-        'booklet': 'Booklet',
-        'poster': 'Poster',
-        'label': 'Label',
-        'sticker': 'Sticker',
-        'lanyard': 'Lanyard',
-        'badge': 'Badge',
-        'sign': 'Sign',
-        'banner': 'Banner',
-        'handout': 'Handout',
-        'presentation': 'Presentation',
-        'folder': 'Folder',
-        'notepad': 'Notepad',
-        'pen': 'Pen',
-        'gift': 'Gift',
-        'merchandise': 'Merchandise'
-    }
-    
     name_lower = name.lower()
     categories_lower = categories.lower() if categories else ''
     
-    # Check name first (more specific)
-    for keyword, ptype in type_keywords.items():
-        if keyword in name_lower:
-            return ptype
-    
-    # Then check categories
-    for keyword, ptype in type_keywords.items():
-        if keyword in categories_lower:
-            return ptype
-    
-    return None
+    # Name first (more specific), then categories
+    return rules.product_type(name_lower, categories_lower)
 
-def generate_seo_title(row):
+def store_rules(row, rules=None):
+    """Rules for a row's store (per-store overrides need uStore_StoreID)"""
+    return (rules or DEFAULT_RULES).for_store(row.get('uStore_StoreID'))
+
+def generate_seo_title(row, rules=None):
     """Generate SEO-friendly title for any product"""
     name = clean_text(row['Name'])
     brief_desc = clean_text(row.get('BriefDescription', ''))
@@ -123,10 +90,11 @@ def generate_seo_title(row):
     store_name = clean_text(row.get('uStore_StoreName', ''))
     
     # Extract product type
-    product_type = get_product_type(name, categories)
+    rules = store_rules(row, rules)
+    product_type = get_product_type(name, categories, rules)
     
     # Auto-detect locations from name
-    locations = extract_locations_from_text(name)
+    locations = extract_locations_from_text(name, rules.gazetteer)
     location = locations[0] if locations else None
     
     # Extract specifications
@@ -145,7 +113,7 @@ def generate_seo_title(row):
         name_parts = name.split()
         if name_parts:
             # Take first 2-3 words, excluding common store prefixes
-            common_prefixes = ['the', 'a', 'an']
+            common_prefixes = TITLE_SKIP_WORDS
             meaningful_words = [
                 word for word in name_parts[:5] 
                 if word.lower() not in common_prefixes
@@ -179,7 +147,7 @@ def generate_seo_title(row):
     
     return seo_title
 
-def generate_keywords(row):
+def generate_keywords(row, rules=None):
     """Generate SEO keywords for any product"""
     name = clean_text(row['Name'])
     brief_desc = clean_text(row.get('BriefDescription', ''))
@@ -187,41 +155,17 @@ def generate_keywords(row):
     store_name = clean_text(row.get('uStore_StoreName', ''))
     
     keywords = set()
+    rules = store_rules(row, rules)
     
     # Extract locations (auto-detect)
-    locations = extract_locations_from_text(name)
+    locations = extract_locations_from_text(name, rules.gazetteer)
     keywords.update([loc.lower() for loc in locations])
     
     # Product type keywords
     name_lower = name.lower()
-    type_keyword_groups = {
-        'envelope': ['envelope', 'mailing', 'stationery'],
-        'business card': ['business card', 'card', 'networking', 'contact'],
-        'appointment card': ['appointment card', 'reminder'],
-        'qr code': ['qr code', 'review', 'feedback'],
-        'card': ['card'],
-        'flier': ['flier', 'flyer', 'marketing', 'promotional'],
-        'brochure': ['brochure', 'marketing', 'informational'],
-        'letterhead': ['letterhead', 'stationery', 'correspondence'],
-        'registration': ['registration', 'form'],
-        'form': ['form', 'document'],
-        'letter': ['letter', 'correspondence'],
-        'sales aid': ['sales aid', 'marketing', 'sales tool'],
-        'postcard': ['postcard', 'mailing', 'marketing'],
-        'booklet': ['booklet', 'guide'],
-        'poster': ['poster', 'signage', 'display'],
-        'label': ['label', 'sticker'],
-        'lanyard': ['lanyard', 'badge holder'],
-        'sign': ['sign', 'signage'],
-        'banner': ['banner', 'display'],
-        'handout': ['handout', 'informational']
-    }
     
     # Add keywords based on product type
-    for keyword, related_terms in type_keyword_groups.items():
-        if keyword in name_lower:
-            keywords.update(related_terms)
-            break
+    keywords.update(rules.keyword_group(name_lower))
     
     # Add category-based keywords
     if categories:
@@ -249,7 +193,7 @@ def generate_keywords(row):
         # Split store name into words and add as keywords
         store_words = store_name.lower().split()
         # Filter out common words
-        common_words = {'online', 'print', 'portal', 'store', 'ordering', 'the', 'a', 'an'}
+        common_words = STORE_COMMON_WORDS
         meaningful_store_words = [w for w in store_words if w not in common_words]
         keywords.update(meaningful_store_words)
     
@@ -266,36 +210,399 @@ def generate_keywords(row):
     
     return keywords_str
 
-def generate_seo_data(input_csv, output_csv):
+# Column-wise engine: the same titles and keywords as generate_seo_title and
+# generate_keywords, computed with .str operations over whole columns
+
+def clean_column(df, column):
     """
-    Main function to generate SEO data for products
+    clean_text applied to a whole column ('' for every row if the column is missing)
+    
+    Text and categorical columns are factorized so each distinct value is
+    cleaned once (store names and categories repeat on every row of a store).
+    The result is object dtype: its .str methods run noticeably faster than
+    on pandas' string dtype, and every later step keeps working on it.
     """
-    print("="*80)
-    print("SEO GENERATOR")
-    print("="*80)
-    print(f"\nReading CSV: {input_csv}")
+    if column not in df.columns:
+        return pd.Series('', index=df.index, dtype=object)
+    values = df[column]
+    if isinstance(values.dtype, (pd.CategoricalDtype, pd.StringDtype)):
+        codes, uniques = pd.factorize(values)
+        cleaned = np.array([clean_text(value) for value in uniques] + [''], dtype=object)
+        return pd.Series(cleaned[codes], index=df.index, dtype=object)  # Code -1 (missing) -> ''
+    return pd.Series([clean_text(value) for value in values], index=df.index, dtype=object)
+
+def first_match(text):
+    """First SIZE_PATTERNS match per row, pattern by pattern (NaN if none)"""
+    result = pd.Series(np.nan, index=text.index, dtype=object)
+    for pattern in SIZE_PATTERNS:
+        pending = result.isna()
+        if not pending.any():
+            break
+        result[pending] = text[pending].str.extract(f"({pattern})", flags=re.IGNORECASE, expand=False)
+    return result
+
+def all_matches(text):
+    """extract_specs per row: lists of matches, pattern by pattern"""
+    matches = None
+    for regex in SIZE_REGEXES:
+        found = text.str.findall(regex)
+        matches = found if matches is None else matches + found
+    return matches
+
+def first_keywords(text, matcher):
+    """
+    Position of the first keyword contained in each row, per matcher table (-1 where none)
     
-    # Validate input file
-    if not Path(input_csv).exists():
-        print(f"ERROR: Input file not found: {input_csv}")
-        return False
+    Each distinct text is matched once.
+    
+    Returns:
+        list: One Series per table of the matcher
+    """
+    found = text.map({value: matcher.first_all(value) for value in text.unique()})
+    positions = pd.DataFrame(found.tolist(), index=text.index) if len(text) else pd.DataFrame(index=text.index)
+    return [positions[column] if column in positions.columns else pd.Series(-1, index=text.index)
+            for column in range(len(matcher.no_match))]
+
+def explode_text(lists):
+    """One row per list element (index repeated), as text; empty lists drop out"""
+    return lists.explode().dropna().astype(str)
+
+def join_parts(parts):
+    """Join per-row text parts with single spaces, skipping empty ones"""
+    joined = pd.Series('', index=parts[0].index, dtype=object)
+    for part in parts:
+        part = part.fillna('')
+        spaced = joined.where(joined.eq(''), joined + ' ')
+        joined = joined.where(part.eq(''), spaced + part)
+    return joined
+
+def title_words(name):
+    """Up to 3 of the first 5 words of each name, skipping TITLE_SKIP_WORDS"""
+    words = name.str.split(expand=True)
+    if words.shape[1] == 0:
+        return pd.Series('', index=name.index, dtype=object)
+    words = words.iloc[:, :5]
+    keep = words.notna() & ~words.apply(lambda column: column.str.lower()).isin(TITLE_SKIP_WORDS)
+    keep &= keep.cumsum(axis=1) <= 3
+    return join_parts([words[column].where(keep[column]) for column in words.columns])
+
+def detected_locations(name, gazetteer):
+    """extract_locations_from_text per row, scanning each distinct name once"""
+    found = {text: gazetteer.find(text) for text in name.unique()}
+    return pd.Series([found[text] for text in name], index=name.index, dtype=object)
+
+def extract_features(rows, rules):
+    """
+    Everything the title and keyword builders read, computed once per product
+    
+    Args:
+        rows: Products DataFrame (unique index)
+        rules: SeoRules used for every row
+    
+    Returns:
+        DataFrame: One row per product with the columns
+            name, brief_desc, long_desc, categories, store_name: cleaned text
+            name_lower: lowercased name
+            locations: locations detected in the name (list)
+            specs: size/spec matches in the brief description (list)
+            spec: first spec of the brief, else of the long description ('' if none)
+            product_type: type from the name, else the categories ('' if none)
+            keyword_group: related keywords for the name's type keyword (list)
+    """
+    features = pd.DataFrame({column: clean_column(rows, source) for column, source in [
+        ('name', 'Name'),
+        ('brief_desc', 'BriefDescription'),
+        ('long_desc', 'LongDescription'),
+        ('categories', 'StoreFront/Categories'),
+        ('store_name', 'uStore_StoreName')
+    ]}, index=rows.index)
+    features['name_lower'] = features['name'].str.lower()
+    features['locations'] = detected_locations(features['name'], rules.gazetteer)
+    
+    # Brief specs once; the long description is searched only where the brief has none
+    specs = all_matches(features['brief_desc'])
+    spec = specs.str[0]
+    missing = spec.isna()
+    if missing.any():
+        spec[missing] = first_match(features.loc[missing, 'long_desc'])
+    features['specs'] = specs
+    features['spec'] = spec.fillna('').astype(str).str.strip()
+    
+    # One pass over each name for both tables; categories only for names without a type
+    type_index, group_index = first_keywords(features['name_lower'], rules.name_matcher)
+    untyped = type_index.eq(-1)
+    if untyped.any():
+        type_index[untyped] = first_keywords(features.loc[untyped, 'categories'].str.lower(), rules.type_matcher)[0]
+    features['product_type'] = type_index.map(lambda i: rules.type_values[i] if i >= 0 else '')
+    features['keyword_group'] = group_index.map(lambda i: rules.group_values[i] if i >= 0 else [])
+    return features
+
+def build_seo_titles(features):
+    """generate_seo_title for every row of extract_features"""
+    name = features['name']
+    store_name = features['store_name']
+    product_type = features['product_type']
+    lead = product_type.where(product_type.ne(''), title_words(name))
+    
+    location = features['locations'].str[0].astype(object).fillna('')
+    location_part = ('- ' + location).where(location.ne(''), '')
+    
+    spec = features['spec']
+    usable = spec.ne('') & ~spec.str.contains('Updated', regex=False) & (spec.str.len() < 30)
+    spec_part = ('(' + spec + ')').where(usable, '')
+    
+    store_part = ('| ' + store_name).where(store_name.ne(''), '')
+    
+    parts = [lead, location_part, spec_part, store_part]
+    part_count = sum(part.ne('').astype(int) for part in parts)
+    titles = join_parts(parts)
+    
+    # Truncate to SEO-optimal length (60-70 chars)
+    too_long = titles.str.len() > 70
+    titles = titles.where(~too_long, titles.str[:67] + '...')
+    
+    # Fallback to cleaned name if no parts extracted (never truncated)
+    fallback = (name + ' | ' + store_name).where(store_name.ne(''), name)
+    return titles.where(part_count > 1, fallback)
+
+def build_keywords(features):
+    """generate_keywords for every row of extract_features"""
+    name_lower = features['name_lower']
+    pieces = [explode_text(features['locations']).str.lower()]
+    
+    # Product type keywords
+    pieces.append(explode_text(features['keyword_group']))
+    
+    # Category names (skipping very short parts)
+    parts = features['categories'].str.split('/').explode().str.strip()
+    pieces.append(parts[parts.str.len() > 2].str.lower())
+    
+    # Language-specific keywords
+    spanish = name_lower.str.contains('spanish', regex=False) | name_lower.str.contains('español', regex=False)
+    pieces.append(pd.Series('spanish', index=features.index[spanish.astype(bool)], dtype=object))
+    
+    # Size specifications (first two)
+    specs = features['specs']
+    for position in (0, 1):
+        spec = specs.str[position].dropna().astype(str)
+        spec = spec[~spec.str.contains('Updated', regex=False)]
+        spec = spec.str.strip().str.replace('"', 'inch', regex=False).str.replace("'", 'inch', regex=False)
+        pieces.append(spec[spec.ne('') & (spec.str.len() < 20)].str.lower())
+    
+    # Brand keywords from the store name
+    store_words = explode_text(features['store_name'].str.lower().str.split())
+    pieces.append(store_words[~store_words.isin(STORE_COMMON_WORDS)])
+    
+    # Distinct keywords per row, sorted and comma-separated
+    keywords = pd.concat(pieces)
+    table = pd.DataFrame({'row': keywords.index, 'keyword': keywords.to_numpy(dtype=object)})
+    table = table.drop_duplicates().sort_values(['row', 'keyword'])
+    rows = table['row'].to_numpy()
+    values = table['keyword'].tolist()
+    starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]]) if len(rows) else np.array([], dtype=int)
+    ends = np.r_[starts[1:], len(rows)]
+    joined = [', '.join(values[start:end]) for start, end in zip(starts, ends)]
+    keywords_str = pd.Series(joined, index=rows[starts], dtype=object).reindex(features.index, fill_value='')
+    
+    # Truncate to 500 character limit
+    truncated = keywords_str.str[:500]
+    last_comma = truncated.str.rfind(',')
+    truncated = truncated.where(last_comma <= 0, pd.Series(
+        [text[:cut] for text, cut in zip(truncated, last_comma)], index=truncated.index
+    ))
+    return keywords_str.where(keywords_str.str.len() <= 500, truncated)
+
+def feature_frame(rows, rules):
+    """extract_features for rows with a unique index, each store with its own rules"""
+    if rules.stores and 'uStore_StoreID' in rows.columns and len(rows) > 0:
+        # Stores without an override share one group under the base rules ('')
+        store_ids = rows['uStore_StoreID'].astype(str)
+        groups = store_ids.where(store_ids.isin(list(rules.stores)), '')
+        return pd.concat([
+            extract_features(rows.loc[positions], rules.for_store(store_id) if store_id else rules)
+            for store_id, positions in groups.groupby(groups, sort=False).groups.items()
+        ]).loc[rows.index]
+    return extract_features(rows, rules)
+
+def seo_features(df, rules=None):
+    """
+    SEO features (see extract_features) of every product, aligned with df.index
+    
+    Args:
+        df: Products DataFrame
+        rules: SeoRules (default: the built-in tables); stores with their own
+               rules use them, by uStore_StoreID
+    """
+    features = feature_frame(df.reset_index(drop=True), rules or DEFAULT_RULES)
+    return features.set_axis(df.index)
+
+def seo_columns(df, rules=None):
+    """
+    SEOTitle and KeyWords for every product, built from one feature extraction pass
+    
+    Args:
+        df: Products DataFrame
+        rules: SeoRules (default: the built-in tables); stores with their own
+               rules use them, by uStore_StoreID
+    
+    Returns:
+        tuple: (titles, keywords) Series aligned with df.index
+    """
+    features = feature_frame(df.reset_index(drop=True), rules or DEFAULT_RULES)
+    titles = build_seo_titles(features)
+    keywords = build_keywords(features)
+    return (pd.Series(titles.to_numpy(dtype=object), index=df.index),
+            pd.Series(keywords.to_numpy(dtype=object), index=df.index))
+
+def seo_chunk(chunk, rules):
+    """seo_columns for one chunk in a worker process (returned as plain lists)"""
+    titles, keywords = seo_columns(chunk, rules)
+    return titles.tolist(), keywords.tolist()
+
+def pool_context():
+    """
+    Start method for SEO worker processes
+    
+    forkserver where the platform has it: workers are forked from a clean
+    server process rather than from the pipeline, whose concurrent step
+    threads may hold locks (stdout, logging) at the moment of a fork.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context()
+
+def parallel_seo_columns(df, rules=None, workers=None, chunk_size=DEFAULT_PARALLEL_CHUNK_SIZE):
+    """
+    seo_columns with df split into chunks across worker processes
+    
+    Products are independent, so each chunk is computed on its own and the
+    results are joined back in df's order. Chunks hold at most chunk_size
+    rows and are made small enough to give every worker some. Inputs under
+    MIN_PARALLEL_ROWS run sequentially (starting the pool would cost more
+    than it saves), as does everything if the pool cannot be started.
+    
+    Args:
+        df: Products DataFrame
+        rules: SeoRules (default: the built-in tables)
+        workers: Worker processes (None = CPU count, 1 = sequential)
+        chunk_size: Most rows per worker task
+    
+    Returns:
+        tuple: (titles, keywords) Series aligned with df.index
+    """
+    rules = rules or DEFAULT_RULES
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(df) < MIN_PARALLEL_ROWS:
+        return seo_columns(df, rules)
+    
+    chunk_size = min(chunk_size or DEFAULT_PARALLEL_CHUNK_SIZE, -(-len(df) // workers))
+    columns = [column for column in SEO_INPUT_COLUMNS + ['uStore_StoreID'] if column in df.columns]
+    chunks = [df[columns].iloc[start:start + chunk_size] for start in range(0, len(df), chunk_size)]
+    print(f"SEO generation: {len(chunks)} chunks of up to {chunk_size} products across {workers} worker processes")
     
-    # Read CSV
     try:
-        df = pd.read_csv(input_csv, encoding='utf-8', keep_default_na=False)
-    except Exception as e:
-        print(f"ERROR: Failed to read CSV: {e}")
-        return False
+        with ProcessPoolExecutor(max_workers=workers, mp_context=pool_context()) as executor:
+            results = list(executor.map(seo_chunk, chunks, repeat(rules)))
+    except (OSError, BrokenProcessPool) as e:
+        print(f"WARNING: SEO worker processes failed ({e}), generating sequentially")
+        return seo_columns(df, rules)
+    
+    titles = [title for chunk_titles, _ in results for title in chunk_titles]
+    keywords = [keyword for _, chunk_keywords in results for keyword in chunk_keywords]
+    return pd.Series(titles, index=df.index), pd.Series(keywords, index=df.index)
+
+def seo_input_keys(df, rules):
+    """SEO cache key of every row: its store's rules fingerprint and cleaned SEO inputs"""
+    rows = df.reset_index(drop=True)
+    columns = [clean_column(rows, column) for column in SEO_INPUT_COLUMNS]
+    if rules.stores and 'uStore_StoreID' in rows.columns:
+        store_ids = rows['uStore_StoreID'].astype(str)
+        fingerprints = store_ids.map({sid: rules.for_store(sid).fingerprint for sid in store_ids.unique()})
+    else:
+        fingerprints = [rules.fingerprint] * len(rows)
+    return [seo_key(fingerprint, values) for fingerprint, *values in zip(fingerprints, *columns)]
+
+def cached_seo_columns(df, rules=None, cache=None, workers=1, chunk_size=DEFAULT_PARALLEL_CHUNK_SIZE):
+    """
+    parallel_seo_columns, reusing results saved in an SeoCache
     
-    print(f"Loaded {len(df)} products")
+    Rows are looked up in one batch; only rows whose inputs are neither
+    cached nor repeated earlier in df are computed, and their results saved.
+    
+    Returns:
+        tuple: (titles, keywords) Series aligned with df.index
+    """
+    rules = rules or DEFAULT_RULES
+    if cache is None or len(df) == 0:
+        return parallel_seo_columns(df, rules, workers, chunk_size)
+    
+    keys = seo_input_keys(df, rules)
+    found = cache.lookup(set(keys))
+    reused = sum(key in found for key in keys)
+    
+    pending = np.zeros(len(keys), dtype=bool)
+    seen = set(found)
+    for position, key in enumerate(keys):
+        if key not in seen:
+            seen.add(key)
+            pending[position] = True
+    if pending.any():
+        titles, keywords = parallel_seo_columns(df[pending], rules, workers, chunk_size)
+        computed = dict(zip([key for key, miss in zip(keys, pending) if miss], zip(titles, keywords)))
+        cache.store(computed)
+        found.update(computed)
+    
+    print(f"SEO cache: {reused} of {len(keys)} products reused, {int(pending.sum())} computed")
+    return (pd.Series([found[key][0] for key in keys], index=df.index, dtype=object),
+            pd.Series([found[key][1] for key in keys], index=df.index, dtype=object))
+
+def check_parity(df, show=5, rules=None):
+    """
+    Compare the column-wise engine with the row-wise functions
     
+    Returns:
+        int: Number of products whose SEOTitle or KeyWords differ
+    """
+    titles, keywords = seo_columns(df, rules)
+    expected_titles = df.apply(generate_seo_title, axis=1, rules=rules) if len(df) else titles
+    expected_keywords = df.apply(generate_keywords, axis=1, rules=rules) if len(df) else keywords
+    
+    mismatched = (titles != expected_titles) | (keywords != expected_keywords)
+    for idx in list(df.index[mismatched.to_numpy()])[:show]:
+        print(f"  Row {idx}: {clean_text(df.at[idx, 'Name'])[:60]}")
+        if titles[idx] != expected_titles[idx]:
+            print(f"    SEOTitle  row-wise: {expected_titles[idx]!r}")
+            print(f"    SEOTitle  columns:  {titles[idx]!r}")
+        if keywords[idx] != expected_keywords[idx]:
+            print(f"    KeyWords  row-wise: {expected_keywords[idx]!r}")
+            print(f"    KeyWords  columns:  {keywords[idx]!r}")
+    return int(mismatched.sum())
+
+def add_seo_data(df, rules=None, cache=None, workers=1, chunk_size=DEFAULT_PARALLEL_CHUNK_SIZE):
+    """
+    Add SEOTitle and KeyWords columns to an already-loaded products DataFrame
+    
+    Args:
+        df: Products DataFrame
+        rules: SeoRules from load_rules (default: the built-in tables)
+        cache: SeoCache to reuse and save results in (None = compute every row)
+        workers: Worker processes for large inputs (None = CPU count, 1 = sequential)
+        chunk_size: Most rows per worker task
+    
+    Returns:
+        DataFrame: Products with SEO columns, or None if generation failed
+    """
     # Validate required columns
     required_columns = ['Name']
     missing_columns = [col for col in required_columns if col not in df.columns]
     if missing_columns:
         print(f"ERROR: Missing required columns: {missing_columns}")
         print(f"Available columns: {list(df.columns)}")
-        return False
+        return None
+    
+    df = df.copy()
     
     # Add SEOTitle and KeyWords columns if they don't exist
     if 'SEOTitle' not in df.columns:
@@ -306,8 +613,8 @@ def generate_seo_data(input_csv, output_csv):
     print(f"\nGenerating SEO data for {len(df)} products...")
     
     # Generate SEO data
-    df['SEOTitle'] = df.apply(generate_seo_title, axis=1)
-    df['KeyWords'] = df.apply(generate_keywords, axis=1)
+    if len(df) > 0:
+        df['SEOTitle'], df['KeyWords'] = cached_seo_columns(df, rules, cache, workers, chunk_size)
     
     # Show sample results
     print("\nSample SEO Data Generated:")
@@ -319,11 +626,57 @@ def generate_seo_data(input_csv, output_csv):
         print(f"  Keywords:  {row['KeyWords'][:60]}...")
         print()
     
+    return df
+
+def read_rules(rules_file):
+    """Load SEO rules for a CLI run, or None (after printing the error) if the file is invalid"""
+    try:
+        rules = load_rules(rules_file)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: Failed to load SEO rules: {e}")
+        return None
+    if rules_file:
+        print(f"SEO rules: {rules_file} ({len(rules.type_keywords)} product types, {len(rules.stores)} store override(s))")
+    return rules
+
+def generate_seo_data(input_csv, output_csv, rules_file=None, cache_file=None, workers=1,
+                      chunk_size=DEFAULT_PARALLEL_CHUNK_SIZE):
+    """
+    Main function to generate SEO data for products
+    """
+    print("="*80)
+    print("SEO GENERATOR")
+    print("="*80)
+    print(f"\nReading CSV: {input_csv}")
+    
+    # Validate input file
+    if not Path(input_csv).exists():
+        print(f"ERROR: Input file not found: {input_csv}")
+        return False
+    
+    rules = read_rules(rules_file)
+    if rules is None:
+        return False
+    
+    # Read CSV
+    try:
+        df = read_table(input_csv)
+    except Exception as e:
+        print(f"ERROR: Failed to read input: {e}")
+        return False
+    
+    print(f"Loaded {len(df)} products")
+    
+    cache = SeoCache(cache_file) if cache_file else None
+    df = add_seo_data(df, rules, cache, workers, chunk_size)
+    if df is None:
+        return False
+    
     # Save output
     try:
-        df.to_csv(output_csv, index=False, encoding='utf-8')
+        write_table(df, output_csv)
     except Exception as e:
-        print(f"ERROR: Failed to save CSV: {e}")
+        print(f"ERROR: Failed to save output: {e}")
         return False
     
     print("="*80)
@@ -337,15 +690,56 @@ def generate_seo_data(input_csv, output_csv):
     
     return True
 
+def verify_seo_parity(input_csv, rules_file=None):
+    """
+    Check that the column-wise engine reproduces the row-wise output on a file
+    
+    Returns:
+        bool: True if every SEOTitle and KeyWords value is identical
+    """
+    print("="*80)
+    print("SEO PARITY CHECK")
+    print("="*80)
+    
+    rules = read_rules(rules_file)
+    if rules is None:
+        return False
+    
+    try:
+        df = read_table(input_csv)
+    except Exception as e:
+        print(f"ERROR: Failed to read input: {e}")
+        return False
+    
+    if 'Name' not in df.columns:
+        print("ERROR: Missing required columns: ['Name']")
+        return False
+    
+    mismatches = check_parity(df, rules=rules)
+    print(f"Products compared: {len(df)}")
+    print(f"Mismatches: {mismatches}")
+    return mismatches == 0
+
 def main():
     """Main entry point"""
     if len(sys.argv) < 2:
-        print("Usage: python SEO_generator.py <input_csv> [output_csv]")
+        print("Usage: python SEO_generator.py <input_csv> [output_csv] [rules_json] [cache_db] [workers] [chunk_size]")
+        print("       python SEO_generator.py <input_csv> parity [rules_json]")
         print("\nExample:")
         print("  python SEO_generator.py raw_export.csv with_seo.csv")
         sys.exit(1)
     
     input_csv = sys.argv[1]
+    rules_file = sys.argv[3] if len(sys.argv) >= 4 else None  # '' = built-in rules
+    cache_file = sys.argv[4] if len(sys.argv) >= 5 else None
+    workers = int(sys.argv[5]) if len(sys.argv) >= 6 and sys.argv[5] else 1  # 0 = CPU count
+    chunk_size = int(sys.argv[6]) if len(sys.argv) >= 7 and sys.argv[6] else DEFAULT_PARALLEL_CHUNK_SIZE
+    
+    # Compare the column-wise engine with the row-wise functions
+    if len(sys.argv) >= 3 and sys.argv[2].lower() == 'parity':
+        success = verify_seo_parity(input_csv, rules_file)
+        print("SUCCESS" if success else "FAILED")
+        sys.exit(0 if success else 1)
     
     # Default output filename
     if len(sys.argv) >= 3:
@@ -356,7 +750,7 @@ def main():
         output_csv = str(input_path.parent / f"{input_path.stem}_with_seo{input_path.suffix}")
     
     # Run SEO generation
-    success = generate_seo_data(input_csv, output_csv)
+    success = generate_seo_data(input_csv, output_csv, rules_file, cache_file, workers, chunk_size)
     
     if success:
         print("SUCCESS")
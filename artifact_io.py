@@ -0,0 +1,93 @@
+"""
+Artifact I/O
+Reads and writes step tables as CSV, Feather, Parquet or pickle, chosen by file extension
+"""
+
+import importlib.util
+from pathlib import Path
+
+import pandas as pd
+
+import schema
+
+FORMAT_EXTENSIONS = {
+    'csv': '.csv',
+    'feather': '.feather',
+    'parquet': '.parquet',
+    'pickle': '.pkl'
+}
+
+# Library each binary format needs (pickle needs nothing beyond pandas)
+FORMAT_LIBRARIES = {
+    'feather': ['pyarrow'],
+    'parquet': ['pyarrow', 'fastparquet']
+}
+
+def format_available(fmt):
+    """True if the libraries for a format are installed"""
+    libraries = FORMAT_LIBRARIES.get(fmt)
+    if not libraries:
+        return True
+    return any(importlib.util.find_spec(lib) is not None for lib in libraries)
+
+# Picks feather when pyarrow is installed, else pickle (pyarrow is optional)
+AUTO_FORMAT = 'auto'
+
+def resolve_format(fmt):
+    """
+    Return the format to use for intermediates
+
+    'auto' is feather with pyarrow and pickle without it. An explicit
+    feather/parquet falls back to pickle when its libraries are missing.
+
+    Raises:
+        ValueError: For an unknown format name
+    """
+    fmt = (fmt or 'csv').lower()
+    if fmt == AUTO_FORMAT:
+        return 'feather' if format_available('feather') else 'pickle'
+    if fmt not in FORMAT_EXTENSIONS:
+        raise ValueError(f"Unknown intermediate format '{fmt}' (choose from {AUTO_FORMAT}, {', '.join(FORMAT_EXTENSIONS)})")
+    if not format_available(fmt):
+        return 'pickle'
+    return fmt
+
+def artifact_path(path, fmt):
+    """Swap a file name's extension for the given format's (with_seo.csv -> with_seo.feather)"""
+    return Path(path).with_suffix(FORMAT_EXTENSIONS[fmt])
+
+def format_of(path):
+    """Format implied by a file's extension (unknown extensions are treated as CSV)"""
+    suffix = Path(path).suffix.lower()
+    for fmt, extension in FORMAT_EXTENSIONS.items():
+        if suffix == extension:
+            return fmt
+    return 'csv'
+
+def read_table(path, layout=None):
+    """
+    Load a step table from any supported format
+
+    CSV goes through the typed schema loader; layout ('ustore'/'mdsf') is
+    detected from the header unless given.
+    """
+    fmt = format_of(path)
+    if fmt == 'feather':
+        return pd.read_feather(path)
+    if fmt == 'parquet':
+        return pd.read_parquet(path)
+    if fmt == 'pickle':
+        return pd.read_pickle(path)
+    return schema.load_csv(path, layout)
+
+def write_table(df, path):
+    """Save a step table in the format implied by the path's extension"""
+    fmt = format_of(path)
+    if fmt == 'feather':
+        df.reset_index(drop=True).to_feather(path)
+    elif fmt == 'parquet':
+        df.to_parquet(path, index=False)
+    elif fmt == 'pickle':
+        df.reset_index(drop=True).to_pickle(path)
+    else:
+        df.to_csv(path, index=False, encoding='utf-8')
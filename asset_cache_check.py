@@ -0,0 +1,149 @@
+"""
+Asset Cache Check
+Runs the pipeline with the step cache and asset catalog enabled on a small
+project, rewrites an asset file in place and checks that the asset steps run
+again and package the new bytes instead of a cached ZIP
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from artifact_io import read_table, write_table
+
+SCRIPTS_DIR = Path(__file__).parent
+SAMPLE_CSV = SCRIPTS_DIR / 'Final-Sample-AFC.csv'
+ASSET_STEPS = ['asset_linking', 'mdsf_mapping', 'packaging']
+
+def build_project(project_dir, products=4):
+    """
+    Copy the scripts into a throwaway project with a small export and asset trees
+
+    Returns:
+        Path: The content file that the check rewrites
+    """
+    scripts_dir = project_dir / 'scripts'
+    scripts_dir.mkdir(parents=True)
+    for pattern in ('*.py', '*.json'):
+        for script in SCRIPTS_DIR.glob(pattern):
+            shutil.copy(script, scripts_dir / script.name)
+
+    config_file = scripts_dir / 'pipeline_config.json'
+    with open(config_file, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    config['intermediate_format'] = 'csv'
+    config['cache']['enabled'] = True
+    config['asset_catalog'].update({'enabled': True, 'refresh': True, 'full_refresh': False})
+    with open(config_file, 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=4)
+
+    df = read_table(SAMPLE_CSV).head(products)
+    write_table(df, project_dir / config['steps']['filter']['input'])
+
+    # Asset folders dated in the past, so the catalog trusts their mtimes on the next refresh
+    past = time.time() - 3600
+    for product_id in df['uStore_ProductID'].astype(str):
+        content_folder = project_dir / config['paths']['assets_dir'] / f"Product_{product_id}"
+        thumbnail_folder = project_dir / config['paths']['thumbnails_dir'] / f"Product_{product_id}" / "Pages" / "Thumbnails"
+        content_folder.mkdir(parents=True)
+        thumbnail_folder.mkdir(parents=True)
+        content_file = content_folder / f"{product_id}_print.pdf"
+        content_file.write_bytes(b'%PDF original ' + product_id.encode())
+        os.utime(content_file, (past, past))
+    for root in (config['paths']['assets_dir'], config['paths']['thumbnails_dir']):
+        for folder, _, _ in os.walk(project_dir / root):
+            os.utime(folder, (past, past))
+
+    product_id = str(df['uStore_ProductID'].iloc[0])
+    return project_dir / config['paths']['assets_dir'] / f"Product_{product_id}" / f"{product_id}_print.pdf"
+
+def run_pipeline(project_dir):
+    """
+    Run orchestrator.py in the project
+
+    Returns:
+        str: Everything the run printed
+
+    Raises:
+        RuntimeError: If the run fails
+    """
+    result = subprocess.run(
+        [sys.executable, 'orchestrator.py'],
+        cwd=project_dir / 'scripts',
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Pipeline failed:\n{result.stdout}\n{result.stderr}")
+    return result.stdout
+
+def cache_hits(output):
+    """Asset steps the run served from the step cache"""
+    return [step for step in ASSET_STEPS if f"Cache hit for {step} " in output]
+
+def packaged_bytes(project_dir, filename):
+    """Bytes of a file in the package ZIP the run produced"""
+    packages = sorted((project_dir / 'scripts').glob('**/MDSF_Import_Package*.zip'), key=lambda path: path.stat().st_mtime)
+    if not packages:
+        raise RuntimeError("No package ZIP found")
+    with zipfile.ZipFile(packages[-1]) as package:
+        return package.read(filename)
+
+def run_check():
+    """
+    Run the pipeline three times: fresh, after an in-place rewrite, unchanged
+
+    Returns:
+        list: Failure messages (empty when the check passes)
+    """
+    failures = []
+    project_dir = Path(tempfile.mkdtemp(prefix='asset_cache_check_'))
+    try:
+        content_file = build_project(project_dir)
+
+        print("  Run 1: fresh project")
+        run_pipeline(project_dir)
+
+        # Same name, same folder: the folder's mtime does not change
+        folder_mtime = content_file.parent.stat().st_mtime_ns
+        new_bytes = b'%PDF rewritten in place'
+        content_file.write_bytes(new_bytes)
+        if content_file.parent.stat().st_mtime_ns != folder_mtime:
+            failures.append("Rewriting the file changed its folder's mtime; the check cannot reproduce an in-place overwrite")
+
+        print(f"  Run 2: {content_file.name} rewritten in place")
+        hits = cache_hits(run_pipeline(project_dir))
+        if hits:
+            failures.append(f"Cache hits after the rewrite: {', '.join(hits)}")
+        if packaged_bytes(project_dir, content_file.name) != new_bytes:
+            failures.append(f"Package does not contain the rewritten {content_file.name}")
+
+        print("  Run 3: nothing changed")
+        hits = cache_hits(run_pipeline(project_dir))
+        if hits != ASSET_STEPS:
+            failures.append(f"Expected cache hits for {', '.join(ASSET_STEPS)}, got: {', '.join(hits) or 'none'}")
+    finally:
+        shutil.rmtree(project_dir, ignore_errors=True)
+    return failures
+
+def main():
+    """Main entry point"""
+    print("="*80)
+    print("ASSET CACHE CHECK (step cache with asset catalog, file rewritten in place)")
+    print("="*80)
+    failures = run_check()
+    for failure in failures:
+        print(f"ERROR: {failure}")
+    if failures:
+        print("FAILED")
+        sys.exit(1)
+    print("SUCCESS")
+
+if __name__ == "__main__":
+    main()
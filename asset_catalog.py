@@ -0,0 +1,287 @@
+"""
+Asset Catalog
+Persistent SQLite listing of the asset trees' product folders, refreshed incrementally
+"""
+
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from asset_index import DEFAULT_SCAN_WORKERS, LOCAL_FS, THUMBNAIL_SUBDIR, product_folders
+from step_cache import hash_file
+
+# A folder modified this shortly before it was listed can change again within the same
+# mtime tick (coarse on network shares), so its mtime is not trusted on the next refresh
+RACY_SECONDS = 2
+
+def catalog_path(path):
+    """Key of a folder in the catalog (absolute path)"""
+    return os.path.abspath(os.fspath(path))
+
+class AssetCatalog:
+    """
+    Names, sizes, mtimes and (optionally) SHA-256 hashes of the files in every product folder
+
+    The catalog covers what asset linking and packaging read: both asset
+    roots, each static_assets/Product_<id> folder and each
+    static_assets_thumbnails/Product_<id>/Pages/Thumbnails folder. refresh
+    compares each folder's mtime with the one recorded when it was last
+    listed and lists again only the folders that changed: adding, removing
+    or renaming a file changes its folder's mtime, so unchanged folders cost
+    one stat. A file rewritten in place keeps its folder's mtime; a full
+    refresh lists every folder again.
+
+    AssetCatalog has the list_dir of the filesystem layers in asset_index,
+    so an AssetIndex built with fs=catalog is answered from the catalog
+    without touching the share. The catalog is read into memory on first
+    use; refresh writes the folders it changed in one transaction.
+    """
+
+    def __init__(self, path, hashes=False):
+        """
+        Args:
+            path: SQLite file (created on first use)
+            hashes: Also record each file's SHA-256 (read once per new or changed file)
+        """
+        self.path = Path(path)
+        self.hashes = hashes
+        self.folders = None  # folder -> (mtime_ns, [(name, is_dir, size, mtime_ns, sha256)])
+        self._lock = threading.Lock()
+
+    def connect(self):
+        """Open the database, creating the tables on first use"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)  # Explicit transactions
+        db.execute("PRAGMA journal_mode=WAL")  # Store workers read while a refresh writes
+        db.execute("CREATE TABLE IF NOT EXISTS folders (path TEXT PRIMARY KEY, mtime_ns INTEGER)")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "folder TEXT NOT NULL, position INTEGER NOT NULL, name TEXT NOT NULL, is_dir INTEGER NOT NULL, "
+            "size INTEGER, mtime_ns INTEGER, sha256 TEXT, PRIMARY KEY (folder, position))"
+        )
+        return db
+
+    def load(self):
+        """Read the whole catalog into memory (once)"""
+        with self._lock:
+            if self.folders is not None:
+                return
+            folders = {}
+            db = self.connect()
+            try:
+                for path, mtime_ns in db.execute("SELECT path, mtime_ns FROM folders"):
+                    folders[path] = (mtime_ns, [])
+                for path, name, is_dir, size, mtime_ns, sha256 in db.execute(
+                    "SELECT folder, name, is_dir, size, mtime_ns, sha256 FROM files ORDER BY folder, position"
+                ):
+                    folders[path][1].append((name, bool(is_dir), size, mtime_ns, sha256))
+            finally:
+                db.close()
+            self.folders = folders
+
+    def list_dir(self, path):
+        """
+        (name, is_dir) for every entry of a cataloged folder, in the order it was listed
+
+        Raises:
+            FileNotFoundError: If the folder is not in the catalog
+        """
+        self.load()
+        record = self.folders.get(catalog_path(path))
+        if record is None:
+            raise FileNotFoundError(f"Not in asset catalog: {path}")
+        return [(name, is_dir) for name, is_dir, *_ in record[1]]
+
+    def file_info(self, path):
+        """(size, mtime_ns, sha256) of a cataloged file (sha256 None without hashes), or None"""
+        self.load()
+        folder, name = os.path.split(catalog_path(path))
+        record = self.folders.get(folder)
+        for entry_name, is_dir, size, mtime_ns, sha256 in (record[1] if record else []):
+            if entry_name == name and not is_dir:
+                return size, mtime_ns, sha256
+        return None
+
+    def check_folder(self, path, fs, full=False, hash_files=True):
+        """
+        Listing of a folder if it changed since it was cataloged
+
+        Returns:
+            The folder's new record, the current record if its mtime is
+            unchanged, or None if the folder is gone
+        """
+        known = self.folders.get(path)
+        hashing = self.hashes and hash_files
+        try:
+            mtime_ns = fs.mtime_ns(path)
+            unhashed = hashing and known is not None and any(not entry[1] and not entry[4] for entry in known[1])
+            if known is not None and not full and known[0] == mtime_ns and not unhashed:
+                return known
+            listed_at = time.time_ns()
+            scanned = fs.scan_dir(path)
+        except OSError:
+            return None
+
+        # Hashes of files whose size and mtime did not change are kept
+        previous = {name: (size, file_mtime, sha256) for name, _, size, file_mtime, sha256 in (known[1] if known else [])}
+        entries = []
+        for name, is_dir, size, file_mtime in scanned:
+            sha256 = None
+            if not is_dir and hashing:
+                old = previous.get(name)
+                if old is not None and old[:2] == (size, file_mtime) and old[2]:
+                    sha256 = old[2]
+                else:
+                    try:
+                        sha256 = hash_file(os.path.join(path, name))
+                    except OSError:
+                        pass
+            entries.append((name, is_dir, size, file_mtime, sha256))
+
+        if listed_at - mtime_ns < RACY_SECONDS * 1_000_000_000:
+            mtime_ns = None  # Listed again next time
+        return (mtime_ns, entries)
+
+    def refresh(self, assets_dir, thumbnails_dir, workers=DEFAULT_SCAN_WORKERS, fs=LOCAL_FS, full=False):
+        """
+        Bring the catalog up to date with the asset trees
+
+        The roots are checked first (a new or deleted product folder changes
+        its root's mtime), then every product folder by a pool of worker
+        threads. Folders that disappeared are dropped from the catalog.
+
+        Args:
+            assets_dir: Path to static_assets folder
+            thumbnails_dir: Path to static_assets_thumbnails folder
+            workers: Threads checking folders (1 = one at a time)
+            fs: Filesystem layer (LocalFS, or LatencyFS to simulate a share)
+            full: List every folder again, whatever its mtime
+
+        Returns:
+            dict: 'folders' checked, 'listed' (new or changed) and 'removed'
+        """
+        self.load()
+        assets_root = catalog_path(assets_dir)
+        thumbnails_root = catalog_path(thumbnails_dir)
+        changed = set()
+
+        def update(path, record):
+            if record is not self.folders.get(path):
+                changed.add(path)
+                if record is None:
+                    self.folders.pop(path, None)
+                else:
+                    self.folders[path] = record
+
+        for root in (assets_root, thumbnails_root):
+            update(root, self.check_folder(root, fs, full, hash_files=False))
+
+        wanted = sorted(product_folders(assets_root, self).values())
+        wanted += sorted(os.path.join(folder, THUMBNAIL_SUBDIR) for folder in product_folders(thumbnails_root, self).values())
+        check = lambda path: self.check_folder(path, fs, full)
+        if workers <= 1 or len(wanted) <= 1:
+            for path in wanted:
+                update(path, check(path))
+        else:
+            executor = ThreadPoolExecutor(max_workers=workers)
+            futures = [executor.submit(check, path) for path in wanted]
+            try:
+                for path, future in zip(wanted, futures):
+                    update(path, future.result())
+            finally:
+                for future in futures:
+                    future.cancel()  # Queued checks only (shutdown(cancel_futures=True) needs Python 3.9)
+                executor.shutdown()
+
+        # Product folders deleted from the roots
+        keep = set(wanted)
+        prefixes = (assets_root + os.sep, thumbnails_root + os.sep)
+        stale = [path for path in self.folders if path.startswith(prefixes) and path not in keep]
+        for path in stale:
+            update(path, None)
+
+        self.save(changed)
+        removed = len([path for path in changed if path not in self.folders])
+        return {'folders': len(wanted) + 2, 'listed': len(changed) - removed, 'removed': removed}
+
+    def save(self, paths):
+        """Write the records of the given folders (deleting those no longer cataloged)"""
+        if not paths:
+            return
+        db = self.connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            for path in sorted(paths):
+                db.execute("DELETE FROM files WHERE folder = ?", (path,))
+                record = self.folders.get(path)
+                if record is None:
+                    db.execute("DELETE FROM folders WHERE path = ?", (path,))
+                    continue
+                db.execute("INSERT OR REPLACE INTO folders (path, mtime_ns) VALUES (?, ?)", (path, record[0]))
+                db.executemany(
+                    "INSERT INTO files (folder, position, name, is_dir, size, mtime_ns, sha256) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    ((path, position, *entry) for position, entry in enumerate(record[1]))
+                )
+            db.execute("COMMIT")
+        finally:
+            db.close()
+
+    def fingerprint(self, *directories):
+        """
+        Fingerprint of the cataloged folders under one or more roots, from file names, sizes and mtimes
+
+        Stands in for step_cache.fingerprint_tree over the same roots without
+        walking them; only the folders asset linking and packaging read count.
+        Only as fresh as the last refresh: after an incremental one, a file
+        rewritten in place still shows its old size and mtime.
+        """
+        self.load()
+        digest = hashlib.sha256()
+        for directory in directories:
+            root = catalog_path(directory)
+            digest.update(root.encode('utf-8'))
+            for path in sorted(path for path in self.folders if path == root or path.startswith(root + os.sep)):
+                rel_dir = os.path.relpath(path, root)
+                for name, is_dir, size, mtime_ns, _ in self.folders[path][1]:
+                    if not is_dir:
+                        digest.update(f"{rel_dir}/{name}|{size}|{mtime_ns}\n".encode('utf-8'))
+        return digest.hexdigest()
+
+def main():
+    """Main entry point"""
+    if len(sys.argv) < 4:
+        print("Usage: python asset_catalog.py <catalog_file> <assets_dir> <thumbnails_dir> [scan_workers] [full] [hashes]")
+        print("\nExample:")
+        print("  python asset_catalog.py ../.asset_catalog.sqlite ../static_assets ../static_assets_thumbnails")
+        print("\nArguments:")
+        print(f"  scan_workers: folders checked concurrently, 1 = sequential (default: {DEFAULT_SCAN_WORKERS})")
+        print("  full: true/false, list every folder again whatever its mtime (default: false)")
+        print("  hashes: true/false, record SHA-256 hashes of the files (default: false)")
+        sys.exit(1)
+
+    catalog_file, assets_dir, thumbnails_dir = sys.argv[1:4]
+    scan_workers = int(sys.argv[4]) if len(sys.argv) > 4 else DEFAULT_SCAN_WORKERS
+    full = sys.argv[5].lower() in ['true', '1', 'yes'] if len(sys.argv) > 5 else False
+    hashes = sys.argv[6].lower() in ['true', '1', 'yes'] if len(sys.argv) > 6 else False
+
+    for folder in (assets_dir, thumbnails_dir):
+        if not Path(folder).exists():
+            print(f"ERROR: Folder not found: {folder}")
+            sys.exit(1)
+
+    start = time.time()
+    counts = AssetCatalog(catalog_file, hashes).refresh(assets_dir, thumbnails_dir, scan_workers, full=full)
+    print(f"Asset catalog: {catalog_file}")
+    print(f"  Folders checked: {counts['folders']}")
+    print(f"  Listed (new or changed): {counts['listed']}")
+    print(f"  Removed: {counts['removed']}")
+    print(f"  Time: {time.time() - start:.2f}s")
+    print("SUCCESS")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Asset Index
+One scandir pass over the asset and thumbnail trees, mapping product IDs to their files
+"""
+
+import fnmatch
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Content files (PDFs) directly in static_assets/Product_<id>, PROOF files excluded
+CONTENT_PATTERN = '*.pdf'
+PROOF_MARKER = 'proof'
+
+# Thumbnails in static_assets_thumbnails/Product_<id>/Pages/Thumbnails, listed one extension after another
+THUMBNAIL_PATTERNS = ['*.jpg', '*.jpeg', '*.png', '*.gif', '*.bmp']
+THUMBNAIL_SUBDIR = os.path.join('Pages', 'Thumbnails')
+
+PRODUCT_PREFIX = 'Product_'
+
+# Directory listings in flight at once (they wait on the share, not the CPU)
+DEFAULT_SCAN_WORKERS = 8
+
+class LocalFS:
+    """Directory listings from the local filesystem (or a mounted share)"""
+
+    def list_dir(self, path):
+        """
+        (name, is_dir) for every entry of a directory, in directory order
+
+        Raises:
+            OSError: If the directory is missing or unreadable
+        """
+        with os.scandir(path) as entries:
+            return [(entry.name, entry.is_dir()) for entry in entries]
+
+    def mtime_ns(self, path):
+        """
+        Modification time of a directory, in nanoseconds
+
+        Raises:
+            OSError: If the directory is missing or unreadable
+        """
+        return os.stat(path).st_mtime_ns
+
+    def scan_dir(self, path):
+        """
+        (name, is_dir, size, mtime_ns) for every entry of a directory, in directory order
+
+        Size and mtime are None for subdirectories. Entries removed while the
+        directory is being read are left out.
+
+        Raises:
+            OSError: If the directory is missing or unreadable
+        """
+        found = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        found.append((entry.name, True, None, None))
+                    else:
+                        stat = entry.stat()
+                        found.append((entry.name, False, stat.st_size, stat.st_mtime_ns))
+                except OSError:
+                    continue
+        return found
+
+class LatencyFS:
+    """
+    Stand-in filesystem adding a fixed delay to every listing
+
+    Reproduces a network share's round-trip cost on a local tree, e.g. to
+    compare scan_workers settings:
+        AssetIndex(assets_dir, thumbnails_dir, workers=16, fs=LatencyFS(0.02))
+    """
+
+    def __init__(self, latency=0.02, fs=None):
+        self.latency = latency
+        self.fs = fs or LocalFS()
+
+    def list_dir(self, path):
+        """LocalFS.list_dir after sleeping latency seconds"""
+        time.sleep(self.latency)
+        return self.fs.list_dir(path)
+
+    def mtime_ns(self, path):
+        """LocalFS.mtime_ns after sleeping latency seconds"""
+        time.sleep(self.latency)
+        return self.fs.mtime_ns(path)
+
+    def scan_dir(self, path):
+        """LocalFS.scan_dir after sleeping latency seconds"""
+        time.sleep(self.latency)
+        return self.fs.scan_dir(path)
+
+LOCAL_FS = LocalFS()
+
+def list_names(path, fs=LOCAL_FS):
+    """Entry names of a directory, in directory order ([] if it is missing or unreadable)"""
+    try:
+        return [name for name, _ in fs.list_dir(path)]
+    except OSError:
+        return []
+
+def product_folders(root, fs=LOCAL_FS):
+    """Product ID (folder name after 'Product_') -> path, for every Product_<id> folder in root (platform case rules)"""
+    folders = {}
+    try:
+        entries = fs.list_dir(root)
+    except OSError:
+        return folders
+    for name, is_dir in entries:
+        prefix = name[:len(PRODUCT_PREFIX)]
+        if os.path.normcase(prefix) == os.path.normcase(PRODUCT_PREFIX) and is_dir:
+            folders[name[len(PRODUCT_PREFIX):]] = os.path.join(root, name)
+    return folders
+
+def content_names(names):
+    """
+    PDFs among a product folder's entry names, PROOF files excluded
+
+    Patterns match like Path.glob did: fnmatch follows the platform's case
+    rules (exact on Linux, case-insensitive on Windows), so the files found
+    are the same as before.
+    """
+    return [
+        name for name in names
+        if fnmatch.fnmatch(name, CONTENT_PATTERN) and PROOF_MARKER not in name.lower()
+    ]
+
+def thumbnail_names(names):
+    """Images among a thumbnail folder's entry names, grouped by extension in THUMBNAIL_PATTERNS order"""
+    return [name for pattern in THUMBNAIL_PATTERNS for name in names if fnmatch.fnmatch(name, pattern)]
+
+class AssetIndex:
+    """
+    Content files and thumbnails of every product folder, from one pass over both trees
+
+    Each root is listed once; then each product folder is listed once (its
+    Pages/Thumbnails folder, for thumbnails). Looking a product up is a
+    dictionary access, whether or not it has a folder. Passing product_ids
+    limits the pass to those products' folders, so a single store does not
+    list the folders of every store on the share.
+
+    Product folders are listed by a pool of worker threads, since on a share
+    each listing is a round-trip spent waiting. Results are merged in
+    product ID order, so the index (and on_product's call order) is the same
+    for any number of workers.
+    """
+
+    def __init__(self, assets_dir, thumbnails_dir, product_ids=None, on_product=None,
+                 workers=DEFAULT_SCAN_WORKERS, fs=LOCAL_FS):
+        """
+        Args:
+            assets_dir: Path to static_assets folder
+            thumbnails_dir: Path to static_assets_thumbnails folder
+            product_ids: Only index these products (None = every product folder)
+            on_product: Called as on_product(product_id, content_files, thumbnail_files)
+                        after each product is indexed (e.g. to checkpoint progress)
+            workers: Threads listing product folders (1 = one listing at a time)
+            fs: Filesystem layer (LocalFS, or LatencyFS to simulate a share)
+        """
+        self.assets_dir = Path(assets_dir)
+        self.thumbnails_dir = Path(thumbnails_dir)
+        self.fs = fs
+        self.content = {}
+        self.thumbnails = {}
+        self.listings = {}  # product_id -> (asset folder names, thumbnail folder names), for has_file
+
+        self.asset_folders = product_folders(self.assets_dir, fs)
+        self.thumbnail_folders = product_folders(self.thumbnails_dir, fs)
+        if product_ids is None:
+            wanted = sorted(self.asset_folders.keys() | self.thumbnail_folders.keys())
+        else:
+            wanted = sorted({str(product_id) for product_id in product_ids})
+
+        if workers <= 1 or len(wanted) <= 1:
+            for product_id in wanted:
+                self.add_product(product_id, self.list_product(product_id), on_product)
+            return
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        futures = [executor.submit(self.list_product, product_id) for product_id in wanted]
+        try:
+            for product_id, future in zip(wanted, futures):
+                self.add_product(product_id, future.result(), on_product)
+        finally:
+            for future in futures:
+                future.cancel()  # Stop queued listings if indexing is interrupted
+            executor.shutdown()
+
+    def list_product(self, product_id):
+        """Entry names of a product's asset folder and thumbnail folder ([] where missing)"""
+        asset_names = []
+        image_names = []
+        if product_id in self.asset_folders:
+            asset_names = list_names(self.asset_folders[product_id], self.fs)
+        if product_id in self.thumbnail_folders:
+            image_names = list_names(os.path.join(self.thumbnail_folders[product_id], THUMBNAIL_SUBDIR), self.fs)
+        return asset_names, image_names
+
+    def add_product(self, product_id, listing, on_product=None):
+        """Record a product's folder listings and the files linked from them"""
+        asset_names, image_names = listing
+        content_files = content_names(asset_names)
+        thumbnail_files = thumbnail_names(image_names)
+        if content_files:
+            self.content[product_id] = content_files
+        if thumbnail_files:
+            self.thumbnails[product_id] = thumbnail_files
+        if asset_names or image_names:
+            self.listings[product_id] = (
+                {os.path.normcase(name) for name in asset_names},
+                {os.path.normcase(name) for name in image_names}
+            )
+        if on_product is not None:
+            on_product(product_id, content_files, thumbnail_files)
+
+    def content_files(self, product_id):
+        """Content PDF names of a product ([] if none)"""
+        return self.content.get(str(product_id), [])
+
+    def thumbnail_files(self, product_id):
+        """Thumbnail image names of a product ([] if none)"""
+        return self.thumbnails.get(str(product_id), [])
+
+    def has_file(self, product_id, filename, thumbnail=False):
+        """
+        Whether a product's asset folder (thumbnail folder if thumbnail) holds filename
+
+        Answered from the listings for indexed products; a name with a path
+        in it is not covered by a listing and is checked on disk.
+        """
+        product_id = str(product_id)
+        if os.path.basename(filename) != filename:
+            if thumbnail:
+                return (self.thumbnails_dir / f"{PRODUCT_PREFIX}{product_id}" / THUMBNAIL_SUBDIR / filename).exists()
+            return (self.assets_dir / f"{PRODUCT_PREFIX}{product_id}" / filename).exists()
+        asset_names, image_names = self.listings.get(product_id, ((), ()))
+        return os.path.normcase(filename) in (image_names if thumbnail else asset_names)
@@ -8,78 +8,50 @@ import pandas as pd
 import sys
 from pathlib import Path
 
+from artifact_io import read_table, write_table
+from asset_catalog import AssetCatalog
+from asset_index import AssetIndex, DEFAULT_SCAN_WORKERS, LOCAL_FS, THUMBNAIL_SUBDIR, content_names, list_names, thumbnail_names
+from checkpoint import Checkpoint, input_signature
+
 def find_content_files(product_id, assets_dir):
     """
-    Find content PDFs for a product, excluding PROOF files
+    Find content PDFs for a single product, excluding PROOF files
     Returns list of PDF filenames (not full paths, just names)
-    """
-    product_folder = assets_dir / f"Product_{product_id}"
-    
-    if not product_folder.exists():
-        return []
-    
-    # Find all PDF files
-    pdf_files = list(product_folder.glob("*.pdf"))
-    
-    # Filter out PROOF files (case insensitive)
-    non_proof_files = [
-        f.name for f in pdf_files 
-        if 'proof' not in f.name.lower()
-    ]
     
-    return non_proof_files
+    add_asset_links uses an AssetIndex instead of calling this per product.
+    """
+    return content_names(list_names(Path(assets_dir) / f"Product_{product_id}"))
 
 def find_thumbnail_files(product_id, thumbnails_dir):
     """
-    Find all thumbnail images for a product
+    Find all thumbnail images for a single product
     Returns list of image filenames (not full paths, just names)
     """
-    thumbnail_folder = thumbnails_dir / f"Product_{product_id}" / "Pages" / "Thumbnails"
-    
-    if not thumbnail_folder.exists():
-        return []
-    
-    # Find all image files
-    image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.bmp']
-    image_files = []
-    
-    for ext in image_extensions:
-        image_files.extend(thumbnail_folder.glob(f"*{ext}"))
-    
-    # Return just filenames
-    return [f.name for f in image_files]
+    return thumbnail_names(list_names(Path(thumbnails_dir) / f"Product_{product_id}" / THUMBNAIL_SUBDIR))
 
-def link_assets(input_csv, output_csv, assets_dir, thumbnails_dir):
+def add_asset_links(df, assets_dir, thumbnails_dir, checkpoint_file=None, checkpoint_interval=15.0,
+                    scan_workers=DEFAULT_SCAN_WORKERS, catalog=None):
     """
-    Link assets to products in CSV and populate ContentFile, Icon, and DetailImage columns
+    Populate ContentFile, Icon, and DetailImage columns on an already-loaded DataFrame
+    
+    Args:
+        df: Products with uStore_ProductID
+        assets_dir: Path to static_assets folder
+        thumbnails_dir: Path to static_assets_thumbnails folder
+        checkpoint_file: Where to save scan progress; a rerun on the same products
+                         and folders reuses the products already scanned
+        checkpoint_interval: Seconds between checkpoint saves (0 disables checkpoints)
+        scan_workers: Threads listing product folders concurrently (1 = sequential)
+        catalog: AssetCatalog to read product folders from instead of the asset trees
     
     Returns:
-        bool: True if successful, False otherwise
+        DataFrame: Products with asset columns, or None if linking failed
     """
-    print("="*80)
-    print("ASSET LINKER")
-    print("="*80)
-    print(f"\nReading CSV: {input_csv}")
-    
-    # Validate input file
-    if not Path(input_csv).exists():
-        print(f"ERROR: Input file not found: {input_csv}")
-        return False
-    
-    # Read CSV
-    try:
-        df = pd.read_csv(input_csv, encoding='utf-8', keep_default_na=False)
-    except Exception as e:
-        print(f"ERROR: Failed to read CSV: {e}")
-        return False
-    
-    print(f"Loaded {len(df)} products")
-    
     # Validate required columns
     if 'uStore_ProductID' not in df.columns:
         print("ERROR: Missing required column: uStore_ProductID")
         print(f"Available columns: {list(df.columns)}")
-        return False
+        return None
     
     # Convert paths to Path objects
     assets_path = Path(assets_dir)
@@ -88,80 +60,76 @@ def link_assets(input_csv, output_csv, assets_dir, thumbnails_dir):
     # Verify directories exist
     if not assets_path.exists():
         print(f"ERROR: Assets directory not found: {assets_path}")
-        return False
+        return None
     
     if not thumbnails_path.exists():
         print(f"ERROR: Thumbnails directory not found: {thumbnails_path}")
-        return False
+        return None
     
     print(f"Assets directory: {assets_path}")
     print(f"Thumbnails directory: {thumbnails_path}")
     
-    # Add columns if they don't exist
-    if 'ContentFile' not in df.columns:
-        df['ContentFile'] = ''
-    if 'Icon' not in df.columns:
-        df['Icon'] = ''
-    if 'DetailImage' not in df.columns:
-        df['DetailImage'] = ''
+    df = df.copy()
+    
+    # Resume from a checkpoint of a previous, interrupted scan of the same products
+    checkpoint = None
+    linked = {}
+    if checkpoint_file and checkpoint_interval:
+        signature = input_signature(df[['uStore_ProductID']], assets_path.resolve(), thumbnails_path.resolve())
+        checkpoint = Checkpoint(checkpoint_file, signature, checkpoint_interval)
+        saved = checkpoint.load()
+        if saved:
+            linked = saved['linked']
+            print(f"Resuming from checkpoint: {len(linked)} products already scanned")
+    
+    print(f"\nProcessing {len(df)} products...")
+    
+    product_ids = df['uStore_ProductID'].tolist()
+    product_names = df['Name'].tolist() if 'Name' in df.columns else [f'Product {pid}' for pid in product_ids]
+    
+    def scanned(product_id, content_files, thumbnail_files):
+        if checkpoint is not None:
+            linked[product_id] = [content_files, thumbnail_files]
+            if checkpoint.due():
+                checkpoint.save({'linked': linked})
+    
+    # One pass over the product folders not already in the checkpoint; linking is then lookups only
+    pending = {str(pid) for pid in product_ids} - linked.keys()
+    index = AssetIndex(assets_path, thumbnails_path, pending, scanned, scan_workers,
+                       fs=catalog if catalog is not None else LOCAL_FS)
+    files = [
+        linked[str(pid)] if str(pid) in linked else (index.content_files(pid), index.thumbnail_files(pid))
+        for pid in product_ids
+    ]
+    
+    content_column = [', '.join(content_files) for content_files, _ in files]
+    thumbnail_column = [', '.join(thumbnail_files) for _, thumbnail_files in files]
+    df['ContentFile'] = pd.Series(content_column, index=df.index)
+    df['Icon'] = pd.Series(thumbnail_column, index=df.index)
+    df['DetailImage'] = df['Icon']  # Use same thumbnails for both
     
     # Track statistics
     stats = {
-        'products_with_pdfs': 0,
-        'products_without_pdfs': 0,
-        'products_with_thumbnails': 0,
-        'products_without_thumbnails': 0,
-        'total_pdfs': 0,
-        'total_thumbnails': 0
+        'products_with_pdfs': sum(1 for content_files, _ in files if content_files),
+        'products_without_pdfs': sum(1 for content_files, _ in files if not content_files),
+        'products_with_thumbnails': sum(1 for _, thumbnail_files in files if thumbnail_files),
+        'products_without_thumbnails': sum(1 for _, thumbnail_files in files if not thumbnail_files),
+        'total_pdfs': sum(len(content_files) for content_files, _ in files),
+        'total_thumbnails': sum(len(thumbnail_files) for _, thumbnail_files in files)
     }
     
-    missing_pdfs = []
-    missing_thumbnails = []
+    missing_pdfs = [(pid, name) for pid, name, (content_files, _) in zip(product_ids, product_names, files)
+                    if not content_files]
+    missing_thumbnails = [(pid, name) for pid, name, (_, thumbnail_files) in zip(product_ids, product_names, files)
+                          if not thumbnail_files]
     
-    print(f"\nProcessing {len(df)} products...")
-    
-    # Process each product
-    for idx, row in df.iterrows():
-        product_id = row['uStore_ProductID']
-        product_name = row.get('Name', f'Product {product_id}')
-        
-        # Find content files (PDFs)
-        content_files = find_content_files(product_id, assets_path)
-        if content_files:
-            df.at[idx, 'ContentFile'] = ', '.join(content_files)
-            stats['products_with_pdfs'] += 1
-            stats['total_pdfs'] += len(content_files)
-        else:
-            df.at[idx, 'ContentFile'] = ''
-            stats['products_without_pdfs'] += 1
-            missing_pdfs.append((product_id, product_name))
-        
-        # Find thumbnail files
-        thumbnail_files = find_thumbnail_files(product_id, thumbnails_path)
-        if thumbnail_files:
-            thumbnails_str = ', '.join(thumbnail_files)
-            df.at[idx, 'Icon'] = thumbnails_str
-            df.at[idx, 'DetailImage'] = thumbnails_str  # Use same thumbnails for both
-            stats['products_with_thumbnails'] += 1
-            stats['total_thumbnails'] += len(thumbnail_files)
-        else:
-            df.at[idx, 'Icon'] = ''
-            df.at[idx, 'DetailImage'] = ''
-            stats['products_without_thumbnails'] += 1
-            missing_thumbnails.append((product_id, product_name))
-    
-    # Save the updated CSV
-    try:
-        df.to_csv(output_csv, index=False, encoding='utf-8')
-    except Exception as e:
-        print(f"ERROR: Failed to save CSV: {e}")
-        return False
+    if checkpoint is not None:
+        checkpoint.clear()
     
     # Print report
     print("\n" + "="*80)
     print("ASSET LINKING COMPLETE")
     print("="*80)
-    print(f"\nOutput saved to: {output_csv}")
     print(f"\nStatistics:")
     print(f"  Total products processed: {len(df)}")
     print(f"  Products with PDFs: {stats['products_with_pdfs']}")
@@ -197,6 +165,54 @@ def link_assets(input_csv, output_csv, assets_dir, thumbnails_dir):
     
     print("\n" + "="*80)
     
+    return df
+
+def link_assets(input_csv, output_csv, assets_dir, thumbnails_dir, checkpoint_interval=15.0,
+                scan_workers=DEFAULT_SCAN_WORKERS, catalog_file=None):
+    """
+    Link assets to products in CSV and populate ContentFile, Icon, and DetailImage columns
+    
+    Progress is checkpointed to <output_csv>.checkpoint.json so an interrupted
+    run picks up where it stopped. With catalog_file, product folders are
+    read from that asset catalog (see asset_catalog.py) as last refreshed.
+    
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    print("="*80)
+    print("ASSET LINKER")
+    print("="*80)
+    print(f"\nReading CSV: {input_csv}")
+    
+    # Validate input file
+    if not Path(input_csv).exists():
+        print(f"ERROR: Input file not found: {input_csv}")
+        return False
+    
+    # Read CSV
+    try:
+        df = read_table(input_csv)
+    except Exception as e:
+        print(f"ERROR: Failed to read input: {e}")
+        return False
+    
+    print(f"Loaded {len(df)} products")
+    
+    catalog = AssetCatalog(catalog_file) if catalog_file else None
+    df = add_asset_links(df, assets_dir, thumbnails_dir, f"{output_csv}.checkpoint.json", checkpoint_interval,
+                         scan_workers, catalog)
+    if df is None:
+        return False
+    
+    # Save the updated CSV
+    try:
+        write_table(df, output_csv)
+    except Exception as e:
+        print(f"ERROR: Failed to save output: {e}")
+        return False
+    
+    print(f"Output saved to: {output_csv}")
+    
     # Return success if at least some assets were found
     # This is not a critical failure if some products are missing assets
     return True
@@ -204,18 +220,27 @@ def link_assets(input_csv, output_csv, assets_dir, thumbnails_dir):
 def main():
     """Main entry point"""
     if len(sys.argv) < 4:
-        print("Usage: python asset_linker.py <input_csv> <output_csv> <assets_dir> <thumbnails_dir>")
+        print("Usage: python asset_linker.py <input_csv> <output_csv> <assets_dir> <thumbnails_dir> [checkpoint_seconds] "
+              "[scan_workers] [catalog_file]")
         print("\nExample:")
         print("  python asset_linker.py with_seo.csv with_assets.csv ../static_assets ../static_assets_thumbnails")
+        print("\nArguments:")
+        print("  checkpoint_seconds: seconds between progress checkpoints, 0 disables (default: 15)")
+        print(f"  scan_workers: product folders listed concurrently, 1 = sequential (default: {DEFAULT_SCAN_WORKERS})")
+        print("  catalog_file: asset catalog to read product folders from (refreshed by asset_catalog.py)")
         sys.exit(1)
     
     input_csv = sys.argv[1]
     output_csv = sys.argv[2]
     assets_dir = sys.argv[3]
     thumbnails_dir = sys.argv[4]
+    checkpoint_interval = float(sys.argv[5]) if len(sys.argv) > 5 else 15.0
+    scan_workers = int(sys.argv[6]) if len(sys.argv) > 6 else DEFAULT_SCAN_WORKERS
+    catalog_file = sys.argv[7] if len(sys.argv) > 7 and sys.argv[7] else None
     
     # Run asset linking
-    success = link_assets(input_csv, output_csv, assets_dir, thumbnails_dir)
+    success = link_assets(input_csv, output_csv, assets_dir, thumbnails_dir, checkpoint_interval, scan_workers,
+                          catalog_file)
     
     if success:
         print("SUCCESS")
@@ -0,0 +1,369 @@
+"""
+Pipeline Benchmark
+Generates synthetic uStore exports and asset trees and times every migration step
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import shutil
+import sys
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import store_filter
+import SEO_generator
+import asset_linker
+import fields_mapper
+import packager
+from pipeline_metrics import MetricsCollector, compare_runs
+
+EXPORT_COLUMNS = [
+    'Name', 'DisplayName', 'Type', 'TicketTemplate', 'ContentFile', 'SKU/ProductId',
+    'BriefDescription', 'LongDescription', 'Active', 'Icon', 'DetailImage', 'KeyWords',
+    'SEOTitle', 'MetaDescription', 'QuantityType', 'MaxOrderQuantityPermitted',
+    'MobileSupported', 'StoreFront/Categories', 'uStore_ProductID', 'uStore_StoreID',
+    'uStore_StoreName'
+]
+
+PRODUCT_TYPES = ['Business Card', 'Sales Aid', 'Flyer', 'Brochure', 'Letterhead', 'Envelope',
+                 'Postcard', 'Poster', 'Banner', 'Appointment Card', 'Registration Form',
+                 'Booklet', 'Label', 'Notepad', 'Folder', 'Sign']
+TOPICS = ['Healthier Bottom Line', 'What is Urgent Care?', 'Flu Shots', 'Grand Opening',
+          'Occupational Medicine', 'Patient Intake', 'Open Enrollment', 'Wellness Program',
+          'Holiday Hours', 'Community Outreach']
+LOCATIONS = ['Portland', 'Beaverton', 'Hillsboro', 'Salem', 'Eugene', 'Bend', 'Gresham',
+             'Tigard', 'Medford', 'Corvallis']
+SIZES = ['8.5" x 11"', '3.5" x 2"', '11" x 17"', '4" x 6"', '5.5" x 8.5"', '24" x 36"']
+SIDES = ['1 sided', '2 sided']
+CATEGORY_NAMES = ['Marketing', 'Sales Aids', 'Stationery', 'Signage', 'Forms', 'Events',
+                  'Clinical', 'Recruiting', 'Promotional', 'Internal']
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+BASE_PRODUCT_ID = 100000
+BASE_STORE_ID = 1000
+
+def _pick(values, index):
+    """Vectorized choice of values[index % len(values)] as a string Series"""
+    return pd.Series(np.asarray(values, dtype=object)[index % len(values)])
+
+def generate_export(products, stores=1, description_lines=3, category_depth=2, seed=42):
+    """
+    Build a synthetic complete uStore export with the real column layout
+
+    Products are spread round-robin over the stores, so the benchmark store
+    (the first one) holds ceil(products / stores) rows.
+
+    Args:
+        products: Total number of products in the export
+        stores: Number of stores the products belong to
+        description_lines: Lines in each LongDescription (BriefDescription gets half)
+        category_depth: Category levels below the store name
+        seed: Random seed (same arguments always give the same export)
+
+    Returns:
+        DataFrame: Synthetic export
+    """
+    rng = np.random.default_rng(seed)
+    index = np.arange(products)
+    product_ids = BASE_PRODUCT_ID + index
+    store_index = index % stores
+
+    ptype = _pick(PRODUCT_TYPES, rng.integers(0, len(PRODUCT_TYPES), products))
+    topic = _pick(TOPICS, rng.integers(0, len(TOPICS), products))
+    location = _pick(LOCATIONS, rng.integers(0, len(LOCATIONS), products))
+    size = _pick(SIZES, rng.integers(0, len(SIZES), products))
+    sides = _pick(SIDES, rng.integers(0, len(SIDES), products))
+    ids = pd.Series(product_ids).astype(str)
+    store_names = _pick([f"Synthetic Store {i + 1}" for i in range(stores)], store_index)
+
+    name = '"' + topic + '" ' + location + ' ' + ptype
+    brief = size + ', ' + sides
+    for line in range(1, max(description_lines // 2, 1)):
+        brief = brief + f'\nUpdated {line:02d}/2024'
+    long_description = pd.Series([''] * products, dtype=object)
+    for line in range(description_lines):
+        text = 'Line ' + str(line + 1) + ': ' + topic + ' for ' + location + ' clinics, ' + size
+        long_description = text if line == 0 else long_description + '\n' + text
+
+    categories = store_names
+    for level in range(category_depth):
+        categories = categories + '/' + _pick(CATEGORY_NAMES, rng.integers(0, len(CATEGORY_NAMES), products))
+
+    image = ids.str.zfill(8) + '-0000-4000-8000-000000000000.jpg'
+
+    return pd.DataFrame({
+        'Name': name,
+        'DisplayName': name,
+        'Type': 'Document',
+        'TicketTemplate': ptype + ' ' + size,
+        'ContentFile': ids + '_print.pdf',
+        'SKU/ProductId': '',
+        'BriefDescription': brief,
+        'LongDescription': long_description,
+        'Active': True,
+        'Icon': image,
+        'DetailImage': image,
+        'KeyWords': '',
+        'SEOTitle': '',
+        'MetaDescription': brief,
+        'QuantityType': 'Any',
+        'MaxOrderQuantityPermitted': '',
+        'MobileSupported': True,
+        'StoreFront/Categories': categories,
+        'uStore_ProductID': product_ids,
+        'uStore_StoreID': BASE_STORE_ID + store_index,
+        'uStore_StoreName': store_names
+    }, columns=EXPORT_COLUMNS)
+
+def generate_assets(df, assets_dir, thumbnails_dir, pdf_kb=16):
+    """
+    Create Product_<id> asset folders and Pages/Thumbnails images for every row
+
+    Each product gets its print PDF, a _PROOF PDF (which the linker must skip)
+    and one thumbnail image.
+    """
+    pdf_bytes = b'%PDF-1.4\n' + b'0' * max(pdf_kb * 1024 - 9, 0)
+    assets_path = Path(assets_dir)
+    thumbnails_path = Path(thumbnails_dir)
+
+    for product_id, content_file, icon in zip(df['uStore_ProductID'], df['ContentFile'], df['Icon']):
+        product_dir = assets_path / f"Product_{product_id}"
+        product_dir.mkdir(parents=True, exist_ok=True)
+        (product_dir / content_file).write_bytes(pdf_bytes)
+        (product_dir / f"{product_id}_PROOF.pdf").write_bytes(b'%PDF-1.4\n')
+
+        thumb_dir = thumbnails_path / f"Product_{product_id}" / 'Pages' / 'Thumbnails'
+        thumb_dir.mkdir(parents=True, exist_ok=True)
+        (thumb_dir / icon).write_bytes(b'\xff\xd8\xff\xe0' + str(product_id).encode())
+
+def prepare_dataset(data_dir, products, stores, description_lines, category_depth, pdf_kb, seed):
+    """
+    Generate (or reuse) the export and asset trees for one benchmark size
+
+    Assets are only generated for the benchmark store, since only its products
+    reach asset linking and packaging. A dataset is reused when dataset.json
+    shows it was generated with the same parameters.
+
+    Returns:
+        tuple: (export_csv, assets_dir, thumbnails_dir, store_products)
+    """
+    data_dir = Path(data_dir)
+    params = {
+        'products': products, 'stores': stores, 'description_lines': description_lines,
+        'category_depth': category_depth, 'pdf_kb': pdf_kb, 'seed': seed
+    }
+    export_csv = data_dir / 'uStore_Complete_Export.csv'
+    assets_dir = data_dir / 'static_assets'
+    thumbnails_dir = data_dir / 'static_assets_thumbnails'
+    params_file = data_dir / 'dataset.json'
+
+    if params_file.exists() and export_csv.exists():
+        with open(params_file, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        if saved.get('params') == params:
+            print(f"  Reusing dataset in {data_dir}")
+            return export_csv, assets_dir, thumbnails_dir, saved['store_products']
+
+    print(f"  Generating {products:,} products across {stores} store(s) in {data_dir}")
+    if data_dir.exists():
+        shutil.rmtree(data_dir)  # Stale asset folders from other parameters would skew the scan
+    data_dir.mkdir(parents=True)
+    df = generate_export(products, stores, description_lines, category_depth, seed)
+    df.to_csv(export_csv, index=False, encoding='utf-8')
+
+    store_df = df[df['uStore_StoreID'] == BASE_STORE_ID]
+    print(f"  Generating assets for {len(store_df):,} products")
+    generate_assets(store_df, assets_dir, thumbnails_dir, pdf_kb)
+
+    with open(params_file, 'w', encoding='utf-8') as f:
+        json.dump({'params': params, 'store_products': len(store_df)}, f, indent=4)
+
+    return export_csv, assets_dir, thumbnails_dir, len(store_df)
+
+def benchmark_size(data_dir, products, stores, description_lines, category_depth, pdf_kb, seed):
+    """
+    Time filter_by_store, generate_seo_data, link_assets, map_to_mdsf and create_package
+
+    Step console output is discarded; a step that reports failure stops the size.
+
+    Returns:
+        dict: Size parameters plus one metrics entry per step
+    """
+    export_csv, assets_dir, thumbnails_dir, store_products = prepare_dataset(
+        data_dir, products, stores, description_lines, category_depth, pdf_kb, seed
+    )
+
+    run_dir = Path(data_dir) / 'run'
+    run_dir.mkdir(exist_ok=True)
+    store_csv = run_dir / 'Store_Export.csv'
+    seo_csv = run_dir / 'with_seo.csv'
+    assets_csv = run_dir / 'with_assets.csv'
+    mdsf_csv = run_dir / 'mdsf_import.csv'
+    package_dir = run_dir / 'MDSF_Import_Package'
+
+    steps = [
+        ('filter', store_filter.filter_by_store, (str(export_csv), str(store_csv), BASE_STORE_ID),
+         export_csv, store_csv, products),
+        ('seo_generation', SEO_generator.generate_seo_data, (str(store_csv), str(seo_csv)),
+         store_csv, seo_csv, store_products),
+        ('asset_linking', asset_linker.link_assets,
+         (str(seo_csv), str(assets_csv), str(assets_dir), str(thumbnails_dir)),
+         seo_csv, assets_csv, store_products),
+        ('mdsf_mapping', fields_mapper.map_to_mdsf, (str(assets_csv), str(mdsf_csv), True, False, 1),
+         assets_csv, mdsf_csv, store_products),
+        ('packaging', packager.create_package,
+         (str(mdsf_csv), str(assets_dir), str(thumbnails_dir), False, str(package_dir)),
+         mdsf_csv, package_dir.with_suffix('.zip'), store_products)
+    ]
+
+    collector = MetricsCollector()
+    status = 'success'
+    with open(os.devnull, 'w', encoding='utf-8') as devnull:
+        for name, func, args, step_input, step_output, rows in steps:
+            with collector.measure(name, str(step_input)) as step:
+                with redirect_stdout(devnull):
+                    ok = func(*args)
+                step.finish(str(step_output))
+
+            entry = collector.steps[-1]
+            entry['rows_in'] = rows
+            entry['rows_per_sec'] = round(rows / entry['wall_seconds'], 1) if entry['wall_seconds'] > 0 else None
+            if not ok:
+                entry['status'] = 'failed'
+                status = 'failed'
+                print(f"  ERROR: {name} failed at {products:,} products")
+                break
+            print(f"  {name:15} {entry['wall_seconds']:>10.2f}s  {entry['rows_per_sec'] or 0:>12,.0f} rows/s")
+
+    return {
+        'products': products,
+        'stores': stores,
+        'store_products': store_products,
+        'status': status,
+        'total_wall_seconds': round(sum(s['wall_seconds'] for s in collector.steps), 4),
+        'steps': collector.steps
+    }
+
+def write_report(report, report_file):
+    """Write the JSON report and a flat CSV (one row per size and step) next to it"""
+    report_file = Path(report_file)
+    with open(report_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4)
+
+    csv_file = report_file.with_suffix('.csv')
+    fields = ['products', 'store_products', 'step', 'status', 'wall_seconds', 'cpu_seconds',
+              'peak_rss_mb', 'rows_in', 'rows_per_sec', 'bytes_read', 'bytes_written']
+    with open(csv_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        for result in report['results']:
+            for step in result['steps']:
+                writer.writerow(dict(step, products=result['products'], store_products=result['store_products']))
+
+    return csv_file
+
+def compare_reports(current, previous, threshold=0.2, min_seconds=0.5):
+    """
+    Compare two benchmark reports size by size
+
+    Slowdowns smaller than min_seconds are ignored as timer noise.
+
+    Returns:
+        list: (products, step, previous_seconds, current_seconds, change) regressions
+    """
+    previous_results = {r['products']: r for r in previous.get('results', [])}
+    regressions = []
+    for result in current['results']:
+        before = previous_results.get(result['products'])
+        if before is None:
+            continue
+        for step, old, new, change in compare_runs(result, before, threshold):
+            if new - old < min_seconds:
+                continue
+            regressions.append((result['products'], step, old, new, change))
+    return regressions
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Benchmark the migration steps on synthetic data')
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help='Comma-separated product counts (default: 1000,10000,100000,1000000)')
+    parser.add_argument('--stores', type=int, default=1,
+                        help='Stores in each export; the first store is benchmarked (default: 1)')
+    parser.add_argument('--description-lines', type=int, default=3,
+                        help='Lines per LongDescription (default: 3)')
+    parser.add_argument('--category-depth', type=int, default=2,
+                        help='Category levels below the store (default: 2)')
+    parser.add_argument('--pdf-kb', type=int, default=16,
+                        help='Size of each generated PDF in KB (default: 16)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    parser.add_argument('--work-dir', default='benchmark_data',
+                        help='Folder for generated datasets and step outputs (default: benchmark_data)')
+    parser.add_argument('--report', help='Report file (default: benchmark_<timestamp>.json)')
+    parser.add_argument('--compare', help='Previous report to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Slowdown that counts as a regression (default: 0.2 = 20%%)')
+    parser.add_argument('--min-seconds', type=float, default=0.5,
+                        help='Ignore slowdowns smaller than this many seconds (default: 0.5)')
+
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+
+    print("=" * 80)
+    print("MIGRATION PIPELINE BENCHMARK")
+    print("=" * 80)
+
+    report = {
+        'run': {
+            'started': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'stores': args.stores,
+            'description_lines': args.description_lines,
+            'category_depth': args.category_depth,
+            'pdf_kb': args.pdf_kb,
+            'seed': args.seed
+        },
+        'results': []
+    }
+
+    # Peak RSS is a process high-water mark, so sizes run smallest first
+    for products in sorted(sizes):
+        print(f"\n{products:,} products")
+        print("-" * 80)
+        report['results'].append(benchmark_size(
+            Path(args.work_dir) / f"products_{products}", products, args.stores,
+            args.description_lines, args.category_depth, args.pdf_kb, args.seed
+        ))
+
+    report_file = args.report or f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    csv_file = write_report(report, report_file)
+    print(f"\nReport saved to: {report_file}")
+    print(f"Step table saved to: {csv_file}")
+
+    failed = any(r['status'] != 'success' for r in report['results'])
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+        regressions = compare_reports(report, previous, args.threshold, args.min_seconds)
+        print(f"\nCompared with: {args.compare}")
+        for products, step, old, new, change in regressions:
+            print(f"  WARNING: {step} at {products:,} products is {change:.0%} slower ({old}s -> {new}s)")
+        if not regressions:
+            print("  No regressions")
+        failed = failed or bool(regressions)
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Step Checkpoints
+Periodically saved per-product progress so long steps can resume after a crash
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from step_cache import hash_dataframe
+
+def input_signature(df, *params):
+    """Identify a step's work: the input rows plus the parameters that shape the result"""
+    payload = json.dumps([hash_dataframe(df)] + [str(p) for p in params])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class Checkpoint:
+    """
+    JSON checkpoint for one step run
+
+    The state is written atomically at most once per interval seconds. A saved
+    state is only handed back to a run with the same signature, so a changed
+    input or configuration always starts from scratch.
+    """
+
+    def __init__(self, path, signature, interval=15.0):
+        self.path = Path(path)
+        self.signature = signature
+        self.interval = interval
+        self._last_save = time.monotonic()
+
+    def load(self):
+        """Return the saved state for this signature, or None"""
+        if not self.path.exists():
+            return None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            print(f"WARNING: Ignoring unreadable checkpoint: {self.path}")
+            return None
+        if data.get('signature') != self.signature:
+            print(f"Ignoring checkpoint for different input: {self.path}")
+            return None
+        return data['state']
+
+    def save(self, state):
+        """Write the state now"""
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'signature': self.signature, 'saved': time.time(), 'state': state}, f)
+        os.replace(tmp, self.path)
+        self._last_save = time.monotonic()
+
+    def due(self):
+        """True when interval seconds have passed since the last save"""
+        return time.monotonic() - self._last_save >= self.interval
+
+    def clear(self):
+        """Remove the checkpoint once the step has finished"""
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
@@ -8,40 +8,21 @@ import pandas as pd
 import sys
 from pathlib import Path
 
-def map_to_mdsf(input_file, output_file, use_auto_thumbnail=True, test_mode=False, test_limit=1):
+from artifact_io import read_table, write_table
+
+def build_mdsf_products(df_ustore, use_auto_thumbnail=True, test_mode=False, test_limit=1):
     """
-    Maps uStore product data to MDSF CSV template format
+    Map an already-loaded uStore DataFrame to the MDSF template columns
     
     Args:
-        input_file: Path to uStore CSV export (with SEO and assets)
-        output_file: Path for MDSF import CSV
+        df_ustore: DataFrame with uStore products (with SEO and assets)
         use_auto_thumbnail: If True, replaces Icon and DetailImage with "AutoThumbnail"
         test_mode: If True, process limited number of products
         test_limit: Number of products to process in test mode
     
     Returns:
-        bool: True if successful, False otherwise
+        DataFrame: MDSF-formatted products (plus helper columns)
     """
-    print("="*80)
-    print("MDSF FIELDS MAPPER")
-    print("="*80)
-    
-    # Validate input file
-    if not Path(input_file).exists():
-        print(f"ERROR: Input file not found: {input_file}")
-        return False
-    
-    print(f"\nReading CSV: {input_file}")
-    
-    # Read the uStore CSV
-    try:
-        df_ustore = pd.read_csv(input_file, encoding='utf-8', keep_default_na=False)
-    except Exception as e:
-        print(f"ERROR: Failed to read CSV: {e}")
-        return False
-    
-    print(f"Loaded {len(df_ustore)} products")
-    
     # Test mode
     if test_mode:
         print(f"\nTEST MODE: Processing only {test_limit} product(s)")
@@ -166,13 +147,6 @@ def map_to_mdsf(input_file, output_file, use_auto_thumbnail=True, test_mode=Fals
     df_mdsf['BuyNowButtonDescription'] = ''
     df_mdsf['UseNewSmartCanvas'] = ''
     
-    # Save to CSV
-    try:
-        df_mdsf.to_csv(output_file, index=False, encoding='utf-8')
-    except Exception as e:
-        print(f"ERROR: Failed to save CSV: {e}")
-        return False
-    
     # Validation
     print("\n" + "="*80)
     print("VALIDATION REPORT")
@@ -251,6 +225,51 @@ def map_to_mdsf(input_file, output_file, use_auto_thumbnail=True, test_mode=Fals
     print(f"  Static Documents: {doc_count}")
     print(f"  Columns: {len(df_mdsf.columns)}")
     
+    return df_mdsf
+
+def map_to_mdsf(input_file, output_file, use_auto_thumbnail=True, test_mode=False, test_limit=1):
+    """
+    Maps uStore product data to MDSF CSV template format
+    
+    Args:
+        input_file: Path to uStore CSV export (with SEO and assets)
+        output_file: Path for MDSF import CSV
+        use_auto_thumbnail: If True, replaces Icon and DetailImage with "AutoThumbnail"
+        test_mode: If True, process limited number of products
+        test_limit: Number of products to process in test mode
+    
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    print("="*80)
+    print("MDSF FIELDS MAPPER")
+    print("="*80)
+    
+    # Validate input file
+    if not Path(input_file).exists():
+        print(f"ERROR: Input file not found: {input_file}")
+        return False
+    
+    print(f"\nReading CSV: {input_file}")
+    
+    # Read the uStore CSV
+    try:
+        df_ustore = read_table(input_file)
+    except Exception as e:
+        print(f"ERROR: Failed to read input: {e}")
+        return False
+    
+    print(f"Loaded {len(df_ustore)} products")
+    
+    df_mdsf = build_mdsf_products(df_ustore, use_auto_thumbnail, test_mode, test_limit)
+    
+    # Save to CSV
+    try:
+        write_table(df_mdsf, output_file)
+    except Exception as e:
+        print(f"ERROR: Failed to save output: {e}")
+        return False
+    
     print("\n" + "="*80)
     print("MAPPING COMPLETE")
     print("="*80)
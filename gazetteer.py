@@ -0,0 +1,95 @@
+"""
+Gazetteer
+Token trie of place names (cities, states, clinic locations) for location detection in product names
+"""
+
+import re
+
+# Words: place names and product names are split the same way ("Oregon City" -> Oregon, City)
+TOKEN_REGEX = re.compile(r"\w+")
+
+US_STATES = [
+    'Alabama', 'Alaska', 'Arizona', 'Arkansas', 'California', 'Colorado', 'Connecticut', 'Delaware',
+    'District of Columbia', 'Florida', 'Georgia', 'Hawaii', 'Idaho', 'Illinois', 'Indiana', 'Iowa',
+    'Kansas', 'Kentucky', 'Louisiana', 'Maine', 'Maryland', 'Massachusetts', 'Michigan', 'Minnesota',
+    'Mississippi', 'Missouri', 'Montana', 'Nebraska', 'Nevada', 'New Hampshire', 'New Jersey',
+    'New Mexico', 'New York', 'North Carolina', 'North Dakota', 'Ohio', 'Oklahoma', 'Oregon',
+    'Pennsylvania', 'Rhode Island', 'South Carolina', 'South Dakota', 'Tennessee', 'Texas', 'Utah',
+    'Vermont', 'Virginia', 'Washington', 'West Virginia', 'Wisconsin', 'Wyoming'
+]
+
+# Cities and neighborhoods the storefronts' clinics are named after
+CLINIC_LOCATIONS = [
+    'Albany', 'Beaverton', 'Bend', 'Camas', 'Cedar Hills', 'Cedar Mill', 'Corvallis', 'Eugene',
+    'Gresham', 'Happy Valley', 'Hillsboro', 'Lake Oswego', 'Medford', 'NE Portland', 'NW Portland',
+    'Orchards', 'Oregon City', 'Portland', 'Salem', 'SE Portland', 'Tigard', 'Tualatin', 'Vancouver',
+    'West Linn', 'Wilsonville'
+]
+
+DEFAULT_PLACES = US_STATES + CLINIC_LOCATIONS
+
+# Marks a trie node where a place name ends (never a token itself)
+END = ''
+
+class Gazetteer:
+    """
+    Place names indexed as a trie of word tokens
+
+    find scans a text's tokens once, left to right, taking the longest place
+    name starting at each token ("NE Portland" over "Portland", "Oregon City"
+    over "Oregon") and continuing after it. Tokens match as the place is
+    written, or in all caps ("TIGARD" finds Tigard), so ordinary lowercase
+    words ("bend", "orchards") are not places.
+    """
+
+    def __init__(self, places=DEFAULT_PLACES):
+        self.places = []
+        self.trie = {}
+        for place in places:
+            tokens = TOKEN_REGEX.findall(place)
+            if not tokens:
+                raise ValueError(f"Invalid place name: '{place}'")
+            node = self.trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            if END not in node:
+                node[END] = place
+                self.places.append(place)
+
+    def child(self, node, token):
+        """Trie node after token (its capitalized form for an all-caps token), or None"""
+        found = node.get(token)
+        if found is None and token.isupper() and len(token) > 1:
+            found = node.get(token.capitalize())
+        return found
+
+    def find(self, text):
+        """
+        Place names in text, in order of first appearance (each once)
+
+        Returns:
+            list: Places as spelled in the gazetteer
+        """
+        if not text:
+            return []
+        tokens = TOKEN_REGEX.findall(text)
+        places = []
+        position = 0
+        while position < len(tokens):
+            node = self.trie
+            match_end = None
+            end = position
+            while end < len(tokens):
+                node = self.child(node, tokens[end])
+                if node is None:
+                    break
+                end += 1
+                if END in node:
+                    match_end, place = end, node[END]
+            if match_end is None:
+                position += 1
+                continue
+            if place not in places:
+                places.append(place)
+            position = match_end
+        return places
@@ -1,21 +1,140 @@
 """
 uStore to MDSF Migration Pipeline
-Master orchestrator that runs all migration steps in sequence
+Master orchestrator that runs all migration steps in dependency order
 """
 
 import sys
+import os
+import bisect
+import copy
+import hashlib
 import subprocess
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
 import json
 
+import pandas as pd
+
+import schema
+import store_filter
+import store_index
+import SEO_generator
+import asset_linker
+import fields_mapper
+import packager
+import streaming
+from artifact_io import AUTO_FORMAT, artifact_path, read_table, resolve_format, write_table
+from asset_catalog import AssetCatalog
+from asset_index import DEFAULT_SCAN_WORKERS
+from selection import parse_selection
+from seo_cache import SeoCache, DEFAULT_MAX_ENTRIES
+from seo_rules import load_rules
+from step_cache import StepCache, hash_file, hash_dataframe, fingerprint_tree
+from pipeline_metrics import MetricsCollector, load_history, find_previous_run, compare_runs
+from pipeline_logging import PipelineLogger, pump_lines, capture_thread_stdout
+from step_scheduler import build_waves, column_outputs, is_column_step, merge_column_outputs
+
+# Execution mode of configs that do not set one (load_config's defaults use it too)
+DEFAULT_EXECUTION_MODE = 'in_process'
+
+# Pipeline steps in configuration order (index = --start-from step number)
+STEP_ORDER = ['filter', 'seo_generation', 'asset_linking', 'mdsf_mapping', 'packaging']
+
+# What each step reads and writes, for configs that do not declare it.
+# 'column:<name>' outputs are columns added to the products table; steps that
+# only add columns can run side by side and have their columns merged afterwards.
+DEFAULT_STEP_IO = {
+    'filter': {'inputs': ['export'], 'outputs': ['products']},
+    'seo_generation': {'inputs': ['products'], 'outputs': ['column:SEOTitle', 'column:KeyWords']},
+    'asset_linking': {'inputs': ['products'], 'outputs': ['column:ContentFile', 'column:Icon', 'column:DetailImage']},
+    'mdsf_mapping': {
+        'inputs': ['products', 'column:SEOTitle', 'column:KeyWords',
+                   'column:ContentFile', 'column:Icon', 'column:DetailImage'],
+        'outputs': ['mdsf_products']
+    },
+    'packaging': {'inputs': ['mdsf_products'], 'outputs': ['package']}
+}
+
+# Top-level config values (beyond the step's own settings) that affect each step's output
+STEP_CACHE_CONFIG_KEYS = {
+    'filter': ['store_id', 'selection'],
+    'seo_generation': ['seo_rules'],
+    'asset_linking': ['paths.assets_dir', 'paths.thumbnails_dir'],
+    'mdsf_mapping': ['use_auto_thumbnail', 'test_mode', 'test_product_limit'],
+    'packaging': ['test_mode', 'paths.assets_dir', 'paths.thumbnails_dir']
+}
+
 class MigrationPipeline:
-    def __init__(self, config_file='pipeline_config.json'):
-        """Initialize the migration pipeline with configuration"""
-        self.config = self.load_config(config_file)
+    def __init__(self, config_file='pipeline_config.json', config=None, work_dir=None, echo=True):
+        """
+        Initialize the migration pipeline with configuration
+        
+        Args:
+            config_file: Path to the JSON configuration file
+            config: Already-loaded configuration dict (skips reading config_file)
+            work_dir: Directory for step outputs and the log (default: scripts folder / project root)
+            echo: If False, log messages go to the log file only (used by store workers)
+        """
+        self.config = config if config is not None else self.load_config(config_file)
         self.project_dir = Path(__file__).parent.parent
         self.scripts_dir = self.project_dir / 'scripts'
-        self.log_file = self.project_dir / f"migration_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+        self.work_dir = Path(work_dir) if work_dir else self.scripts_dir
+        log_dir = Path(work_dir) if work_dir else self.project_dir
+        run_stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.log_file = log_dir / f"migration_log_{run_stamp}.txt"
+        self.metrics_file = log_dir / f"migration_metrics_{run_stamp}.json"
+        self.metrics_history_file = log_dir / 'metrics_history.jsonl'
+        self.metrics = None
+        self.echo = echo
+        
+        # One buffered handle per sink for the whole run (text log + JSON-lines log)
+        self.logger = PipelineLogger(
+            self.log_file,
+            self.log_file.with_suffix('.jsonl') if self.config.get('json_log', True) else None,
+            echo=echo
+        )
+        
+        # Step output cache (keyed on input content, config slice, script and assets)
+        cache_config = self.config.get('cache', {})
+        self.cache = None
+        if cache_config.get('enabled', False):
+            self.cache = StepCache(
+                self.scripts_dir / cache_config.get('dir', '.pipeline_cache'),
+                namespace=f"store_{self.config['store_id']}",
+                keep=cache_config.get('keep', 2)
+            )
+        self._output_keys = {}  # id(step output) -> (output, cache key), for chaining keys
+        self._local = threading.local()  # Per-thread cache hit flag for concurrent steps
+        self._asset_fingerprint = None
+        self._seo_rules = None
+        
+        # SEO results memo shared by all runs and stores (keyed on product inputs and rules)
+        seo_cache_config = self.config.get('seo_cache', {})
+        self.seo_cache = None
+        if seo_cache_config.get('enabled', False):
+            self.seo_cache = SeoCache(
+                self.scripts_dir / seo_cache_config.get('path', '.seo_cache.sqlite'),
+                max_entries=seo_cache_config.get('max_entries', DEFAULT_MAX_ENTRIES)
+            )
+        
+        # Persistent listing of the asset trees, refreshed once per run (see refreshed_catalog)
+        catalog_config = self.config.get('asset_catalog', {})
+        self.asset_catalog = None
+        self._catalog_refreshed = not catalog_config.get('refresh', True)
+        self._catalog_listed_all = False  # Set by a full refresh in this process
+        if catalog_config.get('enabled', False):
+            self.asset_catalog = AssetCatalog(
+                self.project_dir / catalog_config.get('path', '.asset_catalog.sqlite'),
+                hashes=catalog_config.get('hashes', False)
+            )
+        
+        # On-disk format of the filter/SEO/asset/mapping outputs (products.csv in the package stays CSV)
+        requested_format = self.config.get('intermediate_format', AUTO_FORMAT)
+        self.intermediate_format = resolve_format(requested_format)
+        if requested_format.lower() != AUTO_FORMAT and self.intermediate_format != requested_format.lower():
+            self.log(f"{requested_format} intermediates need pyarrow, which is not installed; using {self.intermediate_format}", "WARNING")
         
         # Track pipeline state
         self.state = {
@@ -37,6 +156,52 @@ class MigrationPipeline:
             "use_auto_thumbnail": True,
             "test_mode": False,
             "test_product_limit": 1,
+            "execution_mode": DEFAULT_EXECUTION_MODE,
+            "write_intermediates": False,
+            "max_workers": None,
+            "json_log": True,
+            "parallel_steps": True,
+            "use_store_index": True,
+            "selection": "",
+            "seo_rules": "",
+            "checkpoint_interval": 15,
+            "asset_scan_workers": DEFAULT_SCAN_WORKERS,
+            "intermediate_format": AUTO_FORMAT,
+            
+            "cache": {
+                "enabled": True,
+                "dir": ".pipeline_cache",
+                "keep": 2
+            },
+            
+            "seo_cache": {
+                "enabled": True,
+                "path": ".seo_cache.sqlite",
+                "max_entries": DEFAULT_MAX_ENTRIES
+            },
+            
+            "seo_parallel": {
+                "workers": None,
+                "chunk_size": SEO_generator.DEFAULT_PARALLEL_CHUNK_SIZE
+            },
+            
+            "asset_catalog": {
+                "enabled": False,
+                "path": ".asset_catalog.sqlite",
+                "hashes": False,
+                "refresh": True,
+                "full_refresh": False
+            },
+            
+            "delta": {
+                "enabled": False,
+                "manifest": "mdsf_manifest.json"
+            },
+            
+            "streaming": {
+                "enabled": False,
+                "chunk_size": 5000
+            },
             
             "paths": {
                 "assets_dir": "static_assets",
@@ -81,6 +246,9 @@ class MigrationPipeline:
             }
         }
         
+        for step_key, step_io in DEFAULT_STEP_IO.items():
+            default_config['steps'][step_key].update(copy.deepcopy(step_io))
+        
         # Load from file if exists, otherwise use defaults
         if config_path.exists():
             print(f"Loading configuration from: {config_path}")
@@ -100,16 +268,41 @@ class MigrationPipeline:
     
     def log(self, message, level="INFO"):
         """Log message to console and file"""
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        log_message = f"[{timestamp}] [{level}] {message}"
+        self.logger.log(message, level)
+    
+    def run_streaming(self, cmd, env=None):
+        """Run a command, logging its stdout/stderr line by line as they are produced"""
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            cwd=str(self.work_dir),
+            env=env
+        )
+        
+        # stderr is drained on a thread so neither pipe can fill up and block the child
+        step = self.logger.step
+        stderr_thread = threading.Thread(target=pump_lines, args=(process.stderr, self.logger, "ERROR", step))
+        stderr_thread.start()
+        pump_lines(process.stdout, self.logger, "OUTPUT", step)
+        stderr_thread.join()
+        
+        returncode = process.wait()
+        self.logger.flush()
         
-        print(log_message)
+        if returncode != 0:
+            raise Exception(f"Script failed with return code {returncode}")
         
-        with open(self.log_file, 'a', encoding='utf-8') as f:
-            f.write(log_message + '\n')
+        return returncode
     
     def print_banner(self, text):
         """Print a formatted banner"""
+        if not self.echo:
+            self.log(text)
+            return
         banner = "=" * 80
         print(f"\n{banner}")
         print(f"{text:^80}")
@@ -128,22 +321,187 @@ class MigrationPipeline:
         
         self.log(f"Executing: {' '.join(cmd)}")
         
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            cwd=str(self.scripts_dir)
+        # Unbuffered child output so progress reaches the log as it happens
+        env = dict(os.environ, PYTHONUNBUFFERED='1', PYTHONIOENCODING='utf-8')
+        return self.run_streaming(cmd, env)
+    
+    @property
+    def execution_mode(self):
+        """'in_process' or 'subprocess' (DEFAULT_EXECUTION_MODE when the config does not say)"""
+        return self.config.get('execution_mode', DEFAULT_EXECUTION_MODE)
+    
+    @property
+    def in_process(self):
+        """True when steps run as function calls instead of child interpreters"""
+        return self.execution_mode == 'in_process'
+    
+    def run_in_process(self, func, *args):
+        """Call a step function directly, logging its console output like a script run"""
+        self.log(f"Executing in-process: {func.__module__}.{func.__name__}")
+        
+        stream = self.logger.stream("OUTPUT")
+        try:
+            with capture_thread_stdout(stream):
+                result = func(*args)
+        finally:
+            stream.flush()
+            self.logger.flush()
+        
+        if result is None:
+            raise Exception(f"{func.__name__} failed")
+        
+        return result
+    
+    def load_step_input(self, current):
+        """Return the DataFrame for a step input (previous step's frame or a saved artifact path)"""
+        if isinstance(current, pd.DataFrame):
+            return current
+        if not Path(current).exists():
+            raise FileNotFoundError(f"Input file not found: {current}")
+        self.log(f"Reading step input: {current}")
+        return read_table(current)
+    
+    def save_intermediate(self, df, output_file):
+        """Write a step's DataFrame to disk when intermediates are requested (debug/resume)"""
+        if not self.config.get('write_intermediates', False):
+            return
+        write_table(df, output_file)
+        self.log(f"Intermediate saved: {output_file}")
+    
+    def step_config_slice(self, step_key):
+        """Return the configuration values that influence a step's output"""
+        config_slice = {
+            key: value for key, value in self.config['steps'][step_key].items()
+            if key not in ('enabled', 'description', 'inputs', 'outputs')
+        }
+        config_slice['execution_mode'] = self.execution_mode
+        for key in STEP_CACHE_CONFIG_KEYS.get(step_key, []):
+            if '.' in key:
+                section, name = key.split('.', 1)
+                config_slice[key] = self.config.get(section, {}).get(name)
+            else:
+                config_slice[key] = self.config.get(key)
+        if step_key == 'seo_generation':
+            config_slice['seo_rules_fingerprint'] = self.seo_rules.fingerprint  # Rules file contents
+        return config_slice
+    
+    @property
+    def last_cache_hit(self):
+        """True if the last step run on this thread was served from the cache"""
+        return getattr(self._local, 'cache_hit', False)
+    
+    def remember_output(self, result, key):
+        """Record the cache key a step output was produced under"""
+        if key is not None:
+            self._output_keys[id(result)] = (result, key)
+    
+    def fingerprint_input(self, current):
+        """Fingerprint a step input, reusing the producing step's cache key when possible"""
+        known = self._output_keys.get(id(current))
+        if known is not None and known[0] is current:
+            return known[1]
+        if isinstance(current, pd.DataFrame):
+            return hash_dataframe(current)
+        return hash_file(current)
+    
+    def seo_rules_file(self):
+        """Path of the configured SEO rules file (relative to the project root), or None"""
+        rules_file = self.config.get('seo_rules')
+        return str(self.project_dir / rules_file) if rules_file else None
+    
+    @property
+    def seo_rules(self):
+        """SEO rules loaded once per run (built-in tables unless seo_rules is set)"""
+        if self._seo_rules is None:
+            self._seo_rules = load_rules(self.seo_rules_file())
+        return self._seo_rules
+    
+    def seo_parallel(self):
+        """(workers, chunk_size) for SEO generation (workers None = CPU count)"""
+        seo_parallel = self.config.get('seo_parallel', {})
+        return (seo_parallel.get('workers'),
+                seo_parallel.get('chunk_size') or SEO_generator.DEFAULT_PARALLEL_CHUNK_SIZE)
+    
+    def refreshed_catalog(self):
+        """The asset catalog, brought up to date on first use in this run (None when disabled)"""
+        if self.asset_catalog is None or self._catalog_refreshed:
+            return self.asset_catalog
+        
+        catalog_config = self.config.get('asset_catalog', {})
+        full = catalog_config.get('full_refresh', False)
+        self.log(f"{'Rebuilding' if full else 'Refreshing'} asset catalog: {self.asset_catalog.path}")
+        counts = self.asset_catalog.refresh(
+            self.project_dir / self.config['paths']['assets_dir'],
+            self.project_dir / self.config['paths']['thumbnails_dir'],
+            self.config.get('asset_scan_workers', DEFAULT_SCAN_WORKERS),
+            full=full
         )
+        self.log(f"Asset catalog: {counts['folders']} folders checked, {counts['listed']} listed, "
+                 f"{counts['removed']} removed")
+        self._catalog_refreshed = True
+        self._catalog_listed_all = full
+        return self.asset_catalog
+    
+    def catalog_arg(self):
+        """Asset catalog file for step scripts ('' when disabled)"""
+        catalog = self.refreshed_catalog()
+        return str(catalog.path) if catalog is not None else ''
+    
+    def asset_fingerprint(self):
+        """
+        Fingerprint the asset trees once per run
         
-        # Log output
-        if result.stdout:
-            self.log(result.stdout, "OUTPUT")
-        if result.stderr:
-            self.log(result.stderr, "ERROR")
+        An incremental catalog refresh misses files overwritten in place (their
+        folder's mtime is unchanged), so the catalog only stands in for
+        walking the trees after a full refresh in this run.
+        """
+        if self._asset_fingerprint is None:
+            assets_dir = self.project_dir / self.config['paths']['assets_dir']
+            thumbnails_dir = self.project_dir / self.config['paths']['thumbnails_dir']
+            catalog = self.refreshed_catalog()
+            if catalog is not None and self._catalog_listed_all:
+                self._asset_fingerprint = catalog.fingerprint(assets_dir, thumbnails_dir)
+            else:
+                self._asset_fingerprint = fingerprint_tree(assets_dir, thumbnails_dir)
+        return self._asset_fingerprint
+    
+    def run_cached(self, step_key, current, produce, output_file, uses_assets=False, cacheable=True):
+        """
+        Run produce(current) unless the step's output is cached under the same key
+        
+        The key covers the input content, the step's configuration slice, the
+        step script's contents and, for asset steps, the asset trees.
+        """
+        self._local.cache_hit = False
+        if self.cache is None or not cacheable:
+            return produce(current)
+        
+        step_config = self.config['steps'][step_key]
+        key = self.cache.make_key(
+            step_key,
+            self.fingerprint_input(current),
+            self.step_config_slice(step_key),
+            self.scripts_dir / step_config.get('script', ''),
+            self.asset_fingerprint() if uses_assets else None
+        )
         
-        if result.returncode != 0:
-            raise Exception(f"Script failed with return code {result.returncode}")
+        cached = self.cache.lookup(step_key, key)
+        if cached is not None:
+            self.log(f"Cache hit for {step_key} (key {key[:12]}), reusing {cached.name}")
+            result = self.cache.restore(cached, output_file)
+            self._local.cache_hit = True
+            if isinstance(result, pd.DataFrame):
+                if self.in_process:
+                    self.save_intermediate(result, output_file)
+                else:  # Pickle intermediates come back as frames; subprocess steps need the file
+                    write_table(result, output_file)
+                    result = str(output_file)
+        else:
+            result = produce(current)
+            self.cache.store(step_key, key, result)
+            self.log(f"Cached {step_key} output (key {key[:12]})")
         
+        self.remember_output(result, key)
         return result
     
     def run_powershell_script(self, script_name, args=None):
@@ -159,23 +517,7 @@ class MigrationPipeline:
         
         self.log(f"Executing: {' '.join(cmd)}")
         
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            cwd=str(self.scripts_dir)
-        )
-        
-        # Log output
-        if result.stdout:
-            self.log(result.stdout, "OUTPUT")
-        if result.stderr:
-            self.log(result.stderr, "ERROR")
-        
-        if result.returncode != 0:
-            raise Exception(f"Script failed with return code {result.returncode}")
-        
-        return result
+        return self.run_streaming(cmd)
     
     def step_0_filter(self):
         """Step 0: Filter products by store"""
@@ -194,29 +536,41 @@ class MigrationPipeline:
         
         self.log(f"Store ID: {self.config['store_id']}")
         self.log(f"Store Name: {self.config['store_name']}")
+        if self.config.get('selection'):
+            self.log(f"Selection: {self.config['selection']}")
         
-        # Check if output already exists
-        output_file = self.scripts_dir / step_config['output']
-        if output_file.exists():
-            response = input(f"\nFiltered file already exists: {output_file}\nOverwrite? (y/n): ")
-            if response.lower() != 'y':
-                self.log("Using existing filtered file")
-                return str(output_file)
+        output_file = self.step_output('filter')
         
         # Get input file path
         input_file = str(self.project_dir / step_config['input'])
         
-        # Run filter script
-        self.run_python_script(
-            step_config['script'],
-            [input_file, str(output_file), str(self.config['store_id'])]
-        )
+        def produce(input_file):
+            if self.in_process:
+                # Only the store's byte ranges are parsed when the store index is enabled
+                df = self.run_in_process(
+                    store_filter.load_store_rows, input_file, self.config['store_id'], None,
+                    self.config.get('use_store_index', True), self.config.get('selection') or None
+                )
+                filtered_df = self.run_in_process(
+                    store_filter.filter_store_products, df, self.config['store_id']
+                )
+                self.save_intermediate(filtered_df, output_file)
+                self.log(f"Filter completed: {len(filtered_df)} products")
+                return filtered_df
+            
+            # Run filter script
+            args = [input_file, str(output_file), str(self.config['store_id'])]
+            if self.config.get('selection'):
+                args.append(self.config['selection'])
+            self.run_python_script(step_config['script'], args)
+            
+            if output_file.exists():
+                self.log(f"Filter completed: {output_file}")
+                return str(output_file)
+            else:
+                raise FileNotFoundError(f"Filter failed: {output_file} not created")
         
-        if output_file.exists():
-            self.log(f"Filter completed: {output_file}")
-            return str(output_file)
-        else:
-            raise FileNotFoundError(f"Filter failed: {output_file} not created")
+        return self.run_cached('filter', input_file, produce, output_file)
     
     def step_1_export(self):
         """Step 1: Export data from uStore database (DEPRECATED - use filter instead)"""
@@ -231,13 +585,11 @@ class MigrationPipeline:
         self.log("WARNING: PowerShell export step is deprecated")
         self.log("Use store_filter (Step 0) with complete CSV export instead")
         
-        # Check if output already exists
-        output_file = self.scripts_dir / step_config['output']
-        if output_file.exists():
-            response = input(f"\nOutput file already exists: {output_file}\nOverwrite? (y/n): ")
-            if response.lower() != 'y':
-                self.log("Using existing export file")
-                return str(output_file)
+        # Reuse an existing export unless told to overwrite it (no interactive prompt)
+        output_file = self.work_dir / step_config['output']
+        if output_file.exists() and not step_config.get('overwrite', False):
+            self.log("Using existing export file (set steps.export.overwrite to re-export)")
+            return str(output_file)
         
         # Run PowerShell export script
         self.run_powershell_script(step_config['script'])
@@ -258,18 +610,36 @@ class MigrationPipeline:
             self.log("Step 2 disabled in configuration, skipping...")
             return input_file
         
-        output_file = self.scripts_dir / step_config['output']
+        output_file = self.step_output('seo_generation')
         
-        self.run_python_script(
-            step_config['script'],
-            [input_file, str(output_file)]
-        )
+        def produce(input_file):
+            if self.in_process:
+                df = self.run_in_process(
+                    SEO_generator.add_seo_data, self.load_step_input(input_file), self.seo_rules, self.seo_cache,
+                    *self.seo_parallel()
+                )
+                self.save_intermediate(df, output_file)
+                self.log(f"SEO generation completed: {len(df)} products")
+                return df
+            
+            workers, chunk_size = self.seo_parallel()
+            args = [
+                input_file,
+                str(output_file),
+                self.seo_rules_file() or '',
+                str(self.seo_cache.path) if self.seo_cache is not None else '',
+                str(workers or 0),  # 0 = CPU count
+                str(chunk_size)
+            ]
+            self.run_python_script(step_config['script'], args)
+            
+            if output_file.exists():
+                self.log(f"SEO generation completed: {output_file}")
+                return str(output_file)
+            else:
+                raise FileNotFoundError(f"SEO generation failed: {output_file} not created")
         
-        if output_file.exists():
-            self.log(f"SEO generation completed: {output_file}")
-            return str(output_file)
-        else:
-            raise FileNotFoundError(f"SEO generation failed: {output_file} not created")
+        return self.run_cached('seo_generation', input_file, produce, output_file)
     
     def step_3_asset_linking(self, input_file):
         """Step 3: Link assets (PDFs and images) to products"""
@@ -281,7 +651,7 @@ class MigrationPipeline:
             self.log("Step 3 disabled in configuration, skipping...")
             return input_file
         
-        output_file = self.scripts_dir / step_config['output']
+        output_file = self.step_output('asset_linking')
         
         # Get asset paths from config
         assets_dir = str(self.project_dir / self.config['paths']['assets_dir'])
@@ -290,16 +660,33 @@ class MigrationPipeline:
         self.log(f"Assets directory: {assets_dir}")
         self.log(f"Thumbnails directory: {thumbnails_dir}")
         
-        self.run_python_script(
-            step_config['script'],
-            [input_file, str(output_file), assets_dir, thumbnails_dir]
-        )
+        # Scan progress is checkpointed so an interrupted run resumes mid-step
+        checkpoint_interval = self.config.get('checkpoint_interval', 15)
+        scan_workers = self.config.get('asset_scan_workers', DEFAULT_SCAN_WORKERS)
         
-        if output_file.exists():
-            self.log(f"Asset linking completed: {output_file}")
-            return str(output_file)
-        else:
-            raise FileNotFoundError(f"Asset linking failed: {output_file} not created")
+        def produce(input_file):
+            if self.in_process:
+                df = self.run_in_process(
+                    asset_linker.add_asset_links, self.load_step_input(input_file), assets_dir, thumbnails_dir,
+                    f"{output_file}.checkpoint.json", checkpoint_interval, scan_workers, self.refreshed_catalog()
+                )
+                self.save_intermediate(df, output_file)
+                self.log(f"Asset linking completed: {len(df)} products")
+                return df
+            
+            self.run_python_script(
+                step_config['script'],
+                [input_file, str(output_file), assets_dir, thumbnails_dir, str(checkpoint_interval), str(scan_workers),
+                 self.catalog_arg()]
+            )
+            
+            if output_file.exists():
+                self.log(f"Asset linking completed: {output_file}")
+                return str(output_file)
+            else:
+                raise FileNotFoundError(f"Asset linking failed: {output_file} not created")
+        
+        return self.run_cached('asset_linking', input_file, produce, output_file, uses_assets=True)
     
     def step_4_mdsf_mapping(self, input_file):
         """Step 4: Map fields to MDSF format"""
@@ -311,29 +698,44 @@ class MigrationPipeline:
             self.log("Step 4 disabled in configuration, skipping...")
             return input_file
         
-        output_file = self.scripts_dir / step_config['output']
+        output_file = self.step_output('mdsf_mapping')
         
         self.log(f"Use AutoThumbnail: {self.config['use_auto_thumbnail']}")
         self.log(f"Test Mode: {self.config['test_mode']}")
         if self.config['test_mode']:
             self.log(f"Test Product Limit: {self.config['test_product_limit']}")
         
-        self.run_python_script(
-            step_config['script'],
-            [
-                input_file,
-                str(output_file),
-                str(self.config['use_auto_thumbnail']).lower(),
-                str(self.config['test_mode']).lower(),
-                str(self.config['test_product_limit'])
-            ]
-        )
+        def produce(input_file):
+            if self.in_process:
+                df = self.run_in_process(
+                    fields_mapper.build_mdsf_products,
+                    self.load_step_input(input_file),
+                    self.config['use_auto_thumbnail'],
+                    self.config['test_mode'],
+                    self.config['test_product_limit']
+                )
+                self.save_intermediate(df, output_file)
+                self.log(f"MDSF mapping completed: {len(df)} products")
+                return df
+            
+            self.run_python_script(
+                step_config['script'],
+                [
+                    input_file,
+                    str(output_file),
+                    str(self.config['use_auto_thumbnail']).lower(),
+                    str(self.config['test_mode']).lower(),
+                    str(self.config['test_product_limit'])
+                ]
+            )
+            
+            if output_file.exists():
+                self.log(f"MDSF mapping completed: {output_file}")
+                return str(output_file)
+            else:
+                raise FileNotFoundError(f"MDSF mapping failed: {output_file} not created")
         
-        if output_file.exists():
-            self.log(f"MDSF mapping completed: {output_file}")
-            return str(output_file)
-        else:
-            raise FileNotFoundError(f"MDSF mapping failed: {output_file} not created")
+        return self.run_cached('mdsf_mapping', input_file, produce, output_file)
     
     def step_5_packaging(self, input_file):
         """Step 5: Create final ZIP package for MDSF import"""
@@ -345,30 +747,294 @@ class MigrationPipeline:
             self.log("Step 5 disabled in configuration, skipping...")
             return None
         
-        output_file = self.scripts_dir / step_config['output']
+        output_file = self.work_dir / step_config['output']
         
         # Get asset paths from config
         assets_dir = str(self.project_dir / self.config['paths']['assets_dir'])
         thumbnails_dir = str(self.project_dir / self.config['paths']['thumbnails_dir'])
         
-        self.run_python_script(
-            step_config['script'],
-            [
+        # Delta mode packages only products changed since the manifest was last written
+        delta_config = self.config.get('delta', {})
+        manifest_file = None
+        if delta_config.get('enabled', False):
+            manifest_file = str(self.work_dir / delta_config.get('manifest', 'mdsf_manifest.json'))
+            self.log(f"Delta mode: manifest {manifest_file}")
+        
+        checkpoint_interval = self.config.get('checkpoint_interval', 15)
+        scan_workers = self.config.get('asset_scan_workers', DEFAULT_SCAN_WORKERS)
+        
+        def produce(input_file):
+            if self.in_process:
+                self.run_in_process(
+                    packager.package_products,
+                    self.load_step_input(input_file),
+                    assets_dir,
+                    thumbnails_dir,
+                    self.config['test_mode'],
+                    str(output_file.with_suffix('')),
+                    manifest_file,
+                    checkpoint_interval,
+                    scan_workers,
+                    self.refreshed_catalog()
+                )
+            else:
+                args = [
+                    input_file,
+                    assets_dir,
+                    thumbnails_dir,
+                    str(self.config['test_mode']).lower(),
+                    manifest_file or 'none',
+                    str(checkpoint_interval),
+                    str(scan_workers),
+                    self.catalog_arg()
+                ]
+                self.run_python_script(step_config['script'], args)
+            
+            if output_file.exists():
+                self.log(f"Package created: {output_file}")
+                return str(output_file)
+            else:
+                raise FileNotFoundError(f"Packaging failed: {output_file} not created")
+        
+        # A delta package depends on the manifest state, so it is never served from cache
+        return self.run_cached('packaging', input_file, produce, output_file, uses_assets=True,
+                               cacheable=manifest_file is None)
+    
+    def step_output(self, step_key):
+        """Output file of a table-producing step, with the extension of the intermediate format"""
+        return artifact_path(self.work_dir / self.config['steps'][step_key]['output'], self.intermediate_format)
+    
+    def step_io(self, step_key):
+        """Return a step's declared inputs and outputs (defaults for older configs)"""
+        step_config = self.config['steps'].get(step_key, {})
+        return {
+            'inputs': step_config.get('inputs', DEFAULT_STEP_IO[step_key]['inputs']),
+            'outputs': step_config.get('outputs', DEFAULT_STEP_IO[step_key]['outputs'])
+        }
+    
+    def plan_waves(self, start_from_step=0):
+        """
+        Order the steps to run into waves from their declared inputs/outputs
+        
+        Steps in one wave run concurrently. Only steps that add columns to the
+        products table may share a wave (their columns are merged afterwards);
+        with parallel_steps off every step gets its own wave, in order.
+        """
+        if self.config.get('parallel_steps', True):
+            waves = []
+            for wave in build_waves([(key, self.step_io(key)) for key in STEP_ORDER]):
+                if all(is_column_step(self.step_io(key)) for key in wave):
+                    waves.append(wave)
+                else:
+                    waves.extend([key] for key in wave)
+        else:
+            waves = [[key] for key in STEP_ORDER]
+        
+        selected = STEP_ORDER[start_from_step:]
+        waves = [[key for key in wave if key in selected] for wave in waves]
+        return [wave for wave in waves if wave]
+    
+    def resume_input(self, step_key):
+        """Saved output of the step before step_key, used when resuming with --start-from"""
+        previous = STEP_ORDER[STEP_ORDER.index(step_key) - 1]
+        if previous not in self.config['steps']:
+            raise FileNotFoundError(f"No input file for {step_key}. Run {previous} step first.")
+        return str(self.step_output(previous))
+    
+    def save_resume_input(self, step_key, current):
+        """
+        Save the input of a failed wave where --start-from looks for it
+        
+        In-process runs keep step outputs in memory (and only write them with
+        write_intermediates), so the last good table is written on failure.
+        
+        Returns:
+            int: Step number to resume from, or None if the input could not be saved
+        """
+        if step_key == 'filter':
+            return 0
+        try:
+            resume_file = Path(self.resume_input(step_key))
+            if current is not None and (not isinstance(current, str) or Path(current) != resume_file):
+                write_table(self.load_step_input(current), resume_file)
+                self.log(f"Input of {step_key} saved for resuming: {resume_file}")
+            if not resume_file.exists():
+                raise FileNotFoundError(f"Input file not found: {resume_file}")
+        except Exception as e:
+            self.log(f"Could not save the input of {step_key} for resuming: {e}", "WARNING")
+            return None
+        return STEP_ORDER.index(step_key)
+    
+    def run_step(self, step_key, current):
+        """Run one step with metrics and return its output"""
+        index = STEP_ORDER.index(step_key)
+        self.state['current_step'] = index
+        self.logger.step = step_key
+        
+        if step_key == 'filter':
+            step_input = str(self.project_dir / self.config['steps']['filter']['input'])
+        else:
+            step_input = current if current is not None else self.resume_input(step_key)
+        
+        with self.metrics.measure(step_key, step_input) as step:
+            if step_key == 'filter':
+                result = self.step_0_filter()
+            else:
+                method = {
+                    'seo_generation': self.step_2_seo_generation,
+                    'asset_linking': self.step_3_asset_linking,
+                    'mdsf_mapping': self.step_4_mdsf_mapping,
+                    'packaging': self.step_5_packaging
+                }[step_key]
+                result = method(step_input)
+            step.finish(result, self.last_cache_hit)
+        
+        bisect.insort(self.state['completed_steps'], index)  # Step order, not the order concurrent steps finish
+        return result
+    
+    def run_wave(self, wave, current):
+        """Run one wave; several steps run on threads and their columns are merged"""
+        if len(wave) == 1:
+            return self.run_step(wave[0], current)
+        
+        if current is None:
+            current = self.resume_input(wave[0])
+        
+        self.logger.step = None
+        self.log(f"Running concurrently: {', '.join(wave)}")
+        self.logger.flush()
+        
+        results = {}
+        with ThreadPoolExecutor(max_workers=len(wave)) as executor:
+            futures = {key: executor.submit(self.run_step, key, current) for key in wave}
+            for key in wave:
+                try:
+                    results[key] = futures[key].result()
+                except Exception:
+                    self.state['current_step'] = STEP_ORDER.index(key)
+                    raise
+        
+        return self.merge_wave(wave, current, results)
+    
+    def merge_wave(self, wave, current, results):
+        """Merge the column outputs of a concurrent wave onto the wave's input"""
+        self.logger.step = None
+        step_frames = []
+        for key in wave:
+            if results[key] is current:  # Disabled step passed its input through
+                continue
+            step_frames.append((key, self.load_step_input(results[key]), column_outputs(self.step_io(key))))
+        
+        merged = merge_column_outputs(self.load_step_input(current), step_frames)
+        self.log(f"Merged columns from {', '.join(key for key, _, _ in step_frames)}")
+        
+        # Chain cache keys so the next step can still skip rehashing its input
+        keys = [self._output_keys.get(id(results[key]), (None, None))[1] for key, _, _ in step_frames]
+        merged_key = None
+        if keys and all(keys):
+            merged_key = hashlib.sha256('|'.join(keys).encode('utf-8')).hexdigest()
+        
+        # The last step's output file holds the merged table, so --start-from still works
+        output_file = self.step_output(wave[-1])
+        if self.in_process:
+            self.save_intermediate(merged, output_file)
+            result = merged
+        else:
+            write_table(merged, output_file)
+            self.log(f"Merged output saved: {output_file}")
+            result = str(output_file)
+        
+        self.remember_output(result, merged_key)
+        return result
+    
+    def step_stream(self):
+        """Streaming mode: every step over fixed-size chunks of the export, in bounded memory"""
+        self.print_banner("STREAMING: Filter -> SEO -> Assets -> Mapping -> Package")
+        
+        chunk_size = self.config.get('streaming', {}).get('chunk_size', streaming.DEFAULT_CHUNK_SIZE)
+        input_file = str(self.project_dir / self.config['steps']['filter']['input'])
+        output_file = self.work_dir / self.config['steps']['packaging']['output']
+        assets_dir = str(self.project_dir / self.config['paths']['assets_dir'])
+        thumbnails_dir = str(self.project_dir / self.config['paths']['thumbnails_dir'])
+        
+        self.log(f"Store ID: {self.config['store_id']}")
+        self.log(f"Chunk size: {chunk_size} rows")
+        if self.config.get('delta', {}).get('enabled', False):
+            self.log("Delta mode is not supported in streaming mode, packaging all products", "WARNING")
+        
+        if self.in_process:
+            intermediates_dir = str(self.work_dir) if self.config.get('write_intermediates', False) else None
+            self.run_in_process(
+                streaming.stream_migration,
                 input_file,
+                str(output_file),
                 assets_dir,
                 thumbnails_dir,
-                str(self.config['test_mode']).lower()
-            ]
-        )
+                self.config['store_id'],
+                None,
+                self.config['use_auto_thumbnail'],
+                self.config['test_mode'],
+                self.config['test_product_limit'],
+                chunk_size,
+                intermediates_dir,
+                self.config.get('selection') or None,
+                self.seo_rules_file(),
+                self.seo_cache.path if self.seo_cache is not None else None,
+                self.seo_parallel()[0],
+                self.config.get('asset_scan_workers', DEFAULT_SCAN_WORKERS),
+                self.catalog_arg() or None
+            )
+        else:
+            self.run_python_script('streaming.py', [
+                input_file,
+                str(output_file),
+                assets_dir,
+                thumbnails_dir,
+                str(self.config['store_id']),
+                str(chunk_size),
+                str(self.config['use_auto_thumbnail']).lower(),
+                str(self.config['test_mode']).lower(),
+                str(self.config['test_product_limit']),
+                self.config.get('selection') or '',
+                self.seo_rules_file() or '',
+                str(self.seo_cache.path) if self.seo_cache is not None else '',
+                str(self.seo_parallel()[0] or 0),  # 0 = CPU count
+                str(self.config.get('asset_scan_workers', DEFAULT_SCAN_WORKERS)),
+                self.catalog_arg()
+            ])
         
         if output_file.exists():
             self.log(f"Package created: {output_file}")
             return str(output_file)
         else:
-            raise FileNotFoundError(f"Packaging failed: {output_file} not created")
+            raise FileNotFoundError(f"Streaming migration failed: {output_file} not created")
     
-    def run(self, start_from_step=0):
-        """Execute the complete migration pipeline"""
+    def write_metrics(self):
+        """Write this run's metrics JSON and warn about steps slower than the previous run"""
+        previous = find_previous_run(load_history(self.metrics_history_file), self.metrics.run_info)
+        # Concurrent steps finish in any order; report them in step order
+        self.metrics.steps.sort(key=lambda s: STEP_ORDER.index(s['step']) if s['step'] in STEP_ORDER else len(STEP_ORDER))
+        data = self.metrics.write(self.metrics_file, self.metrics_history_file)
+        self.log(f"Metrics file: {self.metrics_file}")
+        
+        for step in data['steps']:
+            rate = f", {step['rows_per_sec']} rows/s" if step['rows_per_sec'] else ''
+            cached = ' (cached)' if step['cache_hit'] else ''
+            self.log(f"  {step['step']}: {step['wall_seconds']}s wall, {step['cpu_seconds']}s CPU{rate}{cached}")
+        
+        if previous is not None:
+            for step, before, after, change in compare_runs(data, previous):
+                self.log(f"  {step} is {change:.0%} slower than the previous run ({before}s -> {after}s)", "WARNING")
+    
+    def run(self, start_from_step=0, initial_input=None):
+        """
+        Execute the complete migration pipeline
+        
+        Args:
+            start_from_step: First step to run (0-4)
+            initial_input: DataFrame or CSV path to feed into start_from_step
+                           instead of the previous step's saved output
+        """
         self.state['start_time'] = datetime.now()
         
         self.print_banner("uStore to MDSF Migration Pipeline")
@@ -377,55 +1043,51 @@ class MigrationPipeline:
         self.log(f"  Store: {self.config['store_name']} (ID: {self.config['store_id']})")
         self.log(f"  Test Mode: {self.config['test_mode']}")
         self.log(f"  Auto Thumbnail: {self.config['use_auto_thumbnail']}")
+        self.log(f"  Execution Mode: {self.execution_mode}")
+        if self.config.get('streaming', {}).get('enabled', False):
+            self.log(f"  Streaming: chunks of {self.config['streaming'].get('chunk_size', streaming.DEFAULT_CHUNK_SIZE)} rows")
+        else:
+            self.log(f"  Step Plan: {' -> '.join(' + '.join(wave) for wave in self.plan_waves(start_from_step))}")
         self.log(f"  Project Directory: {self.project_dir}")
         self.log(f"  Log File: {self.log_file}")
         
+        self.metrics = MetricsCollector({
+            'started': self.state['start_time'].isoformat(timespec='seconds'),
+            'store_id': self.config['store_id'],
+            'store_name': self.config['store_name'],
+            'execution_mode': self.execution_mode,
+            'test_mode': self.config['test_mode'],
+            'start_from_step': start_from_step
+        })
+        
+        resume_point = None  # (first step of the running wave, its input)
         try:
-            current_file = None
+            current_file = initial_input
             
-            # Step 0: Filter by Store
-            if start_from_step <= 0:
+            use_streaming = self.config.get('streaming', {}).get('enabled', False)
+            if use_streaming and (start_from_step > 0 or initial_input is not None):
+                self.log("Streaming mode only runs from the complete export (step 0), running steps normally", "WARNING")
+                use_streaming = False
+            
+            if use_streaming:
                 self.state['current_step'] = 0
-                current_file = self.step_0_filter()
-                self.state['completed_steps'].append(0)
-            
-            # Step 1: SEO Generation (formerly step 2)
-            if start_from_step <= 1:
-                self.state['current_step'] = 1
-                if current_file is None:
-                    # Fallback to filter output if no file from previous step
-                    if 'filter' in self.config['steps']:
-                        current_file = str(self.scripts_dir / self.config['steps']['filter']['output'])
-                    else:
-                        raise FileNotFoundError("No input file for SEO generation. Run filter step first.")
-                current_file = self.step_2_seo_generation(current_file)
-                self.state['completed_steps'].append(1)
-            
-            # Step 2: Asset Linking (formerly step 3)
-            if start_from_step <= 2:
-                self.state['current_step'] = 2
-                if current_file is None:
-                    current_file = str(self.scripts_dir / self.config['steps']['seo_generation']['output'])
-                current_file = self.step_3_asset_linking(current_file)
-                self.state['completed_steps'].append(2)
-            
-            # Step 3: MDSF Mapping (formerly step 4)
-            if start_from_step <= 3:
-                self.state['current_step'] = 3
-                if current_file is None:
-                    current_file = str(self.scripts_dir / self.config['steps']['asset_linking']['output'])
-                current_file = self.step_4_mdsf_mapping(current_file)
-                self.state['completed_steps'].append(3)
-            
-            # Step 4: Packaging (formerly step 5)
-            if start_from_step <= 4:
-                self.state['current_step'] = 4
-                if current_file is None:
-                    current_file = str(self.scripts_dir / self.config['steps']['mdsf_mapping']['output'])
-                final_package = self.step_5_packaging(current_file)
-                self.state['completed_steps'].append(4)
+                self.logger.step = 'streaming'
+                with self.metrics.measure('streaming', str(self.project_dir / self.config['steps']['filter']['input'])) as step:
+                    current_file = self.step_stream()
+                    step.finish(current_file)
+                self.state['completed_steps'].extend(range(len(STEP_ORDER)))
+            
+            for wave in ([] if use_streaming else self.plan_waves(start_from_step)):
+                resume_point = (wave[0], current_file)
+                current_file = self.run_wave(wave, current_file)
+                # Only the latest output can feed the next wave; drop older key records
+                known = self._output_keys.get(id(current_file))
+                self._output_keys = {id(current_file): known} if known else {}
+            
+            final_package = current_file
             
             # Success!
+            self.logger.step = None
             self.state['end_time'] = datetime.now()
             duration = self.state['end_time'] - self.state['start_time']
             
@@ -435,6 +1097,11 @@ class MigrationPipeline:
             self.log(f"Completed steps: {self.state['completed_steps']}")
             self.log(f"Final package: {final_package}")
             self.log(f"Log file: {self.log_file}")
+            self.write_metrics()
+            self.logger.flush()
+            
+            if not self.echo:
+                return final_package
             
             print("\nNext Steps:")
             print("1. Review the final package")
@@ -445,6 +1112,7 @@ class MigrationPipeline:
             return final_package
             
         except Exception as e:
+            self.logger.step = None
             self.state['end_time'] = datetime.now()
             self.state['failed_steps'].append(self.state['current_step'])
             
@@ -453,12 +1121,172 @@ class MigrationPipeline:
             self.log(f"Error at step {self.state['current_step']}: {str(e)}", "ERROR")
             self.log(f"Completed steps: {self.state['completed_steps']}")
             self.log(f"Failed at step: {self.state['current_step']}")
+            self.write_metrics()
+            self.logger.flush()
+            
+            resume_step = self.save_resume_input(*resume_point) if resume_point else None
             
-            print(f"\nTo resume from this step, run:")
-            print(f"  python main.py --start-from {self.state['current_step']}")
+            if not self.echo:
+                raise
+            
+            if resume_step is not None:
+                print(f"\nTo resume from this step, run:")
+                print(f"  python orchestrator.py --start-from {resume_step}")
+            else:
+                print(f"\nTo keep every step's output for resuming, run again with:")
+                print(f"  python orchestrator.py --keep-intermediates")
             
             raise
 
+    def resolve_store_ids(self, df, stores):
+        """Turn a list of store IDs (or 'all') into the store IDs present in the export"""
+        available = [int(store_id) for store_id in df['uStore_StoreID'].drop_duplicates()]
+        if stores == 'all':
+            return sorted(available)
+        
+        store_ids = [int(store_id) for store_id in stores]
+        missing = [store_id for store_id in store_ids if store_id not in available]
+        for store_id in missing:
+            self.log(f"Store ID {store_id} not found in export, skipping", "WARNING")
+        return [store_id for store_id in store_ids if store_id not in missing]
+    
+    def run_stores(self, stores, max_workers=None):
+        """
+        Migrate several stores from one read of the complete export
+        
+        The export is parsed once, partitioned by uStore_StoreID, and each store's
+        SEO -> assets -> mapping -> packaging chain runs in a worker process with
+        its own output folder, ZIP and log under paths.output_dir.
+        
+        Args:
+            stores: List of store IDs, or 'all'
+            max_workers: Worker process count (default: config max_workers or CPU count)
+        
+        Returns:
+            list: One result dict per store
+        """
+        self.state['start_time'] = datetime.now()
+        self.print_banner("uStore to MDSF Multi-Store Migration")
+        
+        if not self.in_process:
+            self.log("Multi-store runs always use in-process execution", "WARNING")
+        
+        input_file = self.project_dir / self.config['steps']['filter']['input']
+        if not input_file.exists():
+            raise FileNotFoundError(f"Input file not found: {input_file}")
+        
+        if self.config.get('selection'):
+            # Narrowed while reading (store index or chunked read), like a single-store run
+            selection = parse_selection(self.config['selection'])
+            if stores != 'all':
+                selection = selection.with_stores(stores)
+            df = self.run_in_process(
+                store_filter.load_selected_rows, str(input_file), selection, self.config.get('use_store_index', True)
+            )
+            self.log(f"Products matching selection ({self.config['selection']}): {len(df)}")
+        elif stores != 'all' and self.config.get('use_store_index', True):
+            # Parse only the requested stores' records
+            index = self.run_in_process(store_index.load_index, str(input_file))
+            wanted = [store_id for store_id in stores if str(store_id) in index['stores']]
+            self.log(f"Reading {len(wanted)} store(s) via store index: {input_file}")
+            df = store_index.read_stores(input_file, index, wanted)
+        else:
+            self.log(f"Reading complete export: {input_file}")
+            df = schema.load_csv(input_file, 'ustore')
+        self.log(f"Total products loaded: {len(df)}")
+        
+        store_ids = self.resolve_store_ids(df, stores)
+        if not store_ids:
+            raise ValueError("No matching stores found in export")
+        
+        self.refreshed_catalog()  # Once for all stores; the workers read it as is
+        
+        max_workers = max_workers or self.config.get('max_workers') or os.cpu_count()
+        max_workers = min(max_workers, len(store_ids))
+        output_root = (self.scripts_dir / self.config['paths']['output_dir']).resolve()
+        
+        self.log(f"Stores to migrate: {len(store_ids)}")
+        self.log(f"Worker processes: {max_workers}")
+        self.log(f"Output directory: {output_root}")
+        
+        partitions = {
+            int(store_id): store_df
+            for store_id, store_df in df.groupby('uStore_StoreID', sort=False)
+            if int(store_id) in store_ids
+        }
+        del df
+        
+        results = []
+        self.logger.flush()  # Nothing buffered may be inherited by forked workers
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(
+                    run_store_worker,
+                    self.config,
+                    store_id,
+                    partitions.pop(store_id),
+                    str(output_root / f"store_{store_id}")
+                ): store_id
+                for store_id in store_ids
+            }
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                if result['status'] == 'success':
+                    self.log(f"Store {result['store_id']} ({result['store_name']}): "
+                             f"{result['products']} products -> {result['package']}")
+                else:
+                    self.log(f"Store {result['store_id']} ({result['store_name']}) failed: "
+                             f"{result['error']} (log: {result['log_file']})", "ERROR")
+        
+        results.sort(key=lambda r: store_ids.index(r['store_id']))
+        
+        summary_file = output_root / 'multi_store_summary.json'
+        with open(summary_file, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=4)
+        
+        self.state['end_time'] = datetime.now()
+        failed = [r for r in results if r['status'] != 'success']
+        
+        self.print_banner("MULTI-STORE MIGRATION COMPLETE" if not failed else "MULTI-STORE MIGRATION FINISHED WITH ERRORS")
+        self.log(f"Total duration: {self.state['end_time'] - self.state['start_time']}")
+        self.log(f"Stores succeeded: {len(results) - len(failed)}")
+        self.log(f"Stores failed: {len(failed)}")
+        self.log(f"Summary: {summary_file}")
+        self.logger.flush()
+        
+        return results
+
+def run_store_worker(config, store_id, store_df, work_dir):
+    """Run the post-filter pipeline for one store inside a worker process"""
+    store_config = copy.deepcopy(config)
+    store_config['store_id'] = store_id
+    store_config['store_name'] = str(store_df['uStore_StoreName'].iloc[0]) if 'uStore_StoreName' in store_df.columns else ''
+    store_config['execution_mode'] = 'in_process'
+    store_config.setdefault('seo_parallel', {})['workers'] = 1  # Stores already run one per core
+    store_config.setdefault('asset_catalog', {})['refresh'] = False  # Refreshed by run_stores
+    
+    Path(work_dir).mkdir(parents=True, exist_ok=True)
+    pipeline = MigrationPipeline(config=store_config, work_dir=work_dir, echo=False)
+    
+    result = {
+        'store_id': store_id,
+        'store_name': store_config['store_name'],
+        'products': len(store_df),
+        'package': None,
+        'log_file': str(pipeline.log_file),
+        'status': 'success',
+        'error': None
+    }
+    
+    try:
+        result['package'] = pipeline.run(start_from_step=1, initial_input=store_df)
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = str(e)
+    
+    return result
+
 def main():
     """Main entry point"""
     import argparse
@@ -470,6 +1298,26 @@ def main():
                        help='Start from specific step (0-4)')
     parser.add_argument('--test', action='store_true',
                        help='Run in test mode (process limited products)')
+    parser.add_argument('--mode', choices=['in_process', 'subprocess'],
+                       help='Run steps in-process (DataFrame hand-off) or as separate scripts')
+    parser.add_argument('--stores',
+                       help="Comma-separated store IDs or 'all' to migrate several stores in parallel")
+    parser.add_argument('--workers', type=int,
+                       help='Worker processes for --stores (default: config max_workers or CPU count)')
+    parser.add_argument('--seo-workers', type=int,
+                       help='Worker processes for SEO generation (default: config seo_parallel.workers; 1 = sequential)')
+    parser.add_argument('--delta', action='store_true',
+                       help='Package only products that changed since the last delta run')
+    parser.add_argument('--stream', action='store_true',
+                       help='Process the export in fixed-size chunks end to end (bounded memory)')
+    parser.add_argument('--chunk-size', type=int,
+                       help='Rows per chunk in streaming mode (default: config streaming.chunk_size)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Ignore and do not update the step output and SEO result caches')
+    parser.add_argument('--rescan-assets', action='store_true',
+                       help='List every asset folder again when refreshing the asset catalog (picks up files rewritten in place)')
+    parser.add_argument('--keep-intermediates', action='store_true',
+                       help='Write intermediate CSVs in in-process mode (for debugging/resume)')
     
     args = parser.parse_args()
     
@@ -480,9 +1328,34 @@ def main():
     if args.test:
         pipeline.config['test_mode'] = True
         print("Test mode enabled via command line")
+    if args.mode:
+        pipeline.config['execution_mode'] = args.mode
+    if args.keep_intermediates:
+        pipeline.config['write_intermediates'] = True
+    if args.delta:
+        pipeline.config.setdefault('delta', {})['enabled'] = True
+    if args.stream:
+        pipeline.config.setdefault('streaming', {})['enabled'] = True
+    if args.chunk_size:
+        pipeline.config.setdefault('streaming', {})['chunk_size'] = args.chunk_size
+    if args.seo_workers:
+        pipeline.config.setdefault('seo_parallel', {})['workers'] = args.seo_workers
+    if args.rescan_assets:
+        pipeline.config.setdefault('asset_catalog', {})['full_refresh'] = True
+    if args.no_cache:
+        pipeline.config['cache'] = {'enabled': False}
+        pipeline.cache = None
+        pipeline.config['seo_cache'] = {'enabled': False}
+        pipeline.seo_cache = None
     
     # Run the pipeline
     try:
+        if args.stores:
+            stores = 'all' if args.stores.lower() == 'all' else args.stores.split(',')
+            results = pipeline.run_stores(stores, args.workers)
+            if any(r['status'] != 'success' for r in results):
+                sys.exit(1)
+            return
         pipeline.run(start_from_step=args.start_from)
     except KeyboardInterrupt:
         print("\n\nPipeline interrupted by user")
@@ -492,6 +1365,8 @@ def main():
         print(f"\nPipeline failed: {str(e)}")
         print(f"Log file: {pipeline.log_file}")
         sys.exit(1)
+    finally:
+        pipeline.logger.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
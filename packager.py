@@ -6,63 +6,178 @@ Works for any storefront
 
 import pandas as pd
 import os
+import json
+import hashlib
 import shutil
 import zipfile
+from datetime import datetime
 from pathlib import Path
 import sys
 
-def create_package(input_csv, assets_dir, thumbnails_dir, test_mode=False):
+from artifact_io import read_table
+from asset_catalog import AssetCatalog
+from asset_index import AssetIndex, DEFAULT_SCAN_WORKERS, LOCAL_FS
+from checkpoint import Checkpoint, input_signature
+
+HELPER_COLUMNS = ['uStore_ProductID', 'uStore_StoreID', 'uStore_StoreName']
+
+def load_manifest(manifest_file):
+    """Load the per-product delta manifest (empty manifest if none exists yet)"""
+    if manifest_file and Path(manifest_file).exists():
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {'products': {}, 'assets': {}}
+
+def save_manifest(manifest_file, manifest):
+    """Write the delta manifest atomically"""
+    manifest['updated'] = datetime.now().isoformat(timespec='seconds')
+    tmp_file = f"{manifest_file}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_file, manifest_file)
+
+def product_asset_sources(row, product_id, assets_path, thumbnails_path):
+    """Return (filename, source_path) pairs for every asset a product row references"""
+    sources = []
+    thumbnail_folder = thumbnails_path / f"Product_{product_id}" / "Pages" / "Thumbnails"
+    for column, folder in [('ContentFile', assets_path / f"Product_{product_id}"),
+                           ('Icon', thumbnail_folder),
+                           ('DetailImage', thumbnail_folder)]:
+        value = str(row.get(column, '')).strip()
+        if not value or value == 'AutoThumbnail':
+            continue
+        for filename in value.split(','):
+            filename = filename.strip()
+            if filename and (filename, folder / filename) not in sources:
+                sources.append((filename, folder / filename))
+    return sources
+
+def in_folder(path, folder):
+    """Whether a path lies under a folder (Path.is_relative_to needs Python 3.9)"""
+    try:
+        path.relative_to(folder)
+    except ValueError:
+        return False
+    return True
+
+def hash_asset(source_file, known_assets, catalog=None):
     """
-    Create final MDSF import package:
-    1. Read CSV with mapped products (including helper columns)
-    2. Copy all referenced assets from uStore folder structure
-    3. Remove helper columns from CSV
-    4. Create ZIP file with CSV + assets at root level
+    Return the SHA-256 of an asset file, reusing the manifest's (or else the
+    asset catalog's) hash when the file's size and mtime are unchanged.
+    Missing files hash to None.
+    """
+    key = str(source_file)
+    try:
+        stat = source_file.stat()
+    except OSError:
+        return None
+    
+    known = known_assets.get(key)
+    if known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+        return known['sha256']
+    
+    cataloged = catalog.file_info(source_file) if catalog is not None else None
+    if cataloged and cataloged[:2] == (stat.st_size, stat.st_mtime_ns) and cataloged[2]:
+        sha256 = cataloged[2]
+    else:
+        digest = hashlib.sha256()
+        with open(source_file, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        sha256 = digest.hexdigest()
+    known_assets[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256}
+    return sha256
+
+def compute_delta(df, assets_path, thumbnails_path, manifest, catalog=None):
+    """
+    Compare products against the manifest from the previous run
+    
+    Asset files are still stat'ed (a file rewritten in place does not change
+    the catalog), but hashes recorded by the asset catalog spare reading them.
+    
+    Returns:
+        dict: 'changed_mask' (bool Series over df), 'products' (new manifest
+              entries), 'deleted' (list of (product_id, name)) and counts
+    """
+    previous = manifest.get('products', {})
+    known_assets = dict(manifest.get('assets', {}))
+    row_columns = [col for col in df.columns if col not in HELPER_COLUMNS]
+    
+    products = {}
+    changed = []
+    referenced = set()
+    new_count = 0
+    
+    for idx, row in df.iterrows():
+        product_id = str(row['uStore_ProductID'])
+        row_values = '\x1f'.join(str(row[col]) for col in row_columns)
+        sources = product_asset_sources(row, product_id, assets_path, thumbnails_path)
+        referenced.update(str(source_file) for _, source_file in sources)
+        entry = {
+            'name': str(row.get('Name', '')),
+            'row_hash': hashlib.sha256(row_values.encode('utf-8')).hexdigest(),
+            'assets': {filename: hash_asset(source_file, known_assets, catalog) for filename, source_file in sources}
+        }
+        products[product_id] = entry
+        
+        old_entry = previous.get(product_id)
+        if old_entry is None:
+            new_count += 1
+        is_changed = (old_entry is None
+                      or old_entry.get('row_hash') != entry['row_hash']
+                      or old_entry.get('assets') != entry['assets'])
+        changed.append(is_changed)
+    
+    deleted = [(product_id, entry.get('name', '')) for product_id, entry in previous.items()
+               if product_id not in products]
+    
+    return {
+        'changed_mask': pd.Series(changed, index=df.index, dtype=bool),
+        'products': products,
+        'assets': {key: value for key, value in known_assets.items() if key in referenced},  # Drop unreferenced
+        'deleted': deleted,
+        'new_count': new_count
+    }
+
+def package_products(df, assets_dir, thumbnails_dir, test_mode=False, output_dir="MDSF_Import_Package", manifest_file=None,
+                     checkpoint_interval=15.0, scan_workers=DEFAULT_SCAN_WORKERS, catalog=None):
+    """
+    Create the MDSF import package from an already-loaded MDSF DataFrame
     
     Args:
-        input_csv: Path to MDSF-formatted CSV (from fields_mapper)
+        df: MDSF-formatted DataFrame (from fields_mapper, with helper columns)
         assets_dir: Path to static_assets folder
         thumbnails_dir: Path to static_assets_thumbnails folder
         test_mode: If True, process only first product
+        output_dir: Staging directory; the ZIP is written next to it as <output_dir>.zip
+        manifest_file: Delta manifest path. When given, only products that are new or
+                       changed since the last run (row or asset hashes) are packaged,
+                       deleted products are reported, and the manifest is updated.
+        checkpoint_interval: Seconds between saves of <output_dir>.checkpoint.json
+                             (0 disables). A rerun on the same products keeps the
+                             staging directory and copies only the remaining files.
+        scan_workers: Threads listing product folders concurrently (1 = sequential)
+        catalog: AssetCatalog to read product folders from instead of the asset trees
     
     Returns:
-        bool: True if successful, False otherwise
+        str: Path of the created ZIP file, or None if packaging failed
     """
-    print("="*80)
-    print("MDSF PACKAGER")
-    print("="*80)
-    
-    # Validate inputs
-    if not Path(input_csv).exists():
-        print(f"ERROR: CSV file not found: {input_csv}")
-        return False
-    
     assets_path = Path(assets_dir)
     thumbnails_path = Path(thumbnails_dir)
     
     if not assets_path.exists():
         print(f"ERROR: Assets folder not found: {assets_path}")
-        return False
+        return None
     
     if not thumbnails_path.exists():
         print(f"ERROR: Thumbnails folder not found: {thumbnails_path}")
-        return False
-    
-    # Read CSV
-    print(f"\nReading CSV: {input_csv}")
-    try:
-        df = pd.read_csv(input_csv, encoding='utf-8', keep_default_na=False)
-    except Exception as e:
-        print(f"ERROR: Failed to read CSV: {e}")
-        return False
-    
-    print(f"Loaded {len(df)} products")
+        return None
     
     # Check for required helper column
     if 'uStore_ProductID' not in df.columns:
         print("ERROR: uStore_ProductID column not found in CSV")
         print("Make sure you're using output from fields_mapper script")
-        return False
+        return None
     
     # Test mode
     if test_mode:
@@ -70,15 +185,41 @@ def create_package(input_csv, assets_dir, thumbnails_dir, test_mode=False):
         df = df.head(1)
         print(f"Test product: {df.iloc[0].get('Name', 'Unknown')}")
     
-    # Create output directory
-    output_dir = "MDSF_Import_Package"
-    output_path = Path(output_dir)
+    # Delta mode: keep only products that are new or changed since the last run
+    delta = None
+    if manifest_file and test_mode:
+        print("WARNING: Delta mode is ignored in test mode (manifest not updated)")
+    elif manifest_file:
+        print(f"\nDELTA MODE: Comparing against manifest {manifest_file}")
+        delta = compute_delta(df, assets_path, thumbnails_path, load_manifest(manifest_file), catalog)
+        total_products = len(df)
+        df = df[delta['changed_mask']]
+        print(f"  Products in store: {total_products}")
+        print(f"  New products: {delta['new_count']}")
+        print(f"  Changed products: {len(df) - delta['new_count']}")
+        print(f"  Unchanged (skipped): {total_products - len(df)}")
+        print(f"  Deleted since last run: {len(delta['deleted'])}")
     
-    if output_path.exists():
-        shutil.rmtree(output_path)
+    output_path = Path(output_dir)
     
-    output_path.mkdir(parents=True, exist_ok=True)
-    print(f"Created staging directory: {output_path}")
+    # Resume from a checkpoint of an interrupted run over the same products
+    checkpoint = None
+    saved = None
+    if checkpoint_interval:
+        signature = input_signature(df, assets_path.resolve(), thumbnails_path.resolve())
+        checkpoint = Checkpoint(f"{output_dir}.checkpoint.json", signature, checkpoint_interval)
+        saved = checkpoint.load()
+        if saved and not output_path.exists():
+            print("WARNING: Staging directory is gone, ignoring checkpoint")
+            saved = None
+    
+    # Create output directory (kept as-is when resuming)
+    if saved is None:
+        if output_path.exists():
+            shutil.rmtree(output_path)
+        
+        output_path.mkdir(parents=True, exist_ok=True)
+        print(f"Created staging directory: {output_path}")
     
     # Track statistics
     stats = {
@@ -90,11 +231,31 @@ def create_package(input_csv, assets_dir, thumbnails_dir, test_mode=False):
     }
     
     files_copied = set()  # Avoid duplicates
-    
-    print(f"\nProcessing {len(df)} product(s)...")
-    
-    # Process each product
-    for idx, row in df.iterrows():
+    rows_done = 0
+    
+    if saved:
+        stats.update(saved['stats'])
+        stats['missing_files'] = [tuple(missing) for missing in saved['stats']['missing_files']]
+        files_copied = set(saved['files_copied'])
+        rows_done = saved['rows_done']
+        print(f"Resuming from checkpoint: {rows_done} product(s) already staged, {len(files_copied)} files copied")
+    
+    def checkpoint_state():
+        return {'rows_done': rows_done, 'files_copied': sorted(files_copied), 'stats': stats}
+    
+    print(f"\nProcessing {len(df) - rows_done} product(s)...")
+    
+    # One listing per product folder answers every "does this file exist" below
+    remaining = df.iloc[rows_done:]
+    index = AssetIndex(assets_path, thumbnails_path, remaining['uStore_ProductID'].astype(str), workers=scan_workers,
+                       fs=catalog if catalog is not None else LOCAL_FS)
+    
+    # Process each product (files copied after the last checkpoint are simply copied again)
+    for idx, row in remaining.iterrows():
+        if checkpoint is not None and checkpoint.due():
+            checkpoint.save(checkpoint_state())
+        rows_done += 1
+        
         product_id = str(row['uStore_ProductID'])
         product_name = row.get('Name', f'Product {product_id}')
         stats['products_processed'] += 1
@@ -108,7 +269,7 @@ def create_package(input_csv, assets_dir, thumbnails_dir, test_mode=False):
                     source_file = assets_path / f"Product_{product_id}" / filename
                     dest_file = output_path / filename
                     
-                    if source_file.exists():
+                    if index.has_file(product_id, filename):
                         shutil.copy2(source_file, dest_file)
                         files_copied.add(filename)
                         stats['content_files_copied'] += 1
@@ -124,7 +285,7 @@ def create_package(input_csv, assets_dir, thumbnails_dir, test_mode=False):
                     source_file = thumbnails_path / f"Product_{product_id}" / "Pages" / "Thumbnails" / filename
                     dest_file = output_path / filename
                     
-                    if source_file.exists():
+                    if index.has_file(product_id, filename, thumbnail=True):
                         shutil.copy2(source_file, dest_file)
                         files_copied.add(filename)
                         stats['icon_files_copied'] += 1
@@ -140,7 +301,7 @@ def create_package(input_csv, assets_dir, thumbnails_dir, test_mode=False):
                     source_file = thumbnails_path / f"Product_{product_id}" / "Pages" / "Thumbnails" / filename
                     dest_file = output_path / filename
                     
-                    if source_file.exists():
+                    if index.has_file(product_id, filename, thumbnail=True):
                         shutil.copy2(source_file, dest_file)
                         files_copied.add(filename)
                         stats['detail_files_copied'] += 1
@@ -151,10 +312,13 @@ def create_package(input_csv, assets_dir, thumbnails_dir, test_mode=False):
     
     print(f"  Copied {len(files_copied)} unique asset files")
     
+    # Staging is complete; a crash from here on only rebuilds the CSV and ZIP
+    if checkpoint is not None:
+        checkpoint.save(checkpoint_state())
+    
     # Remove helper columns
     print("\nCleaning CSV...")
-    helper_columns = ['uStore_ProductID', 'uStore_StoreID', 'uStore_StoreName']
-    columns_to_remove = [col for col in helper_columns if col in df.columns]
+    columns_to_remove = [col for col in HELPER_COLUMNS if col in df.columns]
     
     if columns_to_remove:
         df_clean = df.drop(columns=columns_to_remove)
@@ -172,7 +336,7 @@ def create_package(input_csv, assets_dir, thumbnails_dir, test_mode=False):
         print(f"  Final columns: {len(df_clean.columns)}")
     except Exception as e:
         print(f"ERROR: Failed to save CSV: {e}")
-        return False
+        return None
     
     # Create ZIP file
     print("\nCreating ZIP package...")
@@ -190,13 +354,27 @@ def create_package(input_csv, assets_dir, thumbnails_dir, test_mode=False):
         print(f"  Created: {zip_filename}")
     except Exception as e:
         print(f"ERROR: Failed to create ZIP: {e}")
-        return False
+        return None
     
     # Verify ZIP
     with zipfile.ZipFile(zip_filename, 'r') as zipf:
         file_list = zipf.namelist()
         print(f"  ZIP contains {len(file_list)} files")
     
+    # Delta mode: report deleted products and record this run in the manifest
+    if delta is not None:
+        deleted_report = f"{output_dir}_deleted_products.csv"
+        pd.DataFrame(delta['deleted'], columns=['uStore_ProductID', 'Name']).to_csv(
+            deleted_report, index=False, encoding='utf-8'
+        )
+        print(f"  Deleted products report: {deleted_report} ({len(delta['deleted'])} products)")
+        
+        save_manifest(manifest_file, {'products': delta['products'], 'assets': delta['assets']})
+        print(f"  Updated manifest: {manifest_file}")
+    
+    if checkpoint is not None:
+        checkpoint.clear()
+    
     # Final report
     print("\n" + "="*80)
     print("PACKAGING COMPLETE")
@@ -235,16 +413,129 @@ def create_package(input_csv, assets_dir, thumbnails_dir, test_mode=False):
     print("5. Click 'Import Template'")
     print("="*80 + "\n")
     
-    return True
+    return zip_filename
+
+class PackageWriter:
+    """
+    Builds the MDSF import ZIP incrementally, one chunk of products at a time
+    
+    Assets go straight into the ZIP (no staging folder) and products.csv is
+    appended to a temporary file that is stored last, so memory use depends on
+    the chunk size rather than the number of products. The ZIP is written under
+    a .tmp name and only renamed into place by close().
+    """
+    
+    def __init__(self, zip_filename, assets_dir, thumbnails_dir, scan_workers=DEFAULT_SCAN_WORKERS, catalog=None):
+        self.zip_filename = str(zip_filename)
+        self.assets_path = Path(assets_dir)
+        self.thumbnails_path = Path(thumbnails_dir)
+        self.scan_workers = scan_workers
+        self.fs = catalog if catalog is not None else LOCAL_FS
+        self.files_added = set()
+        self.products = 0
+        self.missing_files = []
+        self._csv_path = f"{self.zip_filename}.products.csv.tmp"
+        self._zip_path = f"{self.zip_filename}.tmp"
+        self._csv = open(self._csv_path, 'w', encoding='utf-8', newline='')
+        self._zip = zipfile.ZipFile(self._zip_path, 'w', zipfile.ZIP_DEFLATED)
+    
+    def add_products(self, df):
+        """Add one chunk of MDSF rows (with helper columns) and their assets"""
+        index = AssetIndex(self.assets_path, self.thumbnails_path, df['uStore_ProductID'].astype(str),
+                           workers=self.scan_workers, fs=self.fs)
+        for idx, row in df.iterrows():
+            product_id = str(row['uStore_ProductID'])
+            product_name = row.get('Name', f'Product {product_id}')
+            content_folder = self.assets_path / f"Product_{product_id}"
+            for filename, source_file in product_asset_sources(row, product_id, self.assets_path, self.thumbnails_path):
+                if filename in self.files_added:
+                    continue
+                if index.has_file(product_id, filename, thumbnail=not in_folder(source_file, content_folder)):
+                    self._zip.write(source_file, arcname=filename)
+                    self.files_added.add(filename)
+                else:
+                    self.missing_files.append((product_name, filename))
+        
+        df_clean = df.drop(columns=[col for col in HELPER_COLUMNS if col in df.columns])
+        df_clean.to_csv(self._csv, index=False, header=self.products == 0)
+        self.products += len(df)
+    
+    def close(self):
+        """Store products.csv, finish the ZIP and move it into place"""
+        self._csv.close()
+        self._zip.write(self._csv_path, arcname='products.csv')
+        self._zip.close()
+        os.remove(self._csv_path)
+        os.replace(self._zip_path, self.zip_filename)
+        return self.zip_filename
+    
+    def abort(self):
+        """Discard the partial package"""
+        self._csv.close()
+        self._zip.close()
+        for path in (self._csv_path, self._zip_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+def create_package(input_csv, assets_dir, thumbnails_dir, test_mode=False, output_dir="MDSF_Import_Package", manifest_file=None,
+                   checkpoint_interval=15.0, scan_workers=DEFAULT_SCAN_WORKERS, catalog_file=None):
+    """
+    Create final MDSF import package:
+    1. Read CSV with mapped products (including helper columns)
+    2. Copy all referenced assets from uStore folder structure
+    3. Remove helper columns from CSV
+    4. Create ZIP file with CSV + assets at root level
+    
+    Args:
+        input_csv: Path to MDSF-formatted CSV (from fields_mapper)
+        assets_dir: Path to static_assets folder
+        thumbnails_dir: Path to static_assets_thumbnails folder
+        test_mode: If True, process only first product
+        output_dir: Staging directory; the ZIP is written next to it as <output_dir>.zip
+        manifest_file: Delta manifest path (package only new/changed products)
+        checkpoint_interval: Seconds between progress checkpoints (0 disables)
+        scan_workers: Threads listing product folders concurrently (1 = sequential)
+        catalog_file: Asset catalog to read product folders from (as last refreshed)
+    
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    print("="*80)
+    print("MDSF PACKAGER")
+    print("="*80)
+    
+    # Validate inputs
+    if not Path(input_csv).exists():
+        print(f"ERROR: CSV file not found: {input_csv}")
+        return False
+    
+    # Read CSV
+    print(f"\nReading CSV: {input_csv}")
+    try:
+        df = read_table(input_csv)
+    except Exception as e:
+        print(f"ERROR: Failed to read input: {e}")
+        return False
+    
+    print(f"Loaded {len(df)} products")
+    
+    catalog = AssetCatalog(catalog_file) if catalog_file else None
+    return package_products(df, assets_dir, thumbnails_dir, test_mode, output_dir, manifest_file,
+                            checkpoint_interval, scan_workers, catalog) is not None
 
 def main():
     """Main entry point"""
     if len(sys.argv) < 4:
-        print("Usage: python packager.py <input_csv> <assets_dir> <thumbnails_dir> [test_mode]")
+        print("Usage: python packager.py <input_csv> <assets_dir> <thumbnails_dir> [test_mode] [manifest_file] [checkpoint_seconds] "
+              "[scan_workers] [catalog_file]")
         print("\nExample:")
         print("  python packager.py mdsf_import.csv ../static_assets ../static_assets_thumbnails false")
         print("\nArguments:")
         print("  test_mode: true/false (default: false)")
+        print("  manifest_file: delta manifest; package only products changed since the last run ('none' to skip)")
+        print("  checkpoint_seconds: seconds between progress checkpoints, 0 disables (default: 15)")
+        print(f"  scan_workers: product folders listed concurrently, 1 = sequential (default: {DEFAULT_SCAN_WORKERS})")
+        print("  catalog_file: asset catalog to read product folders from (refreshed by asset_catalog.py)")
         sys.exit(1)
     
     input_csv = sys.argv[1]
@@ -255,8 +546,15 @@ def main():
     if len(sys.argv) > 4:
         test_mode = sys.argv[4].lower() in ['true', '1', 'yes']
     
+    manifest_file = sys.argv[5] if len(sys.argv) > 5 and sys.argv[5].lower() not in ('', 'none') else None
+    checkpoint_interval = float(sys.argv[6]) if len(sys.argv) > 6 else 15.0
+    scan_workers = int(sys.argv[7]) if len(sys.argv) > 7 else DEFAULT_SCAN_WORKERS
+    catalog_file = sys.argv[8] if len(sys.argv) > 8 and sys.argv[8] else None
+    
     # Run packaging
-    success = create_package(input_csv, assets_dir, thumbnails_dir, test_mode)
+    success = create_package(input_csv, assets_dir, thumbnails_dir, test_mode, manifest_file=manifest_file,
+                             checkpoint_interval=checkpoint_interval, scan_workers=scan_workers,
+                             catalog_file=catalog_file)
     
     if success:
         print("SUCCESS")
@@ -0,0 +1,156 @@
+"""
+Pipeline Logging
+Buffered text + JSON-lines log sinks with live streaming of step output
+"""
+
+import io
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+class PipelineLogger:
+    """
+    Writes every message to a buffered text log and, optionally, a JSON-lines log
+
+    Both files stay open for the whole run. Buffers are flushed at most once per
+    flush_interval seconds, immediately for warnings/errors, and on flush().
+    Each JSON record carries the current step tag so long runs can be filtered.
+    """
+
+    def __init__(self, log_file, json_file=None, echo=True, flush_interval=1.0):
+        self.log_file = log_file
+        self.json_file = json_file
+        self.echo = echo
+        self.flush_interval = flush_interval
+        self._local = threading.local()
+        # Captured before any step output is redirected to a LineStream
+        self._console = sys.stdout.default if isinstance(sys.stdout, StdoutRouter) else sys.stdout
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._text = open(log_file, 'a', encoding='utf-8', buffering=64 * 1024)
+        self._json = open(json_file, 'a', encoding='utf-8', buffering=64 * 1024) if json_file else None
+
+    @property
+    def step(self):
+        """Step tag for messages logged from the current thread"""
+        return getattr(self._local, 'step', None)
+
+    @step.setter
+    def step(self, value):
+        self._local.step = value
+
+    def log(self, message, level="INFO", step=None):
+        """Log one message to the console (if echo) and both sinks"""
+        step = step if step is not None else self.step
+        now = datetime.now()
+        log_message = f"[{now.strftime('%Y-%m-%d %H:%M:%S')}] [{level}] {message}"
+
+        with self._lock:
+            if self.echo:
+                print(log_message, file=self._console)
+
+            self._text.write(log_message + '\n')
+            if self._json is not None:
+                record = {'ts': now.isoformat(timespec='milliseconds'), 'level': level,
+                          'step': step, 'message': message}
+                self._json.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+            if level in ('WARNING', 'ERROR') or time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+
+    def stream(self, level="OUTPUT"):
+        """Return a file-like object that logs each complete line written to it"""
+        return LineStream(self, level, self.step)
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        self._text.flush()
+        if self._json is not None:
+            self._json.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            self._text.close()
+            if self._json is not None:
+                self._json.close()
+
+class LineStream(io.TextIOBase):
+    """Text stream that forwards complete lines to a PipelineLogger (for redirect_stdout)"""
+
+    def __init__(self, logger, level, step=None):
+        self.logger = logger
+        self.level = level
+        self.step = step
+        self._partial = ''
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        lines = (self._partial + text).split('\n')
+        self._partial = lines.pop()
+        for line in lines:
+            self.logger.log(line, self.level, self.step)
+        return len(text)
+
+    def flush(self):
+        if self._partial:
+            self.logger.log(self._partial, self.level, self.step)
+            self._partial = ''
+
+class StdoutRouter(io.TextIOBase):
+    """
+    sys.stdout replacement that sends each thread's writes to that thread's target
+
+    contextlib.redirect_stdout swaps sys.stdout for the whole process, so two
+    steps running on different threads would capture each other's output.
+    Threads without a target write to the original stdout.
+    """
+
+    def __init__(self, default):
+        self.default = default
+        self._local = threading.local()
+
+    def writable(self):
+        return True
+
+    @property
+    def target(self):
+        return getattr(self._local, 'target', None) or self.default
+
+    def write(self, text):
+        return self.target.write(text)
+
+    def flush(self):
+        self.target.flush()
+
+_router_lock = threading.Lock()
+
+@contextmanager
+def capture_thread_stdout(stream):
+    """Send print() output of the current thread (only) to stream"""
+    with _router_lock:
+        if not isinstance(sys.stdout, StdoutRouter):
+            sys.stdout = StdoutRouter(sys.stdout)
+        router = sys.stdout
+
+    previous = getattr(router._local, 'target', None)
+    router._local.target = stream
+    try:
+        yield stream
+    finally:
+        router._local.target = previous
+
+def pump_lines(pipe, logger, level, step=None):
+    """Log every line read from a subprocess pipe until it closes"""
+    for line in iter(pipe.readline, ''):
+        logger.log(line.rstrip('\n'), level, step)
+    pipe.close()
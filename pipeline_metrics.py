@@ -0,0 +1,215 @@
+"""
+Pipeline Metrics
+Per-step wall time, CPU time, peak RSS, row counts and I/O for migration runs
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+def _rusage_snapshot():
+    """Return (cpu_seconds, peak_rss_bytes) for this process plus reaped children"""
+    if resource is None:
+        return time.process_time(), None
+
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    peak_rss = max(own.ru_maxrss, children.ru_maxrss) * scale
+    return cpu, peak_rss
+
+def _io_snapshot():
+    """Return (bytes_read, bytes_written) from /proc/self/io, or (None, None) if unavailable"""
+    try:
+        with open('/proc/self/io', 'r') as f:
+            counters = dict(line.split(': ') for line in f.read().splitlines())
+        return int(counters['rchar']), int(counters['wchar'])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+def _row_count(value):
+    """Row count of a step input/output when it is an in-memory DataFrame"""
+    if isinstance(value, pd.DataFrame):
+        return len(value)
+    return None
+
+def _file_size(value):
+    """Size of a step input/output when it is a file path"""
+    if isinstance(value, (str, Path)) and Path(value).is_file():
+        return Path(value).stat().st_size
+    return None
+
+class StepTimer:
+    """Context manager that measures one pipeline step"""
+
+    def __init__(self, collector, name, step_input):
+        self.collector = collector
+        self.name = name
+        self.step_input = step_input
+        self.step_output = None
+        self.cache_hit = False
+
+    def finish(self, step_output, cache_hit=False):
+        """Record what the step produced (DataFrame or file path)"""
+        self.step_output = step_output
+        self.cache_hit = cache_hit
+
+    def __enter__(self):
+        self.wall_start = time.perf_counter()
+        self.cpu_start, _ = _rusage_snapshot()
+        self.read_start, self.written_start = _io_snapshot()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.wall_start
+        cpu_end, peak_rss = _rusage_snapshot()
+        read_end, written_end = _io_snapshot()
+
+        rows_in = _row_count(self.step_input)
+        rows_out = _row_count(self.step_output)
+
+        if read_end is not None:
+            bytes_read = read_end - self.read_start
+            bytes_written = written_end - self.written_start
+        else:
+            bytes_read = _file_size(self.step_input)
+            bytes_written = _file_size(self.step_output)
+
+        rows = rows_in if rows_in is not None else rows_out
+        self.collector.steps.append({
+            'step': self.name,
+            'status': 'failed' if exc_type else 'success',
+            'cache_hit': self.cache_hit,
+            'wall_seconds': round(wall, 4),
+            'cpu_seconds': round(cpu_end - self.cpu_start, 4),
+            'peak_rss_mb': round(peak_rss / (1024 * 1024), 1) if peak_rss else None,
+            'rows_in': rows_in,
+            'rows_out': rows_out,
+            'rows_per_sec': round(rows / wall, 1) if rows and wall > 0 else None,
+            'bytes_read': bytes_read,
+            'bytes_written': bytes_written
+        })
+        return False
+
+class MetricsCollector:
+    """
+    Collects per-step metrics for one pipeline run and writes them as JSON
+
+    peak_rss_mb is the high-water mark of the orchestrator (and any step
+    subprocesses) at the end of each step, not the step's own allocation.
+    """
+
+    def __init__(self, run_info=None):
+        self.run_info = dict(run_info or {})
+        self.steps = []
+
+    def measure(self, name, step_input=None):
+        """Return a context manager that records metrics for one step"""
+        return StepTimer(self, name, step_input)
+
+    def to_dict(self):
+        return {
+            'run': self.run_info,
+            'total_wall_seconds': round(sum(s['wall_seconds'] for s in self.steps), 4),
+            'steps': self.steps
+        }
+
+    def write(self, metrics_file, history_file=None):
+        """Write this run's metrics.json and append it to the history file"""
+        data = self.to_dict()
+        with open(metrics_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4)
+        if history_file:
+            with open(history_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(data) + '\n')
+        return data
+
+def load_history(history_file):
+    """Load all runs from a metrics history file"""
+    if not Path(history_file).exists():
+        return []
+    with open(history_file, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def find_previous_run(history, run_info):
+    """Most recent earlier run of the same store, mode and test setting"""
+    match_keys = ('store_id', 'execution_mode', 'test_mode')
+    for run in reversed(history):
+        info = run.get('run', {})
+        if all(info.get(k) == run_info.get(k) for k in match_keys):
+            return run
+    return None
+
+def compare_runs(current, previous, threshold=0.2):
+    """
+    Compare step wall times against a previous run
+
+    Returns:
+        list: (step, previous_seconds, current_seconds, change) for steps that
+              got slower than threshold (fractional), skipping cache hits
+    """
+    previous_steps = {s['step']: s for s in previous.get('steps', []) if not s.get('cache_hit')}
+    regressions = []
+    for step in current.get('steps', []):
+        before = previous_steps.get(step['step'])
+        if step.get('cache_hit') or not before or before['wall_seconds'] <= 0:
+            continue
+        change = (step['wall_seconds'] - before['wall_seconds']) / before['wall_seconds']
+        if change > threshold:
+            regressions.append((step['step'], before['wall_seconds'], step['wall_seconds'], change))
+    return regressions
+
+def print_history(history_file, store_id=None):
+    """Print a per-step wall time table for the runs in a history file"""
+    history = load_history(history_file)
+    if store_id is not None:
+        history = [r for r in history if r.get('run', {}).get('store_id') == store_id]
+    if not history:
+        print(f"No runs found in {history_file}")
+        return
+
+    step_names = []
+    for run in history:
+        for step in run['steps']:
+            if step['step'] not in step_names:
+                step_names.append(step['step'])
+
+    print(f"{'Run':20} {'Store':>6} " + ' '.join(f"{name[:14]:>14}" for name in step_names))
+    for run in history:
+        info = run.get('run', {})
+        times = {s['step']: s for s in run['steps']}
+        cells = []
+        for name in step_names:
+            step = times.get(name)
+            if step is None:
+                cells.append(f"{'-':>14}")
+            else:
+                marker = '*' if step.get('cache_hit') else ''
+                cells.append(f"{step['wall_seconds']:>13.2f}{marker or 's'}")
+        print(f"{info.get('started', '')[:19]:20} {str(info.get('store_id', '')):>6} " + ' '.join(cells))
+    print("\n(s = seconds, * = served from step cache)")
+
+def main():
+    """Main entry point"""
+    if len(sys.argv) < 2:
+        print("Usage: python pipeline_metrics.py <metrics_history.jsonl> [store_id]")
+        print("\nExample:")
+        print("  python pipeline_metrics.py ../metrics_history.jsonl 70")
+        sys.exit(1)
+
+    store_id = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    print_history(sys.argv[1], store_id)
+
+if __name__ == "__main__":
+    main()
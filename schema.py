@@ -0,0 +1,85 @@
+"""
+CSV Schema
+Typed loader for the uStore export and MDSF import layouts
+"""
+
+import pandas as pd
+
+# Few distinct values per store: stored once per category instead of once per row.
+# Flag columns stay categorical too, so their text ('True', 'FALSE') is written back unchanged.
+USTORE_CATEGORIES = [
+    'Type', 'TicketTemplate', 'Active', 'QuantityType', 'MaxOrderQuantityPermitted',
+    'MobileSupported', 'StoreFront/Categories', 'uStore_StoreName'
+]
+
+MDSF_CATEGORIES = [
+    'Type', 'Active', 'TurnAroundTimeUnit', 'QuantityType', 'MaxOrderQuantityPermitted',
+    'AllowBuyerToEditMultipleQuantity', 'EnforceMaxQuantityPermittedInCart',
+    'OrderQuantitiesAllowSplitAcrossMultipleRecipients', 'MobileSupported', 'BuyerDeliverableType',
+    'TicketTemplate', 'Storefront/Categories', 'uStore_StoreName'
+]
+
+# Integer IDs (a file with an empty or non-numeric ID falls back to an untyped read)
+ID_COLUMNS = ['uStore_ProductID', 'uStore_StoreID']
+
+LAYOUTS = {
+    'ustore': {**{col: 'category' for col in USTORE_CATEGORIES}, **{col: 'int64' for col in ID_COLUMNS}},
+    'mdsf': {**{col: 'category' for col in MDSF_CATEGORIES}, **{col: 'int64' for col in ID_COLUMNS}}
+}
+
+def detect_layout(columns):
+    """'mdsf' for mapped products (Storefront/Categories spelling), else 'ustore'"""
+    return 'mdsf' if 'Storefront/Categories' in columns else 'ustore'
+
+def read_header(path):
+    """Column names of a CSV file"""
+    return pd.read_csv(path, encoding='utf-8', nrows=0).columns
+
+def load_csv(source, layout=None, usecols=None):
+    """
+    Read a uStore or MDSF CSV with compact dtypes
+
+    Columns not in the layout are read as text with keep_default_na=False,
+    exactly as before. If a typed column holds a value its dtype cannot parse
+    (e.g. a non-numeric ID), the file is read untyped instead.
+
+    Args:
+        source: Path or file-like object
+        layout: 'ustore', 'mdsf' or None to detect from the header (paths only)
+        usecols: Only parse these columns
+
+    Returns:
+        DataFrame: The parsed rows
+    """
+    if layout is None:
+        layout = detect_layout(read_header(source))
+    dtypes = LAYOUTS[layout]
+    if usecols is not None:
+        dtypes = {col: dtype for col, dtype in dtypes.items() if col in usecols}
+
+    start = source.tell() if hasattr(source, 'tell') else None
+    try:
+        return pd.read_csv(source, encoding='utf-8', keep_default_na=False, dtype=dtypes, usecols=usecols)
+    except (ValueError, TypeError) as e:
+        print(f"WARNING: Typed read failed ({e}), reading without the schema")
+        if start is not None:
+            source.seek(start)
+        return pd.read_csv(source, encoding='utf-8', keep_default_na=False, usecols=usecols)
+
+def read_chunks(source, layout='ustore', chunk_size=50000, typed=True):
+    """Yield a CSV in chunks of chunk_size rows, with the layout's dtypes unless typed is False"""
+    dtypes = LAYOUTS[layout] if typed else None
+    yield from pd.read_csv(source, encoding='utf-8', keep_default_na=False, dtype=dtypes, chunksize=chunk_size)
+
+def concat_chunks(chunks, layout='ustore'):
+    """
+    Join chunks read with read_chunks into one DataFrame
+
+    Each chunk has its own categories, which pd.concat turns back into text,
+    so the layout's categorical columns are re-categorized afterwards.
+    """
+    df = pd.concat(chunks, ignore_index=True)
+    for col, dtype in LAYOUTS[layout].items():
+        if dtype == 'category' and col in df.columns and df[col].dtype != 'category':
+            df[col] = df[col].astype('category')
+    return df
@@ -0,0 +1,160 @@
+"""
+Product Selection
+Expression language for picking a subset of export rows (stores, categories, flags, ID lists)
+
+    store=70,33; category=AFC Urgent Care/Forms; active=true; product!=3275,3300-3399
+
+Clauses are separated by ';' and must all match. A clause is <field>=<values>
+or <field>!=<values>, with values separated by ','; a clause matches a row
+when any of its values does ('!=' when none does).
+"""
+
+import pandas as pd
+
+# field -> (column, kind)
+FIELDS = {
+    'store': ('uStore_StoreID', 'ids'),
+    'store_name': ('uStore_StoreName', 'text'),
+    'product': ('uStore_ProductID', 'ids'),
+    'category': ('StoreFront/Categories', 'prefix'),
+    'type': ('Type', 'text'),
+    'template': ('TicketTemplate', 'text'),
+    'active': ('Active', 'flag')
+}
+
+# Fields that can be decided per store, before any product row is read
+STORE_FIELDS = ['store', 'store_name']
+
+TRUE_VALUES = ['true', '1', 'yes']
+FALSE_VALUES = ['false', '0', 'no']
+
+class Clause:
+    """One <field>=<values> condition"""
+
+    def __init__(self, field, values, negate=False):
+        if field not in FIELDS:
+            raise ValueError(f"Unknown selection field '{field}' (choose from {', '.join(FIELDS)})")
+        if not values:
+            raise ValueError(f"No values given for '{field}'")
+        self.field = field
+        self.column, self.kind = FIELDS[field]
+        self.values = values
+        self.negate = negate
+
+        if self.kind == 'ids':
+            self.ids = []
+            self.ranges = []
+            for value in values:
+                low, sep, high = value.partition('-')
+                try:
+                    if sep:
+                        self.ranges.append((int(low), int(high)))
+                    else:
+                        self.ids.append(int(value))
+                except ValueError:
+                    raise ValueError(f"Invalid {field} ID or range: '{value}'") from None
+        elif self.kind == 'flag':
+            if len(values) != 1 or values[0].lower() not in TRUE_VALUES + FALSE_VALUES:
+                raise ValueError(f"'{field}' takes true or false, got '{','.join(values)}'")
+            self.flag = values[0].lower() in TRUE_VALUES
+
+    def mask(self, df):
+        """Boolean Series: rows of df matching the clause"""
+        if self.column not in df.columns:
+            raise ValueError(f"Selection field '{self.field}' needs column '{self.column}'")
+        column = df[self.column]
+
+        if self.kind == 'ids':
+            numbers = pd.to_numeric(column, errors='coerce')
+            matched = numbers.isin(self.ids)
+            for low, high in self.ranges:
+                matched |= numbers.between(low, high)
+        elif self.kind == 'flag':
+            text = column.astype(str).str.strip().str.lower()
+            matched = text.isin(TRUE_VALUES if self.flag else FALSE_VALUES)
+        elif self.kind == 'prefix':
+            # A category matches itself and everything below it
+            text = column.astype(str)
+            matched = pd.Series(False, index=df.index)
+            for prefix in self.values:
+                prefix = prefix.rstrip('/')
+                matched |= text.eq(prefix) | text.str.startswith(prefix + '/')
+        else:
+            matched = column.astype(str).isin(self.values)
+
+        return ~matched if self.negate else matched
+
+    def __str__(self):
+        return f"{self.field}{'!=' if self.negate else '='}{','.join(self.values)}"
+
+class Selection:
+    """All clauses of a selection expression (logical AND)"""
+
+    def __init__(self, clauses):
+        self.clauses = list(clauses)
+
+    def with_store(self, store_id=None, store_name=None):
+        """Return the selection restricted to one store (by ID or name)"""
+        if store_id is not None:
+            return Selection(self.clauses + [Clause('store', [str(store_id)])])
+        if store_name:
+            return Selection(self.clauses + [Clause('store_name', [store_name])])
+        return self
+
+    def with_stores(self, store_ids):
+        """Return the selection restricted to several stores (by ID)"""
+        return Selection(self.clauses + [Clause('store', [str(store_id) for store_id in store_ids])])
+
+    @property
+    def columns(self):
+        """Columns the selection reads"""
+        return sorted({clause.column for clause in self.clauses})
+
+    @property
+    def store_clauses(self):
+        """Clauses that only depend on the store"""
+        return [clause for clause in self.clauses if clause.field in STORE_FIELDS]
+
+    def mask(self, df, clauses=None):
+        """Boolean Series: rows of df matching every clause"""
+        matched = pd.Series(True, index=df.index)
+        for clause in (self.clauses if clauses is None else clauses):
+            matched &= clause.mask(df)
+        return matched
+
+    def matching_stores(self, stores_df):
+        """
+        Store IDs of a store table (uStore_StoreID, uStore_StoreName) passing the store clauses
+
+        Returns None when the selection has no store clauses (every store may match).
+        """
+        if not self.store_clauses:
+            return None
+        return list(stores_df.loc[self.mask(stores_df, self.store_clauses), 'uStore_StoreID'])
+
+    def __str__(self):
+        return '; '.join(str(clause) for clause in self.clauses)
+
+def parse_selection(text):
+    """
+    Parse a selection expression
+
+    Raises:
+        ValueError: For an unknown field or malformed clause
+    """
+    clauses = []
+    for part in (text or '').split(';'):
+        part = part.strip()
+        if not part:
+            continue
+        field, negate, values = part, False, ''
+        if '!=' in part:
+            field, values = part.split('!=', 1)
+            negate = True
+        elif '=' in part:
+            field, values = part.split('=', 1)
+        else:
+            raise ValueError(f"Selection clause needs '=' or '!=': '{part}'")
+        values = [value.strip() for value in values.split(',') if value.strip()]
+        clauses.append(Clause(field.strip().lower(), values, negate))
+    return Selection(clauses)
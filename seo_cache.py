@@ -0,0 +1,115 @@
+"""
+SEO Cache
+SQLite memo of SEOTitle/KeyWords results, shared across runs and stores
+"""
+
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+
+DEFAULT_MAX_ENTRIES = 500000
+
+# Separates the hashed input fields (never part of the text itself)
+FIELD_SEPARATOR = '\x1f'
+
+def seo_key(rules_fingerprint, values):
+    """Cache key for one product: hash of the rules fingerprint and its cleaned SEO inputs"""
+    payload = FIELD_SEPARATOR.join([rules_fingerprint, *values])
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+class SeoCache:
+    """
+    Maps input keys (see seo_key) to (SEOTitle, KeyWords) in one SQLite file
+
+    Entries carry a last-used time; after each store the least recently
+    used ones beyond max_entries are dropped. Every call opens its own
+    connection, so one SeoCache can be used from threads and store workers.
+    Writes run in their own BEGIN IMMEDIATE transactions, which wait for a
+    concurrent writer instead of failing on a stale read snapshot.
+    """
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def connect(self):
+        """Open the database, creating the table on first use"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)  # Explicit transactions
+        db.execute("PRAGMA journal_mode=WAL")  # Store workers read while another one writes
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS seo ("
+            "key TEXT PRIMARY KEY, title TEXT NOT NULL, keywords TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS seo_last_used ON seo (last_used)")
+        return db
+
+    def lookup(self, keys):
+        """
+        Fetch cached results for many keys in one query
+
+        Returns:
+            dict: key -> (title, keywords) for every key found
+        """
+        keys = list(keys)
+        if not keys:
+            return {}
+        db = self.connect()
+        try:
+            db.execute("CREATE TEMP TABLE wanted (key TEXT PRIMARY KEY)")
+            db.execute("BEGIN")
+            db.executemany("INSERT OR IGNORE INTO wanted VALUES (?)", ((key,) for key in keys))
+            found = {
+                key: (title, keywords)
+                for key, title, keywords in db.execute(
+                    "SELECT seo.key, seo.title, seo.keywords FROM seo JOIN wanted ON seo.key = wanted.key"
+                )
+            }
+            db.execute("COMMIT")
+
+            if found:  # Mark as recently used
+                db.execute("BEGIN IMMEDIATE")
+                db.execute("UPDATE seo SET last_used = ? WHERE key IN (SELECT key FROM wanted)", (time.time(),))
+                db.execute("COMMIT")
+        finally:
+            db.close()
+        self.hits += len(found)
+        self.misses += len(set(keys)) - len(found)
+        return found
+
+    def store(self, results):
+        """Save key -> (title, keywords) results, then drop least recently used entries over the limit"""
+        if not results:
+            return
+        now = time.time()
+        db = self.connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            db.executemany(
+                "INSERT OR REPLACE INTO seo (key, title, keywords, last_used) VALUES (?, ?, ?, ?)",
+                ((key, title, keywords, now) for key, (title, keywords) in results.items())
+            )
+            self.prune(db)
+            db.execute("COMMIT")
+        finally:
+            db.close()
+
+    def prune(self, db):
+        """Delete the least recently used entries beyond max_entries"""
+        (count,) = db.execute("SELECT COUNT(*) FROM seo").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            db.execute(
+                "DELETE FROM seo WHERE key IN (SELECT key FROM seo ORDER BY last_used LIMIT ?)", (excess,)
+            )
+
+    def clear(self):
+        """Remove every entry"""
+        db = self.connect()
+        try:
+            db.execute("DELETE FROM seo")
+        finally:
+            db.close()
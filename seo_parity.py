@@ -0,0 +1,139 @@
+"""
+SEO Parity Check
+Compares the column-wise SEO engine with the row-wise reference functions on
+the sample export and on generated edge-case rows, with and without store rules
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import SEO_generator
+from artifact_io import read_table
+from seo_rules import rules_from_dict
+
+SAMPLE_CSV = Path(__file__).parent / 'Final-Sample-AFC.csv'
+
+# Store overrides that exercise merged and replaced tables and per-store locations
+PARITY_RULES = {
+    'stores': {
+        '1000': {
+            'type_keywords': {'Sales Aid': 'Sales Tool', 'x-ray': 'X-Ray Form', 'card stock': 'Card Stock'},
+            'keyword_groups': {'sales aid': ['sales tool'], 'x-ray': ['imaging', 'x-ray']},
+            'locations': ['Mount Hood', 'Hood River']
+        },
+        '1001': {
+            'type_keywords': {'card': 'Card Stock', 'cards': 'Card Set', 'car': 'Car Magnet'},
+            'keyword_groups': {'card': ['card'], 'car': ['vehicle']},
+            'locations': ['Portland', 'Portland Metro'],
+            'replace': True
+        }
+    }
+}
+
+# Names built to hit the engine's special cases, one feature per row
+EDGE_NAMES = [
+    '', ' ', '\t', '""', '"Quoted Only"', None, np.nan,
+    'TIGARD Business Card', 'NE PORTLAND Flyer', 'OREGON CITY Poster', 'ne portland flyer', 'Bend bend BEND',
+    'Orchards orchards', 'Portland NE Portland SE Portland', 'New York New Mexico', 'WEST LINN Letterhead',
+    'Oregon City Oregon', 'Cedar Hills Cedar Mill Cedar', 'Hood River Mount Hood Sign', 'Portland Metro Banner',
+    'Business Card Card', 'cards and card stock', 'carton car card', 'QR Code Review Card', 'qr codes',
+    'Flier Flyer', 'Letterhead Letter', 'Registration Form', 'Penultimate Open House Pen', 'Sales Aid x-ray',
+    'Appointment Cards Appointment', 'Envelope envelopes', 'Booklet Brochure Banner Badge Lanyard',
+    '8.5" x 11" Flyer', "4' x 6' Banner", '12 x 18 Poster 2 sided', 'Updated 02/2024 Form', 'Spanish Handout',
+    'Café İstanbul Straße Flyer', 'X' * 120, 'Grand Opening Tigard Beaverton Hillsboro Gresham Salem Eugene Sign',
+    'A Very Long Occupational Medicine Healthier Bottom Line Sales Aid For Portland Clinics 8.5" x 11"'
+]
+
+EDGE_CATEGORIES = ['', None, np.nan, 'AFC Urgent Care/Forms', 'Cards/Business', ' Letters ', 'Sales Aids/Card Stock',
+                   '/'.join(f'category {i}' for i in range(40))]
+
+FUZZ_TOKENS = ['The', 'a', 'AN', 'Business Card', 'card', 'cards', 'Flyer', 'FORM', 'registration', 'Spanish', 'Portland',
+               'PORTLAND', 'NE', 'OR', 'WA', 'New York', 'Oregon City', 'Salem Clinic', '8.5" x 11"', "4' x 6'", '2 sided',
+               'Updated 02/2024', '""quoted""', '"', '  ', 'İstanbul', 'Envelope', 'pen', 'open', 'Gift', 'x', '/', '-',
+               ',', 'Qr Code', 'Sales Aid', 'x-ray', 'car', 'lanyard', 'Booklet', 'Tigard', 'TIGARD', 'bend', 'Hood River']
+
+def edge_rows():
+    """Hand-written edge cases: every name with several categories, descriptions and stores"""
+    rows = []
+    for position, name in enumerate(EDGE_NAMES):
+        for variant in range(3):
+            rows.append({
+                'Name': name,
+                'BriefDescription': [None, '8.5" x 11", 2 sided', ''][variant],
+                'LongDescription': [np.nan, 'For TIGARD and Vancouver clinics', 'Line 1: Salem\nLine 2: Bend'][variant],
+                'StoreFront/Categories': EDGE_CATEGORIES[(position + variant) % len(EDGE_CATEGORIES)],
+                'uStore_StoreName': ['AFC Urgent Care', '', None][variant],
+                'uStore_StoreID': [70, 1000, 1001][(position + variant) % 3]
+            })
+    return pd.DataFrame(rows)
+
+def fuzz_rows(count=2000, seed=0):
+    """Random names and descriptions assembled from tokens the rules react to"""
+    rng = random.Random(seed)
+
+    def text(words):
+        value = ' '.join(rng.choice(FUZZ_TOKENS) for _ in range(rng.randint(0, words)))
+        return f'"{value}"' if rng.random() < 0.1 else value
+
+    df = pd.DataFrame([{
+        'Name': text(8),
+        'BriefDescription': text(6),
+        'LongDescription': text(30 if rng.random() < 0.3 else 5),
+        'StoreFront/Categories': '/'.join(rng.choice(EDGE_CATEGORIES[3:7]) for _ in range(rng.randint(0, 3))),
+        'uStore_StoreName': rng.choice(['AFC Urgent Care', 'OHSU Online Print Portal', '', '"Q"']),
+        'uStore_StoreID': rng.choice([70, 1000, 1001])
+    } for _ in range(count)])
+    df.loc[df.sample(count // 40, random_state=seed).index, 'Name'] = np.nan
+    df.index = df.index * 3 + 7  # Non-default index
+    return df
+
+def run_parity(sample_csv=SAMPLE_CSV, seed=0):
+    """
+    Compare both engines on every case, printing the mismatching rows
+
+    Returns:
+        int: Total number of mismatching products
+    """
+    rules = rules_from_dict(PARITY_RULES)
+    sample = read_table(sample_csv)
+    edges = edge_rows()
+    fuzz = fuzz_rows(seed=seed)
+    cases = [
+        ('sample', sample, None),
+        ('sample, store rules', sample.assign(uStore_StoreID=[70, 1000, 1001] * (len(sample) // 3) + [70] * (len(sample) % 3)), rules),
+        ('edge rows', edges, None),
+        ('edge rows, store rules', edges, rules),
+        ('edge rows, optional columns missing', edges.drop(columns=['LongDescription', 'uStore_StoreName']), rules),
+        ('fuzz rows', fuzz, None),
+        ('fuzz rows, store rules', fuzz, rules),
+        ('no rows', edges.iloc[:0], rules)
+    ]
+
+    total = 0
+    for label, df, case_rules in cases:
+        mismatches = SEO_generator.check_parity(df, rules=case_rules)
+        print(f"  {label}: {len(df)} products, {mismatches} mismatches")
+        total += mismatches
+    return total
+
+def main():
+    """Main entry point"""
+    sample_csv = sys.argv[1] if len(sys.argv) > 1 else SAMPLE_CSV
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+
+    print("="*80)
+    print("SEO PARITY CHECK (column engine vs row-wise functions)")
+    print("="*80)
+    total = run_parity(sample_csv, seed)
+    print(f"\nTotal mismatches: {total}")
+    if total:
+        print("FAILED")
+        sys.exit(1)
+    print("SUCCESS")
+
+if __name__ == "__main__":
+    main()
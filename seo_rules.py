@@ -0,0 +1,277 @@
+"""
+SEO Rules
+Product type and keyword group tables compiled into matchers, the location gazetteer, and per-store overrides
+"""
+
+import hashlib
+import json
+import re
+
+from gazetteer import DEFAULT_PLACES, Gazetteer
+
+# Bumped whenever a built-in table, the matching or the SEO generator's logic changes
+# output (it is part of every rules fingerprint, so cached SEO results are then recomputed)
+RULES_VERSION = 2
+
+# Product type by keyword; the first keyword found wins (name before categories)
+TYPE_KEYWORDS = {
+    'envelope': 'Envelope',
+    'business card': 'Business Card',
+    'appointment card': 'Appointment Card',
+    'qr code': 'QR Code Card',
+    'review card': 'Review Card',
+    'card': 'Card',
+    'flier': 'Flier',
+    'flyer': 'Flyer',
+    'brochure': 'Brochure',
+    'letterhead': 'Letterhead',
+    'registration': 'Registration Form',
+    'form': 'Form',
+    'letter': 'Letter',
+    'sales aid': 'Sales Aid',
+    'postcard': 'Postcard',
+    'booklet': 'Booklet',
+    'poster': 'Poster',
+    'label': 'Label',
+    'sticker': 'Sticker',
+    'lanyard': 'Lanyard',
+    'badge': 'Badge',
+    'sign': 'Sign',
+    'banner': 'Banner',
+    'handout': 'Handout',
+    'presentation': 'Presentation',
+    'folder': 'Folder',
+    'notepad': 'Notepad',
+    'pen': 'Pen',
+    'gift': 'Gift',
+    'merchandise': 'Merchandise'
+}
+
+# Related keywords for the first type keyword found in the name
+TYPE_KEYWORD_GROUPS = {
+    'envelope': ['envelope', 'mailing', 'stationery'],
+    'business card': ['business card', 'card', 'networking', 'contact'],
+    'appointment card': ['appointment card', 'reminder'],
+    'qr code': ['qr code', 'review', 'feedback'],
+    'card': ['card'],
+    'flier': ['flier', 'flyer', 'marketing', 'promotional'],
+    'brochure': ['brochure', 'marketing', 'informational'],
+    'letterhead': ['letterhead', 'stationery', 'correspondence'],
+    'registration': ['registration', 'form'],
+    'form': ['form', 'document'],
+    'letter': ['letter', 'correspondence'],
+    'sales aid': ['sales aid', 'marketing', 'sales tool'],
+    'postcard': ['postcard', 'mailing', 'marketing'],
+    'booklet': ['booklet', 'guide'],
+    'poster': ['poster', 'signage', 'display'],
+    'label': ['label', 'sticker'],
+    'lanyard': ['lanyard', 'badge holder'],
+    'sign': ['sign', 'signage'],
+    'banner': ['banner', 'display'],
+    'handout': ['handout', 'informational']
+}
+
+# Table position of keywords absent from a table (larger than any real position)
+NO_MATCH = float('inf')
+
+def trie_pattern(keywords):
+    """
+    Regex matching any of the keywords, factored into a prefix trie
+
+    'card', 'cards' and 'carton' become car(?:d(?:s)?|ton): the regex engine
+    follows one branch per character instead of trying every keyword, so
+    matching cost barely grows with the number of keywords. Optional tails
+    are greedy, so the longest keyword at a position is the one matched.
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def branch(node):
+        alternatives = [re.escape(char) + branch(child) for char, child in sorted(node.items()) if char]
+        if not alternatives:
+            return ''
+        body = alternatives[0] if len(alternatives) == 1 else f"(?:{'|'.join(alternatives)})"
+        return f"(?:{body})?" if '' in node else body
+
+    return branch(trie)
+
+class KeywordMatcher:
+    """
+    The keywords of one or more tables compiled into one regex, searched in a single pass
+
+    The trie regex sits inside a lookahead, so findall reports the longest
+    keyword starting at every position (overlapping ones included). Every
+    other keyword starting there is a prefix of it, so each keyword is mapped
+    to the best (lowest) position among its keyword prefixes in each table;
+    the minimum over all positions is then exactly the first table keyword
+    contained in the text - the result of testing each keyword in turn.
+    """
+
+    def __init__(self, *tables):
+        priorities = []
+        for table in tables:
+            priority = {}
+            for position, keyword in enumerate(table):
+                if not keyword:
+                    raise ValueError("Keywords must not be empty")
+                priority.setdefault(keyword, position)
+            priorities.append(priority)
+
+        keywords = set().union(*priorities)
+        self.best = {
+            keyword: tuple(
+                min((priority[keyword[:end]] for end in range(1, len(keyword) + 1) if keyword[:end] in priority),
+                    default=NO_MATCH)
+                for priority in priorities
+            )
+            for keyword in keywords
+        }
+        self.no_match = (-1,) * len(tables)
+        self.regex = re.compile(f"(?=({trie_pattern(keywords)}))") if keywords else None
+
+    def first_all(self, text):
+        """Position of the first keyword contained in text, per table (-1 where none)"""
+        if self.regex is None or not text:
+            return self.no_match
+        found = self.regex.findall(text)
+        if not found:
+            return self.no_match
+        best = [min(column) for column in zip(*(self.best[keyword] for keyword in found))]
+        return tuple(-1 if position == NO_MATCH else position for position in best)
+
+    def first(self, text):
+        """Position (in the first table's order) of its first keyword contained in text, or -1"""
+        return self.first_all(text)[0]
+
+class SeoRules:
+    """Type keyword and keyword group tables and location names, plus optional per-store overrides"""
+
+    def __init__(self, type_keywords=None, keyword_groups=None, stores=None, locations=None):
+        self.type_keywords = dict(TYPE_KEYWORDS if type_keywords is None else type_keywords)
+        self.keyword_groups = dict(TYPE_KEYWORD_GROUPS if keyword_groups is None else keyword_groups)
+        self.stores = stores or {}
+        self.gazetteer = Gazetteer(DEFAULT_PLACES if locations is None else locations)
+        self.type_matcher = KeywordMatcher(self.type_keywords)
+        self.group_matcher = KeywordMatcher(self.keyword_groups)
+        self.name_matcher = KeywordMatcher(self.type_keywords, self.keyword_groups)  # Both tables, one pass
+        self.type_values = list(self.type_keywords.values())
+        self.group_values = list(self.keyword_groups.values())
+        self.fingerprint = self.table_fingerprint()
+
+    def for_store(self, store_id):
+        """Rules for one store: its override if configured, else these rules"""
+        if store_id is None or not self.stores:
+            return self
+        return self.stores.get(str(store_id), self)
+
+    def product_type(self, name_lower, categories_lower=''):
+        """Type of the first type keyword in the name, else in the categories (None if neither has one)"""
+        position = self.type_matcher.first(name_lower)
+        if position < 0:
+            position = self.type_matcher.first(categories_lower)
+        return self.type_values[position] if position >= 0 else None
+
+    def keyword_group(self, name_lower):
+        """Related keywords of the first group keyword in the name ([] if none)"""
+        position = self.group_matcher.first(name_lower)
+        return self.group_values[position] if position >= 0 else []
+
+    def table_fingerprint(self):
+        """Hash of the rules version and every table (store overrides included)"""
+        tables = {
+            'version': RULES_VERSION,
+            'type_keywords': list(self.type_keywords.items()),
+            'keyword_groups': list(self.keyword_groups.items()),
+            'locations': self.gazetteer.places,
+            'stores': {store_id: rules.fingerprint for store_id, rules in sorted(self.stores.items())}
+        }
+        return hashlib.sha256(json.dumps(tables, sort_keys=True).encode('utf-8')).hexdigest()
+
+DEFAULT_RULES = SeoRules()
+
+def read_table_entries(entries, name, value_check):
+    """Validate one rules table from JSON, lowercasing its keywords (matching is on lowercased text)"""
+    if not isinstance(entries, dict):
+        raise ValueError(f"'{name}' must be an object of keyword -> value")
+    table = {}
+    for keyword, value in entries.items():
+        if not keyword.strip():
+            raise ValueError(f"Empty keyword in '{name}'")
+        if not value_check(value):
+            raise ValueError(f"Invalid value for '{keyword}' in '{name}'")
+        table.setdefault(keyword.lower(), value)
+    return table
+
+def merge_tables(first, rest):
+    """Entries of first, then those of rest with keywords first does not have (first keeps priority)"""
+    return {**first, **{keyword: value for keyword, value in rest.items() if keyword not in first}}
+
+def read_locations(places, name):
+    """Validate a list of place names from JSON (kept as written: matching is case-sensitive)"""
+    if not isinstance(places, list) or not all(isinstance(place, str) and place.strip() for place in places):
+        raise ValueError(f"'{name}' must be a list of place names")
+    return places
+
+def rules_from_dict(data):
+    """
+    Build SeoRules from a rules document
+
+        {"type_keywords": {...}, "keyword_groups": {...}, "locations": [...],
+         "stores": {"70": {"type_keywords": {...}, "keyword_groups": {...},
+                           "locations": [...], "replace": false}}}
+
+    Top-level tables replace the built-in ones. A store's tables are checked
+    before the base tables (same keyword: the store's value wins) and its
+    locations are added to the base ones, or they replace them when
+    "replace" is true.
+
+    Raises:
+        ValueError: For a malformed document
+    """
+    is_type = lambda value: isinstance(value, str)
+    is_group = lambda value: isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+    type_keywords = TYPE_KEYWORDS
+    keyword_groups = TYPE_KEYWORD_GROUPS
+    if 'type_keywords' in data:
+        type_keywords = read_table_entries(data['type_keywords'], 'type_keywords', is_type)
+    if 'keyword_groups' in data:
+        keyword_groups = read_table_entries(data['keyword_groups'], 'keyword_groups', is_group)
+    locations = DEFAULT_PLACES
+    if 'locations' in data:
+        locations = read_locations(data['locations'], 'locations')
+
+    stores = {}
+    for store_id, store_data in (data.get('stores') or {}).items():
+        if not isinstance(store_data, dict):
+            raise ValueError(f"Rules for store {store_id} must be an object")
+        store_types = read_table_entries(store_data.get('type_keywords', {}), f"stores.{store_id}.type_keywords", is_type)
+        store_groups = read_table_entries(store_data.get('keyword_groups', {}), f"stores.{store_id}.keyword_groups", is_group)
+        store_locations = read_locations(store_data.get('locations', []), f"stores.{store_id}.locations")
+        if not store_data.get('replace', False):
+            store_types = merge_tables(store_types, type_keywords)
+            store_groups = merge_tables(store_groups, keyword_groups)
+            store_locations = store_locations + locations
+        stores[str(store_id)] = SeoRules(store_types, store_groups, locations=store_locations)
+
+    return SeoRules(type_keywords, keyword_groups, stores, locations)
+
+def load_rules(path=None):
+    """
+    Load SEO rules from a JSON file (the built-in rules if path is empty)
+
+    Raises:
+        ValueError: For a malformed rules file
+        OSError: If the file cannot be read
+    """
+    if not path:
+        return DEFAULT_RULES
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError("SEO rules file must hold a JSON object")
+    return rules_from_dict(data)
@@ -0,0 +1,123 @@
+"""
+Step Cache
+Content-fingerprinted cache of pipeline step outputs
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+def hash_file(path, chunk_size=1024 * 1024):
+    """Return the SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def hash_dataframe(df):
+    """Return a SHA-256 hex digest of a DataFrame's columns and cell values"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([str(c) for c in df.columns]).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+def fingerprint_tree(*directories):
+    """
+    Fingerprint one or more directory trees from file paths, sizes and mtimes
+
+    File contents are not read, so this costs one stat per file.
+    """
+    digest = hashlib.sha256()
+    for directory in directories:
+        root = Path(directory)
+        digest.update(str(root).encode('utf-8'))
+        if not root.exists():
+            continue
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            rel_dir = os.path.relpath(dirpath, root)
+            for filename in sorted(filenames):
+                stat = os.stat(os.path.join(dirpath, filename))
+                digest.update(f"{rel_dir}/{filename}|{stat.st_size}|{stat.st_mtime_ns}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+class StepCache:
+    """
+    Stores step outputs under a key derived from everything that determines them
+
+    Layout: <cache_dir>/<namespace>/<step_name>/<key>.<ext>
+    DataFrame outputs are pickled; file outputs (CSV, ZIP) are copied as-is.
+    """
+
+    def __init__(self, cache_dir, namespace='default', keep=2):
+        self.cache_dir = Path(cache_dir) / str(namespace)
+        self.keep = keep
+
+    def make_key(self, step_name, input_fingerprint, config_slice, script_path=None, asset_fingerprint=None):
+        """Build the cache key for one step execution"""
+        script_version = ''
+        if script_path and Path(script_path).exists():
+            script_version = hash_file(script_path)
+
+        payload = json.dumps({
+            'step': step_name,
+            'input': input_fingerprint,
+            'config': config_slice,
+            'script': script_version,
+            'assets': asset_fingerprint
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def lookup(self, step_name, key):
+        """Return the cached artifact path for a key, or None"""
+        step_dir = self.cache_dir / step_name
+        if not step_dir.exists():
+            return None
+        for path in step_dir.glob(f"{key}.*"):
+            if not path.name.endswith('.tmp'):
+                os.utime(path)  # Mark as recently used for pruning
+                return path
+        return None
+
+    def store(self, step_name, key, result):
+        """Save a step result (DataFrame or output file path) under a key"""
+        step_dir = self.cache_dir / step_name
+        step_dir.mkdir(parents=True, exist_ok=True)
+
+        if isinstance(result, pd.DataFrame):
+            target = step_dir / f"{key}.pkl"
+            tmp = step_dir / f"{key}.pkl.tmp"
+            result.to_pickle(tmp)
+        else:
+            source = Path(result)
+            target = step_dir / f"{key}{source.suffix}"
+            tmp = step_dir / f"{key}{source.suffix}.tmp"
+            shutil.copy2(source, tmp)
+
+        os.replace(tmp, target)
+        self.prune(step_name)
+        return target
+
+    def restore(self, cached_path, output_file=None):
+        """Load a cached artifact: a DataFrame for .pkl entries, else copy to output_file"""
+        cached_path = Path(cached_path)
+        if cached_path.suffix == '.pkl':
+            return pd.read_pickle(cached_path)
+        shutil.copy2(cached_path, output_file)
+        return str(output_file)
+
+    def prune(self, step_name):
+        """Keep only the most recently used entries for a step"""
+        step_dir = self.cache_dir / step_name
+        entries = [p for p in step_dir.iterdir() if not p.name.endswith('.tmp')]
+        entries.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+        for path in entries[self.keep:]:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,94 @@
+"""
+Step Scheduler
+Orders pipeline steps into waves from their declared inputs and outputs
+"""
+
+COLUMN_PREFIX = 'column:'
+
+def column_outputs(step_config):
+    """Column names a step declares it adds to the products table"""
+    return [name[len(COLUMN_PREFIX):] for name in step_config.get('outputs', [])
+            if name.startswith(COLUMN_PREFIX)]
+
+def is_column_step(step_config):
+    """True if a step only adds columns to its input table (its outputs are all columns)"""
+    outputs = step_config.get('outputs', [])
+    return bool(outputs) and all(name.startswith(COLUMN_PREFIX) for name in outputs)
+
+def build_waves(steps, external_inputs=('export',)):
+    """
+    Group steps into waves that can run concurrently
+
+    A step joins the first wave after every step producing one of its inputs.
+    Steps in the same wave never depend on each other. Column outputs
+    ('column:<name>') of steps in one wave must not overlap, because they are
+    merged onto the shared input table afterwards.
+
+    Args:
+        steps: Ordered list of (step_key, step_config) with 'inputs'/'outputs' lists
+        external_inputs: Artifacts available before any step runs
+
+    Returns:
+        list: Waves, each a list of step keys in configuration order
+
+    Raises:
+        ValueError: On unknown inputs, duplicate producers or dependency cycles
+    """
+    producers = {}
+    for key, step_config in steps:
+        for artifact in step_config.get('outputs', []):
+            if artifact in producers:
+                raise ValueError(f"'{artifact}' is produced by both {producers[artifact]} and {key}")
+            producers[artifact] = key
+
+    dependencies = {}
+    for key, step_config in steps:
+        deps = set()
+        for artifact in step_config.get('inputs', []):
+            if artifact in producers:
+                deps.add(producers[artifact])
+            elif artifact not in external_inputs:
+                raise ValueError(f"Step {key} needs '{artifact}' but no step produces it")
+        deps.discard(key)
+        dependencies[key] = deps
+
+    waves = []
+    wave_of = {}
+    remaining = [key for key, _ in steps]
+    while remaining:
+        ready = [key for key in remaining if all(dep in wave_of for dep in dependencies[key])]
+        if not ready:
+            raise ValueError(f"Dependency cycle between steps: {', '.join(remaining)}")
+        # Keep configuration order; a step only moves earlier when its inputs allow it
+        wave = [key for key in ready
+                if not dependencies[key] or max(wave_of[dep] for dep in dependencies[key]) < len(waves)]
+        for key in wave:
+            wave_of[key] = len(waves)
+        waves.append(wave)
+        remaining = [key for key in remaining if key not in wave_of]
+
+    return waves
+
+def merge_column_outputs(base_df, step_frames):
+    """
+    Copy the columns produced by concurrently run steps onto their shared input
+
+    Args:
+        base_df: DataFrame the steps all started from
+        step_frames: List of (step_key, result DataFrame, column names)
+
+    Returns:
+        DataFrame: Copy of base_df with every step's output columns set
+
+    Raises:
+        ValueError: If a result changed the row count or lacks a declared column
+    """
+    merged = base_df.copy()
+    for step_key, frame, columns in step_frames:
+        if len(frame) != len(merged):
+            raise ValueError(f"Step {step_key} returned {len(frame)} rows, expected {len(merged)}")
+        for column in columns:
+            if column not in frame.columns:
+                raise ValueError(f"Step {step_key} did not produce declared column '{column}'")
+            merged[column] = frame[column].to_numpy()
+    return merged
@@ -5,41 +5,31 @@ Filters products by store from complete export CSV
 
 import pandas as pd
 import sys
+import json
+from collections import OrderedDict
 from pathlib import Path
 
-def filter_by_store(input_csv, output_csv, store_id=None, store_name=None):
+import schema
+import store_index
+import store_stats
+from selection import parse_selection
+from artifact_io import write_table
+
+def filter_store_products(df, store_id=None, store_name=None):
     """
-    Filter products by store ID or store name
+    Filter an already-loaded export DataFrame by store ID or store name
     
     Args:
-        input_csv: Path to complete export CSV
-        output_csv: Path for filtered output CSV
+        df: DataFrame with the complete uStore export
         store_id: Store ID to filter (optional)
         store_name: Store name to filter (optional)
     
     Returns:
-        bool: True if successful, False otherwise
+        DataFrame: Filtered products, or None if filtering failed
     """
-    print("="*80)
-    print("STORE FILTER")
-    print("="*80)
-    
-    # Validate input
-    if not Path(input_csv).exists():
-        print(f"ERROR: Input file not found: {input_csv}")
-        return False
-    
     if not store_id and not store_name:
         print("ERROR: Must provide either store_id or store_name")
-        return False
-    
-    # Read CSV
-    print(f"\nReading CSV: {input_csv}")
-    try:
-        df = pd.read_csv(input_csv, encoding='utf-8', keep_default_na=False)
-    except Exception as e:
-        print(f"ERROR: Failed to read CSV: {e}")
-        return False
+        return None
     
     print(f"Total products loaded: {len(df)}")
     
@@ -47,14 +37,16 @@ def filter_by_store(input_csv, output_csv, store_id=None, store_name=None):
     if 'uStore_StoreID' not in df.columns and 'uStore_StoreName' not in df.columns:
         print("ERROR: CSV missing store columns (uStore_StoreID or uStore_StoreName)")
         print(f"Available columns: {list(df.columns)}")
-        return False
+        return None
     
     # Show store breakdown
     print("\nStores in export:")
     if 'uStore_StoreName' in df.columns:
-        store_counts = df.groupby('uStore_StoreName').size().sort_values(ascending=False)
+        grouped = df.groupby('uStore_StoreName', observed=True)
+        store_counts = grouped.size().sort_values(ascending=False)
+        store_ids = grouped['uStore_StoreID'].first() if 'uStore_StoreID' in df.columns else None
         for store, count in store_counts.head(10).items():
-            store_id_display = df[df['uStore_StoreName'] == store]['uStore_StoreID'].iloc[0] if 'uStore_StoreID' in df.columns else 'N/A'
+            store_id_display = store_ids[store] if store_ids is not None else 'N/A'
             print(f"  {store} (ID: {store_id_display}): {count} products")
         if len(store_counts) > 10:
             print(f"  ... and {len(store_counts) - 10} more stores")
@@ -64,13 +56,13 @@ def filter_by_store(input_csv, output_csv, store_id=None, store_name=None):
     if store_id is not None:
         if 'uStore_StoreID' not in df.columns:
             print("ERROR: uStore_StoreID column not found")
-            return False
+            return None
         filtered_df = df[df['uStore_StoreID'] == store_id]
         filter_desc = f"Store ID {store_id}"
     else:
         if 'uStore_StoreName' not in df.columns:
             print("ERROR: uStore_StoreName column not found")
-            return False
+            return None
         filtered_df = df[df['uStore_StoreName'] == store_name]
         filter_desc = f"Store Name '{store_name}'"
     
@@ -80,23 +72,15 @@ def filter_by_store(input_csv, output_csv, store_id=None, store_name=None):
         if 'uStore_StoreName' in df.columns:
             for store in df['uStore_StoreName'].unique()[:20]:
                 print(f"  - {store}")
-        return False
+        return None
     
     print(f"  Filter: {filter_desc}")
     print(f"  Products found: {len(filtered_df)}")
     
-    # Save filtered data
-    try:
-        filtered_df.to_csv(output_csv, index=False, encoding='utf-8')
-    except Exception as e:
-        print(f"ERROR: Failed to save CSV: {e}")
-        return False
-    
-    # Summary
-    print("\n" + "="*80)
-    print("FILTERING COMPLETE")
-    print("="*80)
-    print(f"\nOutput saved to: {output_csv}")
+    return filtered_df
+
+def print_filter_summary(filtered_df):
+    """Print store details and sample products for a filtered DataFrame"""
     print(f"Products: {len(filtered_df)}")
     print(f"Store: {filtered_df['uStore_StoreName'].iloc[0] if 'uStore_StoreName' in filtered_df.columns else 'N/A'}")
     print(f"Store ID: {filtered_df['uStore_StoreID'].iloc[0] if 'uStore_StoreID' in filtered_df.columns else 'N/A'}")
@@ -109,20 +93,322 @@ def filter_by_store(input_csv, output_csv, store_id=None, store_name=None):
         print(f"  ... and {len(filtered_df) - 5} more")
     
     print("\n" + "="*80)
+
+def load_selected_rows(input_csv, selection, use_index=True, chunk_size=50000):
+    """
+    Load only the export rows matching a selection
+    
+    Store clauses are decided on the store index, so only the matching stores'
+    byte ranges are parsed. Without them (or without an index) the export is read
+    in chunks and each chunk is reduced to its matching rows before the next one
+    is read, so memory follows the selection rather than the export.
+    
+    Args:
+        input_csv: Path to complete export CSV
+        selection: Selection to apply
+        use_index: Use the store index for store clauses
+        chunk_size: Rows per chunk for the chunked read
+    
+    Returns:
+        DataFrame: The matching rows
+    """
+    print(f"\nSelection: {selection}")
+    if use_index and selection.store_clauses:
+        try:
+            index = store_index.load_index(input_csv)
+            stores_df = pd.DataFrame(
+                [(sid, entry['name']) for sid, entry in index['stores'].items()],
+                columns=['uStore_StoreID', 'uStore_StoreName']
+            )
+            store_ids = selection.matching_stores(stores_df)
+            print(f"Reading {len(store_ids)} matching store(s) via index: {input_csv}")
+            df = store_index.read_stores(input_csv, index, store_ids)
+            return df[selection.mask(df)]
+        except Exception as e:
+            print(f"WARNING: Store index unavailable ({e}), reading the full export")
+    
+    print(f"Reading CSV in chunks of {chunk_size} rows: {input_csv}")
+    try:
+        frames = [chunk[selection.mask(chunk)] for chunk in schema.read_chunks(input_csv, 'ustore', chunk_size)]
+    except (ValueError, TypeError) as e:
+        print(f"WARNING: Typed read failed ({e}), reading without the schema")
+        frames = [chunk[selection.mask(chunk)] for chunk in schema.read_chunks(input_csv, 'ustore', chunk_size, typed=False)]
+    if not frames:
+        return pd.read_csv(input_csv, encoding='utf-8', nrows=0)
+    return schema.concat_chunks(frames, 'ustore')
+
+def load_store_rows(input_csv, store_id=None, store_name=None, use_index=True, selection=None):
+    """
+    Load the export rows of one store, reading only its byte ranges via the store index
+    
+    Falls back to parsing the full export if the index cannot be built. When the
+    store is not in the index an empty DataFrame with the export's columns is returned.
+    With a selection expression only the store's matching rows are loaded.
+    
+    Returns:
+        DataFrame: The store's rows (or the full export when the index is unavailable)
+    """
+    if selection:
+        selection = parse_selection(selection).with_store(store_id, store_name)
+        return load_selected_rows(input_csv, selection, use_index)
+    
+    if use_index:
+        try:
+            index = store_index.load_index(input_csv)
+            if not store_index.find_store_ids(index, store_id, store_name):
+                print("\nStores in export:")
+                for sid, name, rows in store_index.list_stores(index)[:20]:
+                    print(f"  {name} (ID: {sid}): {rows} products")
+                return pd.read_csv(input_csv, encoding='utf-8', nrows=0)
+            print(f"\nReading store records via index: {input_csv}")
+            return store_index.read_store(input_csv, index, store_id, store_name)
+        except Exception as e:
+            print(f"WARNING: Store index unavailable ({e}), reading the full export")
+    
+    print(f"\nReading CSV: {input_csv}")
+    return schema.load_csv(input_csv, 'ustore')
+
+def filter_by_store(input_csv, output_csv, store_id=None, store_name=None, use_index=True, selection=None):
+    """
+    Filter products by store ID or store name
+    
+    Args:
+        input_csv: Path to complete export CSV
+        output_csv: Path for filtered output CSV
+        store_id: Store ID to filter (optional)
+        store_name: Store name to filter (optional)
+        use_index: Read only the store's records via the store index
+        selection: Selection expression narrowing the store's products (optional)
+    
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    print("="*80)
+    print("STORE FILTER")
+    print("="*80)
+    
+    # Validate input
+    if not Path(input_csv).exists():
+        print(f"ERROR: Input file not found: {input_csv}")
+        return False
+    
+    if not store_id and not store_name:
+        print("ERROR: Must provide either store_id or store_name")
+        return False
+    
+    try:
+        parse_selection(selection)
+    except ValueError as e:
+        print(f"ERROR: Invalid selection: {e}")
+        return False
+    
+    # Read CSV
+    try:
+        df = load_store_rows(input_csv, store_id, store_name, use_index, selection)
+    except Exception as e:
+        print(f"ERROR: Failed to read CSV: {e}")
+        return False
+    
+    filtered_df = filter_store_products(df, store_id, store_name)
+    if filtered_df is None:
+        return False
+    
+    # Save filtered data
+    try:
+        write_table(filtered_df, output_csv)
+    except Exception as e:
+        print(f"ERROR: Failed to save output: {e}")
+        return False
+    
+    # Summary
+    print("\n" + "="*80)
+    print("FILTERING COMPLETE")
+    print("="*80)
+    print(f"\nOutput saved to: {output_csv}")
+    print_filter_summary(filtered_df)
+    
+    return True
+
+def select_products(input_csv, output_csv, selection, use_index=True):
+    """
+    Write the export rows matching a selection expression, across any stores
+    
+    Returns:
+        bool: True if at least one row matched and was saved
+    """
+    print("="*80)
+    print("PRODUCT SELECTION")
+    print("="*80)
+    
+    if not Path(input_csv).exists():
+        print(f"ERROR: Input file not found: {input_csv}")
+        return False
+    
+    try:
+        parsed = parse_selection(selection)
+    except ValueError as e:
+        print(f"ERROR: Invalid selection: {e}")
+        return False
+    
+    try:
+        selected_df = load_selected_rows(input_csv, parsed, use_index)
+    except Exception as e:
+        print(f"ERROR: Failed to read CSV: {e}")
+        return False
+    
+    if len(selected_df) == 0:
+        print(f"WARNING: No products match: {parsed}")
+        return False
+    
+    try:
+        write_table(selected_df, output_csv)
+    except Exception as e:
+        print(f"ERROR: Failed to save output: {e}")
+        return False
+    
+    print(f"\nProducts selected: {len(selected_df)}")
+    if 'uStore_StoreID' in selected_df.columns:
+        print(f"Stores: {selected_df['uStore_StoreID'].nunique()}")
+    print(f"Output saved to: {output_csv}")
+    print("="*80)
     
     return True
 
+class StoreWriters:
+    """
+    Buffered CSV writers for many per-store outputs at once
+    
+    At most max_open files are open at a time; the least recently used one is
+    closed and reopened in append mode when its store shows up again.
+    """
+    
+    def __init__(self, output_dir, max_open=128, buffer_size=1024 * 1024):
+        self.output_dir = Path(output_dir)
+        self.max_open = max_open
+        self.buffer_size = buffer_size
+        self.handles = OrderedDict()
+        self.stores = {}
+    
+    def path_for(self, store_id):
+        return self.output_dir / f"Store_{store_id}_Export.csv"
+    
+    def write(self, store_id, df):
+        """Append a store's rows (header on its first write)"""
+        entry = self.stores.get(store_id)
+        if entry is None:
+            entry = self.stores[store_id] = {
+                'store_id': store_id,
+                'store_name': str(df['uStore_StoreName'].iloc[0]) if 'uStore_StoreName' in df.columns else '',
+                'rows': 0,
+                'path': str(self.path_for(store_id))
+            }
+        
+        handle = self.handles.pop(store_id, None)
+        if handle is None:
+            if len(self.handles) >= self.max_open:
+                _, oldest = self.handles.popitem(last=False)
+                oldest.close()
+            mode = 'a' if entry['rows'] else 'w'
+            handle = open(entry['path'], mode, encoding='utf-8', newline='', buffering=self.buffer_size)
+        self.handles[store_id] = handle
+        
+        df.to_csv(handle, index=False, header=entry['rows'] == 0)
+        entry['rows'] += len(df)
+    
+    def close(self):
+        """Close all files and return one manifest entry per store"""
+        for handle in self.handles.values():
+            handle.close()
+        self.handles.clear()
+        for entry in self.stores.values():
+            entry['bytes'] = Path(entry['path']).stat().st_size
+        return list(self.stores.values())
+
+def split_by_store(input_csv, output_dir, store_ids=None, chunk_size=50000):
+    """
+    Write per-store CSVs for many stores in a single pass over the export
+    
+    Args:
+        input_csv: Path to complete export CSV
+        output_dir: Folder for Store_<id>_Export.csv files and split_manifest.json
+        store_ids: Store IDs to write (None = every store)
+        chunk_size: Rows parsed per chunk
+    
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    print("="*80)
+    print("STORE SPLITTER")
+    print("="*80)
+    
+    if not Path(input_csv).exists():
+        print(f"ERROR: Input file not found: {input_csv}")
+        return False
+    
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    wanted = {str(store_id) for store_id in store_ids} if store_ids else None
+    
+    print(f"\nReading CSV: {input_csv}")
+    print(f"Stores: {', '.join(sorted(wanted)) if wanted else 'all'}")
+    
+    writers = StoreWriters(output_path)
+    total_rows = 0
+    try:
+        # Values are read as text so each store file matches the export cell for cell
+        for chunk in pd.read_csv(input_csv, encoding='utf-8', keep_default_na=False, dtype=str, chunksize=chunk_size):
+            if 'uStore_StoreID' not in chunk.columns:
+                print("ERROR: uStore_StoreID column not found")
+                return False
+            total_rows += len(chunk)
+            for store_id, store_df in chunk.groupby('uStore_StoreID', sort=False):
+                if wanted is None or store_id in wanted:
+                    writers.write(store_id, store_df)
+    except Exception as e:
+        print(f"ERROR: Failed to split CSV: {e}")
+        return False
+    finally:
+        manifest = writers.close()
+    
+    manifest_file = output_path / 'split_manifest.json'
+    with open(manifest_file, 'w', encoding='utf-8') as f:
+        json.dump({'input': str(input_csv), 'rows_read': total_rows, 'stores': manifest}, f, indent=4)
+    
+    print("\n" + "="*80)
+    print("SPLIT COMPLETE")
+    print("="*80)
+    print(f"\nRows read: {total_rows}")
+    for entry in manifest:
+        print(f"  Store ID {entry['store_id']:>3}: {entry['store_name']:40s} {entry['rows']:6d} rows -> {entry['path']}")
+    
+    if wanted:
+        for store_id in sorted(wanted - {entry['store_id'] for entry in manifest}):
+            print(f"WARNING: No products found for Store ID {store_id}")
+    
+    print(f"\nManifest: {manifest_file}")
+    print("="*80)
+    
+    return len(manifest) > 0
+
 def main():
     """Main entry point"""
     if len(sys.argv) < 3:
-        print("Usage: python store_filter.py <input_csv> <output_csv> [store_id OR store_name]")
+        print("Usage: python store_filter.py <input_csv> <output_csv> [store_id OR store_name] [selection]")
         print("\nExamples:")
         print("  # Filter by Store ID")
         print("  python store_filter.py uStore_Complete_Export.csv AFC_Export.csv 70")
         print("\n  # Filter by Store Name")
         print("  python store_filter.py uStore_Complete_Export.csv AFC_Export.csv 'AFC Urgent Care'")
+        print("\n  # Only active Forms products of store 70")
+        print("  python store_filter.py uStore_Complete_Export.csv AFC_Forms.csv 70 'active=true; category=AFC Urgent Care/Forms'")
+        print("\n  # Products matching a selection in any store")
+        print("  python store_filter.py uStore_Complete_Export.csv subset.csv select 'product=3275,3300-3399'")
         print("\n  # Show all stores")
         print("  python store_filter.py uStore_Complete_Export.csv - list")
+        print("\n  # Write one CSV per store (all stores, or a comma-separated list) in one pass")
+        print("  python store_filter.py uStore_Complete_Export.csv store_exports split 33,70")
+        print("\n  # Per-store summary as JSON or CSV (optionally with asset sizes)")
+        print("  python store_filter.py uStore_Complete_Export.csv store_stats.json stats ../static_assets ../static_assets_thumbnails")
         sys.exit(1)
     
     input_csv = sys.argv[1]
@@ -130,17 +416,36 @@ def main():
     
     # Special case: list stores
     if len(sys.argv) == 4 and sys.argv[3].lower() == 'list':
-        df = pd.read_csv(input_csv, encoding='utf-8', keep_default_na=False)
+        # Counts come from the store index; the export is only parsed when the index is rebuilt
+        index = store_index.load_index(input_csv)
         print("\nAll stores in export:")
         print("="*80)
-        if 'uStore_StoreName' in df.columns:
-            store_counts = df.groupby(['uStore_StoreID', 'uStore_StoreName']).size().reset_index(name='count')
-            store_counts = store_counts.sort_values('count', ascending=False)
-            for _, row in store_counts.iterrows():
-                print(f"  Store ID {row['uStore_StoreID']:3d}: {row['uStore_StoreName']:50s} ({row['count']:4d} products)")
+        for store_id, store_name, count in store_index.list_stores(index):
+            print(f"  Store ID {store_id:>3}: {store_name:50s} ({count:4d} products)")
         print("="*80)
         sys.exit(0)
     
+    # Special case: per-store summary
+    if len(sys.argv) >= 4 and sys.argv[3].lower() == 'stats':
+        assets_dir = sys.argv[4] if len(sys.argv) > 4 else None
+        thumbnails_dir = sys.argv[5] if len(sys.argv) > 5 else None
+        success = store_stats.run_store_stats(input_csv, output_csv, assets_dir, thumbnails_dir)
+        print("SUCCESS" if success else "FAILED")
+        sys.exit(0 if success else 1)
+    
+    # Special case: selection across stores
+    if len(sys.argv) >= 5 and sys.argv[3].lower() == 'select':
+        success = select_products(input_csv, output_csv, sys.argv[4])
+        print("SUCCESS" if success else "FAILED")
+        sys.exit(0 if success else 1)
+    
+    # Special case: split into per-store files
+    if len(sys.argv) >= 4 and sys.argv[3].lower() == 'split':
+        store_ids = sys.argv[4].split(',') if len(sys.argv) > 4 and sys.argv[4].lower() != 'all' else None
+        success = split_by_store(input_csv, output_csv, store_ids)
+        print("SUCCESS" if success else "FAILED")
+        sys.exit(0 if success else 1)
+    
     if len(sys.argv) < 4:
         print("ERROR: Must provide store_id or store_name")
         sys.exit(1)
@@ -156,8 +461,10 @@ def main():
     except ValueError:
         store_name = filter_value
     
+    selection = sys.argv[4] if len(sys.argv) > 4 else None
+    
     # Run filter
-    success = filter_by_store(input_csv, output_csv, store_id, store_name)
+    success = filter_by_store(input_csv, output_csv, store_id, store_name, selection=selection)
     
     if success:
         print("SUCCESS")
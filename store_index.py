@@ -0,0 +1,197 @@
+"""
+Store Index
+Byte-range index of uStore_Complete_Export.csv per uStore_StoreID for seek-based reads
+"""
+
+import hashlib
+import io
+import json
+import mmap
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+import schema
+
+INDEX_VERSION = 1
+SAMPLE_BYTES = 1024 * 1024
+
+def index_path(export_csv):
+    """Default index location: next to the export"""
+    return Path(f"{export_csv}.storeindex.json")
+
+def export_signature(export_csv):
+    """Size, mtime and a hash of the first and last MB of the export"""
+    stat = os.stat(export_csv)
+    digest = hashlib.sha256()
+    with open(export_csv, 'rb') as f:
+        digest.update(f.read(SAMPLE_BYTES))
+        if stat.st_size > SAMPLE_BYTES:
+            f.seek(max(stat.st_size - SAMPLE_BYTES, SAMPLE_BYTES))
+            digest.update(f.read())
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sample_sha256': digest.hexdigest()}
+
+def scan_records(export_csv):
+    """
+    Return the header's end offset and the (start, end) byte range of every record
+
+    A line ends a record only when it closes all open quotes, so quoted fields
+    spanning several lines (LongDescription) stay inside one record. Escaped
+    quotes ("") do not change the parity. Blank lines between records are
+    skipped, as pandas does.
+    """
+    records = []
+    with open(export_csv, 'rb') as f:
+        offset = 0
+        in_quotes = False
+        for line in f:  # Header (may itself contain quoted newlines)
+            offset += len(line)
+            in_quotes ^= line.count(b'"') & 1 == 1
+            if not in_quotes:
+                break
+        header_end = offset
+
+        start = offset
+        for line in f:
+            if not in_quotes and start == offset and not line.strip():
+                offset += len(line)
+                start = offset
+                continue
+            in_quotes ^= line.count(b'"') & 1 == 1
+            offset += len(line)
+            if not in_quotes:
+                records.append((start, offset))
+                start = offset
+        if start < offset:  # Last record without a trailing newline inside quotes
+            records.append((start, offset))
+
+    return header_end, records
+
+def build_index(export_csv):
+    """
+    Scan the export once and index its records by uStore_StoreID
+
+    Returns:
+        dict: Index with the export signature, header range and, per store ID,
+              its name, row count, byte count and list of [start, end) ranges
+    """
+    header_end, records = scan_records(export_csv)
+
+    header = pd.read_csv(export_csv, encoding='utf-8', nrows=0).columns
+    if 'uStore_StoreID' not in header:
+        raise ValueError("Export has no uStore_StoreID column")
+    usecols = ['uStore_StoreID'] + (['uStore_StoreName'] if 'uStore_StoreName' in header else [])
+    stores_df = schema.load_csv(export_csv, 'ustore', usecols=usecols)
+
+    if len(stores_df) != len(records):
+        raise ValueError(f"Record scan found {len(records)} records but pandas parsed {len(stores_df)} rows")
+
+    names = stores_df['uStore_StoreName'] if 'uStore_StoreName' in stores_df.columns else [''] * len(stores_df)
+    stores = {}
+    for store_id, name, (start, end) in zip(stores_df['uStore_StoreID'].astype(str), names, records):
+        entry = stores.get(store_id)
+        if entry is None:
+            entry = stores[store_id] = {'name': str(name), 'rows': 0, 'bytes': 0, 'ranges': []}
+        entry['rows'] += 1
+        entry['bytes'] += end - start
+        if entry['ranges'] and entry['ranges'][-1][1] == start:
+            entry['ranges'][-1][1] = end  # Contiguous with the store's previous record
+        else:
+            entry['ranges'].append([start, end])
+
+    return {
+        'version': INDEX_VERSION,
+        'export': export_signature(export_csv),
+        'header': [0, header_end],
+        'rows': len(records),
+        'stores': stores
+    }
+
+def save_index(index, index_file):
+    """Write the index atomically"""
+    tmp = Path(f"{index_file}.tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+    os.replace(tmp, index_file)
+
+def load_index(export_csv, index_file=None, rebuild=False):
+    """
+    Return a valid index for the export, rebuilding it when the export changed
+
+    The saved index is reused only if the export's size, mtime and sampled
+    hash all still match. A rebuilt index is saved if the folder is writable.
+    """
+    index_file = Path(index_file) if index_file else index_path(export_csv)
+
+    if not rebuild and index_file.exists():
+        try:
+            with open(index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get('version') == INDEX_VERSION and index.get('export') == export_signature(export_csv):
+                return index
+            print(f"Store index is out of date, rebuilding: {index_file}")
+        except (OSError, ValueError):
+            print(f"WARNING: Unreadable store index, rebuilding: {index_file}")
+
+    print(f"Building store index for {export_csv}...")
+    index = build_index(export_csv)
+    try:
+        save_index(index, index_file)
+        print(f"  Indexed {index['rows']} products in {len(index['stores'])} stores: {index_file}")
+    except OSError as e:
+        print(f"WARNING: Could not save store index: {e}")
+    return index
+
+def find_store_ids(index, store_id=None, store_name=None):
+    """Return the indexed store IDs matching a store ID or name"""
+    if store_id is not None:
+        return [str(store_id)] if str(store_id) in index['stores'] else []
+    return [sid for sid, entry in index['stores'].items() if entry['name'] == store_name]
+
+def read_stores(export_csv, index, store_ids):
+    """
+    Read only the records of the given stores (in file order) into a DataFrame
+
+    Returns:
+        DataFrame: The stores' rows, parsed exactly like a full schema.load_csv
+    """
+    ranges = sorted(r for sid in store_ids for r in index['stores'][str(sid)]['ranges'])
+    with open(export_csv, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        header_start, header_end = index['header']
+        data = mm[header_start:header_end] + b''.join(mm[start:end] for start, end in ranges)
+    return schema.load_csv(io.BytesIO(data), 'ustore')
+
+def read_store(export_csv, index, store_id=None, store_name=None):
+    """Read one store's rows by ID or name, or None if the store is not in the export"""
+    store_ids = find_store_ids(index, store_id, store_name)
+    if not store_ids:
+        return None
+    return read_stores(export_csv, index, store_ids)
+
+def list_stores(index):
+    """Return (store_id, store_name, rows) for every store, largest first"""
+    stores = [(sid, entry['name'], entry['rows']) for sid, entry in index['stores'].items()]
+    return sorted(stores, key=lambda s: s[2], reverse=True)
+
+def main():
+    """Main entry point"""
+    if len(sys.argv) < 2:
+        print("Usage: python store_index.py <export_csv> [rebuild]")
+        print("\nExample:")
+        print("  python store_index.py ../uStore_Complete_Export.csv")
+        sys.exit(1)
+
+    export_csv = sys.argv[1]
+    rebuild = len(sys.argv) > 2 and sys.argv[2].lower() == 'rebuild'
+    index = load_index(export_csv, rebuild=rebuild)
+
+    print("=" * 80)
+    for store_id, name, rows in list_stores(index):
+        entry = index['stores'][store_id]
+        print(f"  Store ID {store_id:>5}: {name:50s} ({rows:6d} products, {len(entry['ranges'])} range(s))")
+    print("=" * 80)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Store Statistics
+Per-store product, category, ticket template and asset size summary of the complete export
+"""
+
+import json
+import os
+
+import pandas as pd
+
+import schema
+
+# The only columns the summary needs (parsed with usecols)
+STATS_COLUMNS = [
+    'uStore_ProductID', 'uStore_StoreID', 'uStore_StoreName', 'Type', 'Active',
+    'TicketTemplate', 'StoreFront/Categories'
+]
+
+def load_stats_columns(export_csv):
+    """Read only the summary columns of the export"""
+    header = schema.read_header(export_csv)
+    return schema.load_csv(export_csv, 'ustore', usecols=[col for col in STATS_COLUMNS if col in header])
+
+def is_active(active):
+    """True for rows whose Active flag reads as true (bool or text)"""
+    return active.astype(str).str.strip().str.lower().isin(['true', '1', 'yes'])
+
+def category_tree_sizes(df):
+    """
+    Count each store's category tree
+
+    Every distinct category path contributes itself and all its parent
+    paths, so 'A/B/C' and 'A/D' make a tree of 4 nodes (A, A/B, A/B/C, A/D).
+
+    Returns:
+        DataFrame: categories, category_nodes and category_depth per store ID
+    """
+    paths = df[['uStore_StoreID', 'StoreFront/Categories']].drop_duplicates()
+    paths = paths[paths['StoreFront/Categories'] != '']
+    parts = paths['StoreFront/Categories'].astype(str).str.strip('/').str.split('/')
+    depth = parts.str.len()
+
+    levels = [
+        pd.DataFrame({'store': paths.loc[depth >= level, 'uStore_StoreID'],
+                      'node': parts[depth >= level].str[:level].str.join('/')})
+        for level in range(1, int(depth.max()) + 1 if len(depth) else 1)
+    ]
+    nodes = pd.concat(levels) if levels else pd.DataFrame({'store': [], 'node': []})
+
+    return pd.DataFrame({
+        'categories': paths.groupby('uStore_StoreID', observed=True).size(),
+        'category_nodes': nodes.drop_duplicates().groupby('store', observed=True).size(),
+        'category_depth': depth.groupby(paths['uStore_StoreID'], observed=True).max()
+    })
+
+def tree_bytes(path):
+    """Total size of all files below a folder"""
+    total = 0
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                total += tree_bytes(entry.path)
+            elif entry.is_file():
+                total += entry.stat().st_size
+    return total
+
+def product_folder_bytes(asset_root):
+    """Bytes per product ID for every Product_<id> folder of an asset tree"""
+    sizes = {}
+    with os.scandir(asset_root) as entries:
+        for entry in entries:
+            if entry.is_dir() and entry.name.startswith('Product_'):
+                sizes[entry.name[len('Product_'):]] = tree_bytes(entry.path)
+    return pd.Series(sizes, dtype='int64')
+
+def compute_store_stats(df, assets_dir=None, thumbnails_dir=None):
+    """
+    Summarize every store of the export in one grouped pass
+
+    Args:
+        df: Export rows (at least uStore_StoreID; other columns are optional)
+        assets_dir: If set, add each store's PDF folder bytes (Product_<id> folders)
+        thumbnails_dir: If set, add each store's thumbnail folder bytes
+
+    Returns:
+        tuple: (DataFrame with one row per store, dict of per-store type and
+                ticket template counts keyed by store ID)
+    """
+    df = df.assign(_active=is_active(df['Active']) if 'Active' in df.columns else False)
+    if 'uStore_StoreName' not in df.columns:
+        df['uStore_StoreName'] = ''
+    aggregations = {
+        'store_name': ('uStore_StoreName', 'first'),
+        'products': ('uStore_StoreID', 'size'),
+        'active': ('_active', 'sum')
+    }
+    if 'TicketTemplate' in df.columns:
+        df['_template'] = df['TicketTemplate'].astype(str).replace('', None)
+        aggregations['ticket_templates'] = ('_template', 'nunique')
+
+    folders = [('asset_bytes', assets_dir), ('thumbnail_bytes', thumbnails_dir)]
+    for column, folder in folders:
+        if folder is not None:
+            product_bytes = product_folder_bytes(folder)
+            df[column] = df['uStore_ProductID'].astype(str).map(product_bytes).fillna(0).astype('int64')
+            aggregations[column] = (column, 'sum')
+
+    grouped = df.groupby('uStore_StoreID', observed=True, sort=True)
+    stores = grouped.agg(**aggregations)
+    stores['inactive'] = stores['products'] - stores['active']
+    if 'StoreFront/Categories' in df.columns:
+        stores = stores.join(category_tree_sizes(df)).fillna({'categories': 0, 'category_nodes': 0, 'category_depth': 0})
+
+    # Breakdowns with one entry per (store, value) pair
+    details = {str(store_id): {} for store_id in stores.index}
+    for key, column in [('types', 'Type'), ('ticket_template_usage', '_template')]:
+        if column not in df.columns:
+            continue
+        counts = df.groupby(['uStore_StoreID', column], observed=True).size()
+        for (store_id, value), count in counts.items():
+            details[str(store_id)].setdefault(key, {})[str(value)] = int(count)
+
+    columns = ['store_name', 'products', 'active', 'inactive', 'ticket_templates',
+               'categories', 'category_nodes', 'category_depth', 'asset_bytes', 'thumbnail_bytes']
+    stores = stores[[col for col in columns if col in stores.columns]]
+    stores = stores.astype({col: 'int64' for col in stores.columns if col != 'store_name'})
+    stores.index.name = 'store_id'
+    return stores.sort_values('products', ascending=False, kind='stable'), details
+
+def write_store_stats(stores, details, output_file):
+    """Write the summary as JSON (with breakdowns) or CSV (one row per store), by extension"""
+    if str(output_file).lower().endswith('.csv'):
+        stores.to_csv(output_file, encoding='utf-8')
+        return
+
+    records = []
+    for store_id, row in stores.iterrows():
+        record = {'store_id': str(store_id), **{k: (v if k == 'store_name' else int(v)) for k, v in row.items()}}
+        record.update(details.get(str(store_id), {}))
+        records.append(record)
+    totals = {col: int(stores[col].sum()) for col in stores.columns
+              if col in ('products', 'active', 'inactive', 'asset_bytes', 'thumbnail_bytes')}
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump({'stores': len(records), 'totals': totals, 'by_store': records}, f, indent=2)
+
+def run_store_stats(export_csv, output_file, assets_dir=None, thumbnails_dir=None):
+    """
+    Compute and save the store summary of an export
+
+    Returns:
+        bool: True if successful
+    """
+    print("="*80)
+    print("STORE STATISTICS")
+    print("="*80)
+
+    try:
+        df = load_stats_columns(export_csv)
+    except Exception as e:
+        print(f"ERROR: Failed to read CSV: {e}")
+        return False
+
+    if 'uStore_StoreID' not in df.columns:
+        print("ERROR: CSV missing uStore_StoreID column")
+        return False
+
+    if (assets_dir or thumbnails_dir) and 'uStore_ProductID' not in df.columns:
+        print("ERROR: CSV missing uStore_ProductID column (needed for asset sizes)")
+        return False
+
+    for folder in (assets_dir, thumbnails_dir):
+        if folder is not None and not os.path.isdir(folder):
+            print(f"ERROR: Assets directory not found: {folder}")
+            return False
+
+    stores, details = compute_store_stats(df, assets_dir, thumbnails_dir)
+
+    try:
+        write_store_stats(stores, details, output_file)
+    except Exception as e:
+        print(f"ERROR: Failed to save statistics: {e}")
+        return False
+
+    print(f"Products: {len(df)} in {len(stores)} stores")
+    for store_id, row in stores.head(10).iterrows():
+        print(f"  Store ID {store_id:>5}: {row['store_name']:50s} ({row['products']:6d} products, {row['active']} active)")
+    if len(stores) > 10:
+        print(f"  ... and {len(stores) - 10} more stores")
+    print(f"\nStatistics saved: {output_file}")
+    return True
@@ -0,0 +1,261 @@
+"""
+Streaming Migration
+Runs filter -> SEO -> asset linking -> mapping -> packaging over fixed-size chunks
+"""
+
+import io
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+import SEO_generator
+import asset_linker
+import fields_mapper
+import packager
+from asset_catalog import AssetCatalog
+from asset_index import DEFAULT_SCAN_WORKERS
+from pipeline_logging import capture_thread_stdout
+from selection import parse_selection
+from seo_cache import SeoCache
+from seo_rules import load_rules
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# Lines of a failed step's captured report quoted in the error
+FAILURE_REPORT_LINES = 10
+
+def quiet(func, *args):
+    """
+    Call a step function without its per-call console report (printed once per chunk otherwise)
+
+    Returns:
+        tuple: (result, captured report text)
+    """
+    report = io.StringIO()
+    with capture_thread_stdout(report):
+        result = func(*args)
+    return result, report.getvalue()
+
+def read_chunks(input_csv, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield the export in chunks of chunk_size rows
+
+    Every column is read as text so a value is written back exactly as it was
+    read, whatever the other rows of its chunk look like.
+    """
+    yield from pd.read_csv(input_csv, encoding='utf-8', keep_default_na=False, dtype=str, chunksize=chunk_size)
+
+def filter_chunks(chunks, store_id=None, store_name=None, selection=None):
+    """Keep only one store's rows (matching the selection, if any) from each chunk (empty chunks are dropped)"""
+    for chunk in chunks:
+        if store_id is not None:
+            chunk = chunk[chunk['uStore_StoreID'] == str(store_id)]
+        else:
+            chunk = chunk[chunk['uStore_StoreName'] == store_name]
+        if selection is not None:
+            chunk = chunk[selection.mask(chunk)]
+        if len(chunk) > 0:
+            yield chunk
+
+def limit_chunks(chunks, limit):
+    """Stop after limit rows in total (test mode)"""
+    remaining = limit
+    for chunk in chunks:
+        if remaining <= 0:
+            return
+        chunk = chunk.head(remaining)
+        remaining -= len(chunk)
+        yield chunk
+
+def map_chunks(chunks, func, *args):
+    """Apply a DataFrame step function to every chunk"""
+    for chunk in chunks:
+        result, report = quiet(func, chunk, *args)
+        if result is None:
+            # Step functions report failures by printing ERROR lines and returning None
+            lines = [line for line in report.splitlines() if line.strip()][-FAILURE_REPORT_LINES:]
+            raise ValueError(f"{func.__module__}.{func.__name__} failed on a chunk" +
+                             ''.join(f"\n  {line}" for line in lines))
+        yield result
+
+def tap_chunks(chunks, output_csv):
+    """Pass chunks through while appending them to a CSV (intermediate output)"""
+    with open(output_csv, 'w', encoding='utf-8', newline='') as f:
+        header = True
+        for chunk in chunks:
+            chunk.to_csv(f, index=False, header=header)
+            header = False
+            yield chunk
+
+def stream_migration(input_csv, zip_filename, assets_dir, thumbnails_dir, store_id=None, store_name=None,
+                     use_auto_thumbnail=True, test_mode=False, test_limit=1,
+                     chunk_size=DEFAULT_CHUNK_SIZE, intermediates_dir=None, selection=None, seo_rules=None,
+                     seo_cache=None, seo_workers=1, scan_workers=DEFAULT_SCAN_WORKERS, asset_catalog=None):
+    """
+    Migrate one store from the complete export in bounded memory
+
+    Chunks flow through a generator chain, so at most a few chunks are held at
+    once; products.csv and the ZIP are appended chunk by chunk.
+
+    Args:
+        input_csv: Complete uStore export CSV
+        zip_filename: Package to create
+        assets_dir: Path to static_assets folder
+        thumbnails_dir: Path to static_assets_thumbnails folder
+        store_id: Store ID to migrate (or store_name)
+        store_name: Store name to migrate when no store_id is given
+        use_auto_thumbnail: Passed to the MDSF mapping
+        test_mode: Map test_limit products and package only the first one
+        test_limit: Products to map in test mode
+        chunk_size: Rows read from the export per chunk
+        intermediates_dir: If set, also write Store_Export.csv, with_seo.csv,
+                           with_assets.csv and mdsf_import.csv there
+        selection: Selection expression narrowing the store's products
+        seo_rules: JSON file of SEO rules (default: the built-in tables)
+        seo_cache: SQLite file of cached SEO results (default: no cache)
+        seo_workers: Worker processes for SEO generation of large chunks (None = CPU count)
+        scan_workers: Threads listing product folders in asset linking and packaging
+        asset_catalog: SQLite asset catalog to read product folders from (default: the asset trees)
+
+    Returns:
+        str: Path of the created ZIP file, or None if the migration failed
+    """
+    print("=" * 80)
+    print("STREAMING MIGRATION")
+    print("=" * 80)
+
+    if not Path(input_csv).exists():
+        print(f"ERROR: Input file not found: {input_csv}")
+        return None
+
+    if store_id is None and not store_name:
+        print("ERROR: Must provide either store_id or store_name")
+        return None
+
+    for folder in (assets_dir, thumbnails_dir):
+        if not Path(folder).exists():
+            print(f"ERROR: Assets directory not found: {folder}")
+            return None
+
+    print(f"Input: {input_csv}")
+    print(f"Store: {store_id if store_id is not None else store_name}")
+    print(f"Chunk size: {chunk_size} rows")
+
+    if selection:
+        try:
+            selection = parse_selection(selection)
+        except ValueError as e:
+            print(f"ERROR: Invalid selection: {e}")
+            return None
+        print(f"Selection: {selection}")
+
+    try:
+        rules = load_rules(seo_rules)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: Failed to load SEO rules: {e}")
+        return None
+    cache = SeoCache(seo_cache) if seo_cache else None
+    catalog = AssetCatalog(asset_catalog) if asset_catalog else None
+
+    def tap(chunks, name):
+        if intermediates_dir is None:
+            return chunks
+        return tap_chunks(chunks, Path(intermediates_dir) / name)
+
+    chunks = filter_chunks(read_chunks(input_csv, chunk_size), store_id, store_name, selection or None)
+    chunks = tap(chunks, 'Store_Export.csv')
+    chunks = tap(map_chunks(chunks, SEO_generator.add_seo_data, rules, cache, seo_workers), 'with_seo.csv')
+    chunks = tap(map_chunks(chunks, asset_linker.add_asset_links, assets_dir, thumbnails_dir, None, 0, scan_workers, catalog), 'with_assets.csv')
+    if test_mode:
+        chunks = limit_chunks(chunks, test_limit)
+    chunks = tap(map_chunks(chunks, fields_mapper.build_mdsf_products, use_auto_thumbnail), 'mdsf_import.csv')
+    if test_mode:
+        print("TEST MODE: Packaging only the first product")
+        chunks = limit_chunks(chunks, 1)
+
+    stats = {'chunks': 0, 'missing_pdfs': 0, 'missing_templates': 0}
+    writer = packager.PackageWriter(zip_filename, assets_dir, thumbnails_dir, scan_workers, catalog)
+    try:
+        for chunk in chunks:
+            writer.add_products(chunk)
+            stats['chunks'] += 1
+            documents = chunk['Type'] == 'Document'
+            stats['missing_pdfs'] += int((documents & chunk['ContentFile'].eq('')).sum())
+            stats['missing_templates'] += int((documents & chunk['TicketTemplate'].eq('')).sum())
+            print(f"  Chunk {stats['chunks']}: {len(chunk)} products ({writer.products} total)")
+
+        if writer.products == 0:
+            print(f"WARNING: No products found for store {store_id if store_id is not None else store_name}")
+            writer.abort()
+            return None
+
+        zip_filename = writer.close()
+    except Exception as e:
+        writer.abort()
+        print(f"ERROR: Streaming migration failed: {e}")
+        return None
+
+    print("\n" + "=" * 80)
+    print("STREAMING MIGRATION COMPLETE")
+    print("=" * 80)
+    print(f"\nPackage: {zip_filename}")
+    print(f"  Products: {writer.products}")
+    print(f"  Asset files: {len(writer.files_added)}")
+    if stats['missing_templates']:
+        print(f"  ERROR: {stats['missing_templates']} Document products missing TicketTemplate")
+    if stats['missing_pdfs']:
+        print(f"  ERROR: {stats['missing_pdfs']} Document products missing ContentFile")
+    if writer.missing_files:
+        print(f"\nWARNING: {len(writer.missing_files)} missing files")
+        for product_name, filename in writer.missing_files[:3]:
+            print(f"  - {filename}: {product_name}")
+        if len(writer.missing_files) > 3:
+            print(f"  ... and {len(writer.missing_files) - 3} more")
+
+    return zip_filename
+
+def main():
+    """Main entry point"""
+    if len(sys.argv) < 6:
+        print("Usage: python streaming.py <input_csv> <output_zip> <assets_dir> <thumbnails_dir> <store_id OR store_name> "
+              "[chunk_size] [use_auto_thumbnail] [test_mode] [test_limit] [selection] [seo_rules_json] [seo_cache_db] "
+              "[seo_workers] [scan_workers] [asset_catalog_db]")
+        print("\nExample:")
+        print("  python streaming.py uStore_Complete_Export.csv MDSF_Import_Package.zip "
+              "../static_assets ../static_assets_thumbnails 70 5000")
+        sys.exit(1)
+
+    input_csv, zip_filename, assets_dir, thumbnails_dir, filter_value = sys.argv[1:6]
+
+    store_id = None
+    store_name = None
+    try:
+        store_id = int(filter_value)
+    except ValueError:
+        store_name = filter_value
+
+    chunk_size = int(sys.argv[6]) if len(sys.argv) > 6 else DEFAULT_CHUNK_SIZE
+    use_auto_thumbnail = sys.argv[7].lower() in ['true', '1', 'yes'] if len(sys.argv) > 7 else True
+    test_mode = sys.argv[8].lower() in ['true', '1', 'yes'] if len(sys.argv) > 8 else False
+    test_limit = int(sys.argv[9]) if len(sys.argv) > 9 else 1
+    selection = sys.argv[10] if len(sys.argv) > 10 else None
+    seo_rules = sys.argv[11] if len(sys.argv) > 11 else None
+    seo_cache = sys.argv[12] if len(sys.argv) > 12 else None
+    seo_workers = int(sys.argv[13]) if len(sys.argv) > 13 and sys.argv[13] else 1  # 0 = CPU count
+    scan_workers = int(sys.argv[14]) if len(sys.argv) > 14 else DEFAULT_SCAN_WORKERS
+    asset_catalog = sys.argv[15] if len(sys.argv) > 15 else None
+
+    result = stream_migration(input_csv, zip_filename, assets_dir, thumbnails_dir, store_id, store_name,
+                              use_auto_thumbnail, test_mode, test_limit, chunk_size, None, selection, seo_rules,
+                              seo_cache, seo_workers, scan_workers, asset_catalog)
+
+    if result:
+        print("SUCCESS")
+        sys.exit(0)
+    else:
+        print("FAILED")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()